@@ -0,0 +1,132 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class Settings(BaseModel):
+    """
+    Application settings. Each field is read from the upper-cased environment
+    variable of the same name (e.g. mongodb_uri <- MONGODB_URI).
+    """
+    # Required: there is no safe default for where data lives or what signs tokens
+    mongodb_uri: str
+    database_name: str
+
+    jwt_secret: str
+    jwt_algorithm: str = "HS256"
+    jwt_expires_minutes: int = 60
+
+    smtp_server: Optional[str] = None
+    smtp_port: int = 587
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    email_from: Optional[str] = None
+    smtp_pool_size: int = 4
+    email_rate_per_second: float = 10.0
+
+    # Request tracing: exporter is none, file (JSON lines) or otlp (OTLP/HTTP JSON)
+    trace_exporter: str = "none"
+    trace_file: str = "traces.jsonl"
+    trace_otlp_endpoint: str = "http://localhost:4318"
+    trace_sample_rate: float = 1.0
+
+    # Slow-query detector for development/staging; off unless a threshold is set
+    slow_query_ms: Optional[float] = None
+    slow_query_report: str = "slow_queries.json"
+
+    # On-demand profiling: admins send X-Profile: 1, or a share of requests under profile_paths
+    # (comma-separated path prefixes, empty for all) is sampled; profiles are saved to profile_dir
+    profile_enabled: bool = False
+    profile_sample_rate: float = 0.0
+    profile_paths: str = ""
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "profiles"
+    profile_keep: int = 200
+
+    # Coalesce concurrent identical reads of the public catalogue into one handler run
+    single_flight_enabled: bool = True
+
+    # How long Idempotency-Key responses are kept for replay
+    idempotency_ttl_seconds: int = 86400
+
+    # Payment gateway webhooks: HMAC secret, batching and auto-approval on payment
+    payment_webhook_secret: Optional[str] = None
+    payment_queue_size: int = 10000
+    payment_batch_size: int = 500
+    payment_batch_interval_ms: int = 200
+    payment_auto_approve: bool = False
+
+    # Audit journal: events are queued and written in batches of up to audit_batch_size,
+    # at least every audit_flush_interval_ms; writers wait once audit_queue_size are queued
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_ms: int = 1000
+
+    # How long an unpaid registration holds its seat (0 disables holds), and how often lapsed holds are swept
+    seat_hold_minutes: int = 30
+    seat_hold_sweep_seconds: int = 60
+
+    # Archival of completed workshops' registrations
+    archive_after_days: int = 180
+    archive_dir: str = "archive"
+
+    # Login and OTP rate limits, kept in this worker (memory) or shared through Mongo (mongo)
+    rate_limit_store: str = "memory"
+    rate_limit_trust_proxy: bool = False  # key by the first X-Forwarded-For address
+    login_attempts_per_ip: int = 30
+    login_attempts_per_email: int = 10
+    login_window_seconds: int = 900
+    otp_requests_per_ip: int = 10
+    otp_requests_per_email: int = 3
+    otp_window_seconds: int = 3600
+
+    # Workshop image uploads: originals and resized WebP variants live under image_dir and are
+    # rendered by image_workers processes; media_base_url prefixes their URLs (the API's own URL when unset)
+    image_dir: str = "media"
+    image_workers: int = 2
+    image_max_bytes: int = 10 * 1024 * 1024
+    media_base_url: Optional[str] = None
+
+    # Where background export jobs write their files
+    export_dir: str = "exports"
+
+    # Key that check-in tickets are signed with; JWT_SECRET is used when unset
+    ticket_secret: Optional[str] = None
+
+    # Longest time a cached public feed (testimonials, home page) is served before a reload
+    feed_ttl_seconds: int = 60
+
+    # Production server (serve.py); web_concurrency defaults to one worker per CPU
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_concurrency: Optional[int] = None
+    keepalive_timeout_seconds: int = 75
+    listen_backlog: int = 2048
+    forwarded_allow_ips: str = "127.0.0.1"
+
+    # URL pinged periodically to keep free-tier hosting awake; disabled when unset
+    backend_api: Optional[str] = None
+    keepalive_interval_seconds: int = 300
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {}
+        for name in cls.model_fields:
+            value = os.getenv(name.upper())
+            if value not in (None, ""):
+                values[name] = value
+        missing = [name.upper() for name, field in cls.model_fields.items() if field.is_required() and name not in values]
+        if missing:
+            raise RuntimeError(f"Missing required settings: {', '.join(missing)}")
+        return cls(**values)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Load .env and the environment once, on first use"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings.from_env()
@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class AnnouncementCreate(BaseModel):
+    subject: str
+    message: str
+    registration_status: Optional[List[str]] = None  # pending, approved, rejected; None for all
+
+class AnnouncementJob(BaseModel):
+    id: str
+    workshop_id: str
+    subject: str
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
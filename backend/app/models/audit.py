@@ -0,0 +1,23 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+class AuditEvent(BaseModel):
+    id: str = Field(default=None, alias="_id")
+    entity_type: str  # registration, user
+    entity_id: str
+    action: str  # e.g. updated, cancelled, auto_approved, password_changed
+    actor_id: Optional[str] = None  # None for system actions
+    actor_email: Optional[str] = None
+    at: datetime
+    changes: Dict[str, Any] = {}  # field -> {"from": old, "to": new}
+
+    class Config:
+        populate_by_name = True
+
+class AuditStats(BaseModel):
+    recorded: int = 0
+    written: int = 0
+    failed: int = 0
+    batches: int = 0
+    queued: int = 0
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None  # echoed back so the client can match responses
+    path: str  # e.g. /api/workshops/123 or /api/workshops?featured=true
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Any = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
@@ -0,0 +1,27 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class ExportCreate(BaseModel):
+    format: str = "csv"  # csv (gzip-compressed), parquet
+    workshop_ids: Optional[List[str]] = None  # None for every workshop
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    registration_status: Optional[List[str]] = None
+    payment_status: Optional[List[str]] = None
+    grade: Optional[int] = None
+    school: Optional[str] = None
+    include_archived: bool = False
+
+class ExportJob(BaseModel):
+    id: str
+    format: str
+    requested_by: str
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    exported: int = 0
+    filename: Optional[str] = None
+    size_bytes: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
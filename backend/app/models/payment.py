@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class PaymentEvent(BaseModel):
+    payment_id: str
+    registration_id: str
+    status: str  # completed, failed
+    amount: Optional[float] = None
+    event_id: Optional[str] = None
+
+class PaymentStats(BaseModel):
+    received: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    applied: int = 0
+    auto_approved: int = 0
+    batches: int = 0
+    retries: int = 0
+    queued: int = 0
@@ -0,0 +1,24 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ProfileTiming(BaseModel):
+    kind: str  # mongo, smtp
+    name: str  # e.g. "aggregate registrations" or an email subject
+    calls: int
+    total_ms: float
+    max_ms: float
+
+class ProfileSummary(BaseModel):
+    id: str
+    created_at: datetime
+    trigger: str  # header, sample
+    method: str
+    path: str
+    route: Optional[str] = None
+    handler: Optional[str] = None
+    status_code: Optional[int] = None
+    duration_ms: float
+    samples: int
+    interval_ms: float
+    timings: List[ProfileTiming] = []
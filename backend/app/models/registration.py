@@ -1,10 +1,12 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Dict
 
-class RegistrationBase(BaseModel):
+from app.models.workshop import WorkshopSummary
+
+class RegistrationCreate(BaseModel):
+    # Statuses and the owning user are set by the server, never by the client
     workshop_id: str
-    user_id: Optional[str] = None
     email: str
     full_name: str
     grade: int
@@ -12,11 +14,11 @@ class RegistrationBase(BaseModel):
     phone: str
     parent_name: str
     parent_phone: str
-    payment_status: str = "pending"  # pending, completed, failed
-    registration_status: str = "pending"  # pending, approved, rejected
 
-class RegistrationCreate(RegistrationBase):
-    pass
+class RegistrationBase(RegistrationCreate):
+    user_id: Optional[str] = None
+    payment_status: str = "pending"  # pending, completed, failed
+    registration_status: str = "pending"  # pending, approved, rejected, expired
 
 class RegistrationUpdate(BaseModel):
     payment_status: Optional[str] = None
@@ -30,9 +32,45 @@ class Registration(RegistrationBase):
     payment_id: Optional[str] = None
     amount_paid: Optional[float] = None
     notes: Optional[str] = None
+    hold_expires_at: Optional[datetime] = None  # unpaid registrations hold their seat until then
+    checked_in_at: Optional[datetime] = None
+    paid_after_expiry: Optional[bool] = None  # paid once the hold had lapsed and the workshop was full
+    ticket: Optional[str] = None  # check-in QR payload, set on approved registrations
     
     class Config:
         populate_by_name = True
 
 class RegistrationInDB(Registration):
-    pass
\ No newline at end of file
+    pass
+
+class RegistrationListItem(Registration):
+    workshop_title: Optional[str] = None
+
+class RegistrationWithWorkshop(Registration):
+    workshop_title: Optional[str] = None
+    workshop: Optional[WorkshopSummary] = None
+
+class WorkshopFacet(BaseModel):
+    workshop_id: str
+    workshop_title: Optional[str] = None
+    count: int
+
+class RegistrationFacets(BaseModel):
+    registration_status: Dict[str, int] = {}
+    payment_status: Dict[str, int] = {}
+    workshops: List[WorkshopFacet] = []
+
+class RegistrationPage(BaseModel):
+    items: List[RegistrationListItem]
+    total: int
+    skip: int
+    limit: int
+    facets: RegistrationFacets
+
+class SeatHoldStats(BaseModel):
+    created: int = 0
+    expired: int = 0
+    converted: int = 0
+    sweeps: int = 0
+    active: int = 0
+    last_sweep_at: Optional[datetime] = None
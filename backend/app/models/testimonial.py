@@ -1,12 +1,13 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 
 class TestimonialBase(BaseModel):
     name: str
     content: str
     role: str  # student, teacher, parent
     is_visible: bool = True
+    featured: bool = False
 
 class TestimonialCreate(TestimonialBase):
     pass
@@ -16,13 +17,21 @@ class TestimonialUpdate(BaseModel):
     content: Optional[str] = None
     role: Optional[str] = None
     is_visible: Optional[bool] = None
+    featured: Optional[bool] = None
 
 class Testimonial(TestimonialBase):
     id: str = Field(default=None, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
     
     class Config:
         populate_by_name = True
 
 class TestimonialInDB(Testimonial):
-    pass
\ No newline at end of file
+    pass
+
+class TestimonialPage(BaseModel):
+    items: List[Testimonial]
+    total: int
+    skip: int
+    limit: int
@@ -0,0 +1,36 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class Ticket(BaseModel):
+    registration_id: str
+    workshop_id: str
+    ticket: str  # QR payload, see app.utils.tickets
+
+class RosterEntry(BaseModel):
+    registration_id: str
+    full_name: str
+    grade: int
+    school: str
+    checked_in_at: Optional[datetime] = None
+
+class Roster(BaseModel):
+    workshop_id: str
+    workshop_title: str
+    start_date: datetime
+    generated_at: datetime
+    verify_key: str  # hex Ed25519 public key that verifies this workshop's tickets
+    entries: List[RosterEntry]
+
+class CheckIn(BaseModel):
+    ticket: str
+    checked_in_at: datetime
+
+class CheckInSync(BaseModel):
+    check_ins: List[CheckIn] = Field(..., max_length=5000)
+
+class CheckInSyncResult(BaseModel):
+    received: int
+    applied: int  # registrations whose check-in time was recorded or moved earlier
+    unchanged: int  # already checked in at that time or earlier, or no longer approved
+    invalid: List[str] = []  # tickets that failed verification or belong to another workshop
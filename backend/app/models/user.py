@@ -1,6 +1,9 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, List
+
+from app.models.registration import RegistrationWithWorkshop
+from app.models.workshop import WorkshopSummary
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -63,9 +66,21 @@ class User(UserBase):
     class Config:
         populate_by_name = True
 
+class UserPage(BaseModel):
+    items: List[User]
+    total: int
+    skip: int
+    limit: int
+
+class UserDashboard(BaseModel):
+    user: User
+    registrations: List[RegistrationWithWorkshop]
+    recommended_workshops: List[WorkshopSummary]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
+    user: Optional[User] = None  # included when login is called with include_user=true
 
 class LoginCredentials(BaseModel):
     email: EmailStr
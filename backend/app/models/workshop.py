@@ -2,6 +2,18 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from app.models.testimonial import Testimonial
+
+class WorkshopImageVariant(BaseModel):
+    url: str
+    width: int
+    height: int
+
+class WorkshopImages(BaseModel):
+    thumb: WorkshopImageVariant  # 160px, for lists and dashboards
+    card: WorkshopImageVariant  # 480px, for workshop cards
+    hero: WorkshopImageVariant  # 1600px, for detail pages and carousels
+
 class WorkshopBase(BaseModel):
     title: str
     description: str
@@ -38,10 +50,32 @@ class WorkshopUpdate(BaseModel):
 class Workshop(WorkshopBase):
     id: str = Field(default=None, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
     registered_count: int = 0
+    images: Optional[WorkshopImages] = None  # set when an image was uploaded rather than linked
 
     class Config:
         populate_by_name = True
 
 class WorkshopInDB(Workshop):
-    pass
\ No newline at end of file
+    pass
+
+class WorkshopSummary(BaseModel):
+    id: str = Field(default=None, alias="_id")
+    title: str
+    short_description: Optional[str] = None
+    image_url: Optional[str] = None
+    images: Optional[WorkshopImages] = None
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    location: Optional[str] = None
+    fee: Optional[float] = None
+    status: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+class HomeFeed(BaseModel):
+    featured_workshops: List[Workshop]
+    upcoming_workshops: List[Workshop]
+    testimonials: List[Testimonial]
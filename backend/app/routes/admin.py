@@ -1,20 +1,58 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Response, status
+from fastapi.responses import FileResponse
+from typing import List, Dict, Any, Optional
 from bson import ObjectId
+import asyncio
+import heapq
+import re
 from datetime import datetime, timedelta
 
-from app.models.user import User, UserUpdate
-from app.models.registration import Registration
+from app.models.user import User, UserUpdate, UserPage
+from app.models.registration import RegistrationPage, SeatHoldStats
+from app.models.announcement import AnnouncementCreate, AnnouncementJob
+from app.models.export import ExportCreate, ExportJob
+from app.models.audit import AuditEvent, AuditStats
+from app.models.profile import ProfileSummary
+from app.models.ticket import Roster, CheckInSync, CheckInSyncResult
+from app.utils.audit import audit, audit_stats, changes_between
 from app.utils.auth import get_admin_user
 from app.utils.db import (
     workshops_collection, 
     registrations_collection, 
+    audit_log_collection,
     users_collection,
-    testimonials_collection
+    testimonials_collection,
+    registrations_archive_collection,
+    with_user_search_fields
 )
+from app.utils.archive import (
+    ARCHIVE_FORMATS, archive_completed_workshops, file_archived_workshops, iter_archived_registrations, matches_filter
+)
+from app.utils.announcements import announcement_jobs, create_job, run_announcement
+from app.utils.seat_holds import seat_hold_stats, active_holds
+from app.utils import exports
+from app.utils.profiling import list_profiles, load_profile, profile_path
+from app.utils.tickets import workshop_public_key, sync_check_ins
+from app.utils.rollups import ROLLUP_DIMENSIONS, ROLLUP_PERIODS, query_rollups, daily_series, truncate_to_period
 
 router = APIRouter()
 
+# Fields never sent to the admin user directory
+USER_DIRECTORY_PROJECTION = {"password": 0, "search_name": 0, "search_email": 0}
+
+# Joins a registration's workshop_id (stored as a string) to its workshop title
+WORKSHOP_TITLE_LOOKUP = {
+    "$lookup": {
+        "from": workshops_collection.name,
+        "let": {"wid": {"$convert": {"input": "$workshop_id", "to": "objectId", "onError": None, "onNull": None}}},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$_id", "$$wid"]}}},
+            {"$project": {"_id": 0, "title": 1}},
+        ],
+        "as": "workshop",
+    }
+}
+
 @router.get("/dashboard", response_model=Dict[str, Any])
 async def admin_dashboard(current_user: User = Depends(get_admin_user)):
     """
@@ -35,23 +73,10 @@ async def admin_dashboard(current_user: User = Depends(get_admin_user)):
         "registration_status": "pending"
     })
     
-    # Get registration counts for last 7 days
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    daily_registrations = []
-    
-    for i in range(7):
-        date = seven_days_ago + timedelta(days=i)
-        next_date = date + timedelta(days=1)
-        count = await registrations_collection.count_documents({
-            "created_at": {
-                "$gte": date,
-                "$lt": next_date
-            }
-        })
-        daily_registrations.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "count": count
-        })
+    # Get registration counts for last 7 days from the daily rollups
+    seven_days_ago = truncate_to_period(datetime.utcnow(), "day") - timedelta(days=6)
+    rows = await query_rollups(seven_days_ago, seven_days_ago + timedelta(days=7))
+    daily_registrations = daily_series(rows, seven_days_ago, 7)
     
     return {
         "total_workshops": total_workshops,
@@ -62,17 +87,190 @@ async def admin_dashboard(current_user: User = Depends(get_admin_user)):
         "daily_registrations": daily_registrations
     }
 
-@router.get("/users", response_model=List[User])
-async def admin_get_users(current_user: User = Depends(get_admin_user)):
+@router.get("/analytics/registrations", response_model=List[Dict[str, Any]])
+async def registration_analytics(
+    start: datetime,
+    end: Optional[datetime] = None,
+    period: str = "day",
+    group_by: List[str] = Query(default=[]),
+    workshop_id: Optional[str] = None,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Registration counts over an arbitrary date range, served from the rollups
+    """
+    if period not in ROLLUP_PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(ROLLUP_PERIODS)}")
+    
+    invalid = [d for d in group_by if d not in ROLLUP_DIMENSIONS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Cannot group by: {', '.join(invalid)}")
+    
+    end = end or datetime.utcnow()
+    return await query_rollups(
+        truncate_to_period(start, period),
+        end,
+        period=period,
+        group_by=group_by,
+        workshop_id=workshop_id
+    )
+
+@router.get("/slow-queries", response_model=Dict[str, Any])
+async def slow_query_report(current_user: User = Depends(get_admin_user)):
+    """
+    Slow Mongo commands grouped by query shape and route (requires SLOW_QUERY_MS)
+    """
+    from app.utils import db_monitoring
+    
+    if db_monitoring.slow_query_detector is None:
+        raise HTTPException(status_code=404, detail="Slow-query detection is not enabled")
+    return db_monitoring.slow_query_detector.report()
+
+@router.get("/seat-holds/stats", response_model=SeatHoldStats)
+async def get_seat_hold_stats(current_user: User = Depends(get_admin_user)):
+    """
+    Seat holds created, expired and converted by this worker, and holds active now
+    """
+    return seat_hold_stats.model_copy(update={"active": await active_holds()})
+
+@router.get("/single-flight/stats", response_model=Dict[str, Any])
+async def get_single_flight_stats(current_user: User = Depends(get_admin_user)):
+    """
+    Per-route counts of catalogue reads this worker executed and coalesced
+    """
+    from app.utils.single_flight import single_flight_stats
+    
+    return single_flight_stats.report()
+
+@router.get("/audit", response_model=List[AuditEvent])
+async def get_audit_events(
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    actor_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Audit events for an entity or actor in a time range, newest first.
+    Page back by passing the oldest `at` returned as `until`.
+    """
+    if entity_id and not entity_type:
+        raise HTTPException(status_code=400, detail="entity_id needs entity_type")
+    
+    query: Dict[str, Any] = {}
+    if entity_type:
+        query["entity_type"] = entity_type
+    if entity_id:
+        query["entity_id"] = entity_id
+    if actor_id:
+        query["actor_id"] = actor_id
+    if since or until:
+        query["at"] = {}
+        if since:
+            query["at"]["$gte"] = since
+        if until:
+            query["at"]["$lt"] = until
+    
+    events = await audit_log_collection.find(query).sort("at", -1).limit(limit).to_list(None)
+    for event in events:
+        event["_id"] = str(event["_id"])
+    return events
+
+@router.get("/audit/stats", response_model=AuditStats)
+async def get_audit_stats(current_user: User = Depends(get_admin_user)):
+    """
+    Counters of this worker's audit journal writer
+    """
+    return audit_stats
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def get_profiles(current_user: User = Depends(get_admin_user)):
     """
-    Get all users for admin management
+    Saved request profiles, newest first
     """
-    users = await users_collection.find().to_list(1000)
+    return await asyncio.to_thread(list_profiles)
 
-    for user in users:
-        user["_id"]=str(user["_id"])
+@router.get("/profiles/{profile_id}", response_model=ProfileSummary)
+async def get_profile(profile_id: str, current_user: User = Depends(get_admin_user)):
+    """
+    Summary of one request profile, with its Mongo and SMTP timings
+    """
+    profile = await asyncio.to_thread(load_profile, profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
 
-    return users
+@router.get("/profiles/{profile_id}/download")
+async def download_profile(profile_id: str, current_user: User = Depends(get_admin_user)):
+    """
+    Folded stacks of a request profile, for flamegraph.pl or speedscope
+    """
+    profile = await asyncio.to_thread(load_profile, profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(profile_path(profile_id, "folded"), media_type="text/plain", filename=f"profile_{profile_id}.folded")
+
+@router.get("/users", response_model=UserPage)
+async def admin_get_users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    grade: Optional[int] = None,
+    school: Optional[str] = None,
+    search: Optional[str] = None,
+    match: str = Query("prefix", pattern="^(prefix|contains)$"),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Filtered, searchable and paginated user directory for admin management
+    """
+    query = {}
+    if role:
+        query["role"] = role
+    if is_active is not None:
+        query["is_active"] = is_active
+    if grade is not None:
+        query["grade"] = grade
+    if school:
+        query["school"] = school
+    if search:
+        # Anchored patterns on the lowercase fields are served from their indexes;
+        # "contains" scans index keys rather than whole documents
+        pattern = re.escape(search.strip().lower())
+        if match == "prefix":
+            pattern = "^" + pattern
+        query["$or"] = [
+            {"search_name": {"$regex": pattern}},
+            {"search_email": {"$regex": pattern}},
+        ]
+    
+    # Page and total count in one round trip
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "items": [
+                {"$sort": {"created_at": -1}},
+                {"$skip": skip},
+                {"$limit": limit},
+                {"$project": USER_DIRECTORY_PROJECTION},
+            ],
+            "total": [{"$count": "count"}],
+        }},
+    ]
+    result = (await users_collection.aggregate(pipeline).to_list(1))[0]
+    
+    for user in result["items"]:
+        user["_id"] = str(user["_id"])
+    
+    return {
+        "items": result["items"],
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "skip": skip,
+        "limit": limit
+    }
 
 @router.put("/users/{user_id}", response_model=User)
 async def admin_update_user(user_id: str, user_update: UserUpdate, current_user: User = Depends(get_admin_user)):
@@ -99,6 +297,8 @@ async def admin_update_user(user_id: str, user_update: UserUpdate, current_user:
     
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
+    changes = changes_between(user, update_data)
+    with_user_search_fields(update_data)
     
     # Update user
     result = await users_collection.update_one(
@@ -110,22 +310,166 @@ async def admin_update_user(user_id: str, user_update: UserUpdate, current_user:
     if not result:
         raise HTTPException(status_code=400, detail="User update failed")
     
+    if changes:
+        await audit("user", user_obj_id, "updated", current_user, changes)
+    
     # Get updated user
-    updated_user = await users_collection.find_one({"_id": user_obj_id})
+    updated_user = await users_collection.find_one({"_id": user_obj_id}, USER_DIRECTORY_PROJECTION)
 
     updated_user["_id"] = str(updated_user["_id"])
 
     return updated_user
 
-@router.get("/registrations", response_model=List[Registration])
-async def admin_get_registrations(current_user: User = Depends(get_admin_user)):
+def created_at_key(registration):
+    return registration.get("created_at") or datetime.min
+
+@router.get("/registrations", response_model=RegistrationPage)
+async def admin_get_registrations(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    workshop_id: Optional[str] = None,
+    registration_status: Optional[str] = None,
+    payment_status: Optional[str] = None,
+    grade: Optional[int] = None,
+    school: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
     """
-    Get all registrations for admin management
+    Filtered page of registrations with status and workshop facet counts,
+    optionally including archived registrations, whether they were moved to
+    the archive collection or to ndjson files
     """
-    registrations = await registrations_collection.find().to_list(1000)
-    for registration in registrations:
-        registration["_id"]=str(registration["_id"])
-    return registrations
+    base = {}
+    if grade is not None:
+        base["grade"] = grade
+    if school:
+        base["school"] = school
+    if created_from or created_to:
+        base["created_at"] = {}
+        if created_from:
+            base["created_at"]["$gte"] = created_from
+        if created_to:
+            base["created_at"]["$lt"] = created_to
+    
+    faceted = {
+        "workshop_id": workshop_id,
+        "registration_status": registration_status,
+        "payment_status": payment_status,
+    }
+    faceted = {k: v for k, v in faceted.items() if v}
+    query = {**base, **faceted}
+    
+    collections = [registrations_collection]
+    file_workshops = []
+    if include_archived:
+        collections.append(registrations_archive_collection)
+        # Workshops archived to files are scanned from disk; slow, but only on request
+        file_workshops = await file_archived_workshops([workshop_id] if workshop_id else None)
+    
+    # Every query leads with an indexed $match; only the page itself is sorted and joined
+    items_pipeline = [{"$match": query}, {"$sort": {"created_at": -1}}]
+    if include_archived:
+        # Each side contributes at most skip + limit rows before the merged sort
+        items_pipeline += [
+            {"$limit": skip + limit},
+            {"$unionWith": {
+                "coll": registrations_archive_collection.name,
+                "pipeline": [{"$match": query}, {"$sort": {"created_at": -1}}, {"$limit": skip + limit}],
+            }},
+            {"$sort": {"created_at": -1}},
+        ]
+    if file_workshops:
+        # Merged with the file rows below, so the page is cut afterwards
+        items_pipeline += [{"$limit": skip + limit}, WORKSHOP_TITLE_LOOKUP]
+    else:
+        items_pipeline += [{"$skip": skip}, {"$limit": limit}, WORKSHOP_TITLE_LOOKUP]
+    
+    def facet_match(field):
+        # Each facet ignores its own filter so the counts show what selecting it would give
+        return {**base, **{k: v for k, v in faceted.items() if k != field}}
+    
+    async def count_by(field):
+        counts: Dict[str, int] = {}
+        for collection in collections:
+            async for group in collection.aggregate([
+                {"$match": facet_match(field)},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            ]):
+                if group["_id"]:
+                    counts[group["_id"]] = counts.get(group["_id"], 0) + group["count"]
+        return counts
+    
+    async def scan_files():
+        # One pass over the files keeps only the newest skip + limit matches
+        rows, total = [], 0
+        counts: Dict[str, Dict[str, int]] = {"registration_status": {}, "payment_status": {}, "workshop_id": {}}
+        for workshop in file_workshops:
+            async for registration in iter_archived_registrations(workshop):
+                if matches_filter(registration, query):
+                    total += 1
+                    registration["workshop_title"] = workshop.get("title")
+                    rows.append(registration)
+                    if len(rows) > 2 * (skip + limit):
+                        rows = heapq.nlargest(skip + limit, rows, key=created_at_key)
+                for field, field_counts in counts.items():
+                    value = registration.get(field)
+                    if value and matches_filter(registration, facet_match(field)):
+                        field_counts[value] = field_counts.get(value, 0) + 1
+        return heapq.nlargest(skip + limit, rows, key=created_at_key), total, counts
+    
+    async def no_files():
+        return [], 0, {}
+    
+    page, totals, status_counts, payment_counts, workshop_counts, (file_rows, file_total, file_counts) = await asyncio.gather(
+        registrations_collection.aggregate(items_pipeline).to_list(None),
+        asyncio.gather(*(collection.count_documents(query) for collection in collections)),
+        count_by("registration_status"),
+        count_by("payment_status"),
+        count_by("workshop_id"),
+        scan_files() if file_workshops else no_files(),
+    )
+    for counts, field in ((status_counts, "registration_status"), (payment_counts, "payment_status"), (workshop_counts, "workshop_id")):
+        for value, count in file_counts.get(field, {}).items():
+            counts[value] = counts.get(value, 0) + count
+    
+    workshop_titles = {}
+    if workshop_counts:
+        workshop_titles = {
+            str(w["_id"]): w["title"]
+            async for w in workshops_collection.find(
+                {"_id": {"$in": [ObjectId(w) for w in workshop_counts if ObjectId.is_valid(w)]}},
+                {"title": 1}
+            )
+        }
+    
+    items = []
+    for registration in page:
+        registration["_id"] = str(registration["_id"])
+        workshop = registration.pop("workshop", [])
+        registration["workshop_title"] = workshop[0]["title"] if workshop else None
+        items.append(registration)
+    if file_workshops:
+        for registration in file_rows:
+            registration["_id"] = str(registration["_id"])
+        items = sorted(items + file_rows, key=created_at_key, reverse=True)[skip:skip + limit]
+    
+    return {
+        "items": items,
+        "total": sum(totals) + file_total,
+        "skip": skip,
+        "limit": limit,
+        "facets": {
+            "registration_status": status_counts,
+            "payment_status": payment_counts,
+            "workshops": [
+                {"workshop_id": wid, "workshop_title": workshop_titles.get(wid), "count": count}
+                for wid, count in sorted(workshop_counts.items(), key=lambda item: item[1], reverse=True)
+            ],
+        }
+    }
 
 @router.post("/export/registrations/{workshop_id}")
 async def export_workshop_registrations(workshop_id: str, current_user: User = Depends(get_admin_user)):
@@ -140,10 +484,13 @@ async def export_workshop_registrations(workshop_id: str, current_user: User = D
     if not workshop:
         raise HTTPException(status_code=404, detail="Workshop not found")
     
-    # Get all registrations for this workshop
-    registrations = await registrations_collection.find(
-        {"workshop_id": workshop_id}
-    ).to_list(1000)
+    # Get all registrations for this workshop, from the archive once it has been archived
+    if workshop.get("archived_at"):
+        registrations = [reg async for reg in iter_archived_registrations(workshop)]
+    else:
+        registrations = await registrations_collection.find(
+            {"workshop_id": workshop_id}
+        ).to_list(1000)
     
     if not registrations:
         raise HTTPException(status_code=404, detail="No registrations found for this workshop")
@@ -163,4 +510,182 @@ async def export_workshop_registrations(workshop_id: str, current_user: User = D
         "filename": f"workshop_{workshop_id}_registrations.csv",
         "content": csv_content,
         "workshop_title": workshop["title"]
-    }
\ No newline at end of file
+    }
+
+@router.post("/exports", response_model=ExportJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    export: ExportCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Export registrations across workshops, joined with user and workshop fields,
+    to a compressed CSV or Parquet file in the background
+    """
+    if export.format not in exports.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(exports.EXPORT_FORMATS)}")
+    if export.format == "parquet" and not exports.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet exports need pyarrow installed on the server")
+    
+    job = await exports.create_job(export, current_user.email)
+    background_tasks.add_task(exports.run_export, job, export)
+    return job
+
+@router.get("/exports", response_model=List[ExportJob])
+async def get_export_jobs(current_user: User = Depends(get_admin_user)):
+    """
+    Export jobs, newest first
+    """
+    return await exports.export_jobs.list()
+
+@router.get("/exports/{job_id}", response_model=ExportJob)
+async def get_export_job(job_id: str, current_user: User = Depends(get_admin_user)):
+    """
+    Progress of an export job
+    """
+    job = await exports.export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+@router.get("/exports/{job_id}/download")
+async def download_export(job_id: str, current_user: User = Depends(get_admin_user)):
+    """
+    Download the file of a completed export job
+    """
+    job = await exports.export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    
+    media_type = "application/gzip" if job.format == "csv" else "application/vnd.apache.parquet"
+    return FileResponse(exports.export_file_path(job), media_type=media_type, filename=job.filename)
+
+@router.post("/workshops/{workshop_id}/announcements", response_model=AnnouncementJob, status_code=status.HTTP_202_ACCEPTED)
+async def send_workshop_announcement(
+    workshop_id: str,
+    announcement: AnnouncementCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Email an announcement to every registrant of a workshop in the background
+    """
+    try:
+        workshop = await workshops_collection.find_one({"_id": ObjectId(workshop_id)})
+    except:
+        raise HTTPException(status_code=404, detail="Invalid workshop ID")
+    
+    if not workshop:
+        raise HTTPException(status_code=404, detail="Workshop not found")
+    
+    job = await create_job(workshop_id, announcement.subject)
+    background_tasks.add_task(
+        run_announcement,
+        job,
+        workshop,
+        announcement.message,
+        announcement.registration_status
+    )
+    return job
+
+@router.get("/announcements/{job_id}", response_model=AnnouncementJob)
+async def get_announcement_job(job_id: str, current_user: User = Depends(get_admin_user)):
+    """
+    Progress of a bulk announcement
+    """
+    job = await announcement_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Announcement job not found")
+    return job
+
+@router.get("/workshops/{workshop_id}/roster", response_model=Roster)
+async def get_workshop_roster(workshop_id: str, response: Response, current_user: User = Depends(get_admin_user)):
+    """
+    Snapshot of a workshop's approved registrations and the key that verifies
+    their tickets, for check-in devices to work from without a connection.
+    A ticket is accepted offline when its signature verifies and its
+    registration is on the roster.
+    """
+    try:
+        workshop = await workshops_collection.find_one(
+            {"_id": ObjectId(workshop_id)},
+            {"title": 1, "start_date": 1}
+        )
+    except:
+        raise HTTPException(status_code=404, detail="Invalid workshop ID")
+    
+    if not workshop:
+        raise HTTPException(status_code=404, detail="Workshop not found")
+    
+    registrations = await registrations_collection.find(
+        {"workshop_id": workshop_id, "registration_status": "approved"},
+        {"full_name": 1, "grade": 1, "school": 1, "checked_in_at": 1}
+    ).sort("full_name", 1).to_list(None)
+    
+    response.headers["Content-Disposition"] = f'attachment; filename="workshop_{workshop_id}_roster.json"'
+    return {
+        "workshop_id": workshop_id,
+        "workshop_title": workshop["title"],
+        "start_date": workshop["start_date"],
+        "generated_at": datetime.utcnow(),
+        "verify_key": workshop_public_key(workshop_id).hex(),
+        "entries": [
+            {
+                "registration_id": str(reg["_id"]),
+                "full_name": reg["full_name"],
+                "grade": reg["grade"],
+                "school": reg["school"],
+                "checked_in_at": reg.get("checked_in_at"),
+            }
+            for reg in registrations
+        ],
+    }
+
+@router.post("/workshops/{workshop_id}/check-ins", response_model=CheckInSyncResult)
+async def sync_workshop_check_ins(
+    workshop_id: str,
+    sync: CheckInSync,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Apply check-ins recorded offline at the venue in one write
+    """
+    if not ObjectId.is_valid(workshop_id):
+        raise HTTPException(status_code=404, detail="Invalid workshop ID")
+    
+    return await sync_check_ins(
+        workshop_id,
+        [(check_in.ticket, check_in.checked_in_at) for check_in in sync.check_ins]
+    )
+
+@router.post("/archive", status_code=status.HTTP_202_ACCEPTED)
+async def run_archival(
+    background_tasks: BackgroundTasks,
+    older_than_days: Optional[int] = Query(None, ge=0),
+    archive_format: str = "collection",
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Move registrations of completed workshops past the cutoff out of the hot collection
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"archive_format must be one of {', '.join(ARCHIVE_FORMATS)}")
+    
+    background_tasks.add_task(archive_completed_workshops, older_than_days, archive_format)
+    return {"message": "Archival started"}
+
+@router.get("/archive", response_model=List[Dict[str, Any]])
+async def get_archived_workshops(current_user: User = Depends(get_admin_user)):
+    """
+    Summaries left behind for archived workshops
+    """
+    workshops = await workshops_collection.find(
+        {"archived_at": {"$exists": True}},
+        {"title": 1, "end_date": 1, "archived_at": 1, "archive_format": 1, "archive_summary": 1}
+    ).sort("archived_at", -1).to_list(None)
+    
+    for workshop in workshops:
+        workshop["_id"] = str(workshop["_id"])
+    return workshops
@@ -1,23 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from typing import List, Dict
 from datetime import datetime
+import hashlib
+import hmac
 import random
 import string
 from app.models.user import UserCreate, User, Token, LoginCredentials
+from app.config import get_settings
+from app.utils.audit import audit
 from app.utils.auth import (
     authenticate_user, create_access_token, get_password_hash,
-    ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user, verify_password
+    get_current_user, verify_password
+)
+from app.utils.db import (
+    users_collection, password_reset_otps_collection, parse_mongo_doc, serialize_id, with_user_search_fields
 )
-from app.utils.db import users_collection, parse_mongo_doc, serialize_id
 from app.utils.email import send_password_reset, send_otp_email
+from app.utils.rate_limit import limit_by_ip_and_email, login_limits, otp_limits
 from pydantic import BaseModel, EmailStr
 
 router = APIRouter()
 
-# Store OTPs with expiry time (in-memory storage - in production use Redis)
-otp_store = {}
+# OTPs live in Mongo (hashed, expired by a TTL index) so any worker can check them
+def hash_otp(email: str, otp: str) -> str:
+    return hashlib.sha256(f"{email.lower()}:{otp}".encode()).hexdigest()
 
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
@@ -47,6 +55,7 @@ async def register_user(user: UserCreate):
     user_dict = user.model_dump()
     user_dict["password"] = hashed_password
     user_dict["created_at"] = datetime.utcnow()  # Set the current UTC datetime
+    with_user_search_fields(user_dict)
     
     new_user = await users_collection.insert_one(user_dict)
     created_user = await users_collection.find_one({"_id": new_user.inserted_id})
@@ -58,7 +67,10 @@ async def register_user(user: UserCreate):
     return created_user
 
 @router.post("/auth/login", response_model=Token)
-async def login(credentials: LoginCredentials):
+async def login(credentials: LoginCredentials, request: Request, include_user: bool = False):
+    # Throttled before bcrypt runs
+    await limit_by_ip_and_email(request, login_limits(), credentials.email)
+    
     user = await authenticate_user(credentials.email, credentials.password)
     if not user:
         raise HTTPException(
@@ -68,20 +80,27 @@ async def login(credentials: LoginCredentials):
         )
     
     # Create access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(minutes=get_settings().jwt_expires_minutes)
     access_token = create_access_token(
         data={"sub": user.email, "role": user.role},
         expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    token = {"access_token": access_token, "token_type": "bearer"}
+    if include_user:
+        # Saves the client a GET /auth/me straight after logging in
+        token["user"] = user.model_dump(by_alias=True)
+    return token
 
 @router.get("/auth/me", response_model=User)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.post("/auth/forgot-password", status_code=status.HTTP_200_OK)
-async def forgot_password(request: ForgotPasswordRequest):
+async def forgot_password(request: ForgotPasswordRequest, http_request: Request):
+    # Throttled before an OTP is generated and emailed
+    await limit_by_ip_and_email(http_request, otp_limits(), request.email)
+    
     # Check if user exists
     user = await users_collection.find_one({"email": request.email})
     if not user:
@@ -93,7 +112,11 @@ async def forgot_password(request: ForgotPasswordRequest):
     
     # Store OTP with expiry (30 minutes)
     expiry_time = datetime.utcnow() + timedelta(minutes=30)
-    otp_store[request.email] = {"otp": otp, "expiry": expiry_time}
+    await password_reset_otps_collection.replace_one(
+        {"_id": request.email},
+        {"otp_hash": hash_otp(request.email, otp), "expires_at": expiry_time},
+        upsert=True
+    )
     
     # Send OTP email
     await send_otp_email(request.email, user["full_name"], otp)
@@ -101,24 +124,27 @@ async def forgot_password(request: ForgotPasswordRequest):
     return {"message": "Password reset OTP has been sent to your email"}
 
 @router.post("/auth/reset-password", status_code=status.HTTP_200_OK)
-async def reset_password(request: ResetPasswordRequest):
+async def reset_password(request: ResetPasswordRequest, http_request: Request):
+    # OTP guesses share the login limits
+    await limit_by_ip_and_email(http_request, login_limits(), request.email)
+    
     # Check if OTP exists and is valid
-    if request.email not in otp_store:
+    otp_data = await password_reset_otps_collection.find_one({"_id": request.email})
+    if not otp_data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired OTP. Please request a new one."
         )
     
-    otp_data = otp_store[request.email]
-    if otp_data["expiry"] < datetime.utcnow():
-        # Remove expired OTP
-        del otp_store[request.email]
+    if otp_data["expires_at"] < datetime.utcnow():
+        # Remove expired OTP (the TTL monitor only runs once a minute)
+        await password_reset_otps_collection.delete_one({"_id": request.email})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="OTP has expired. Please request a new one."
         )
     
-    if otp_data["otp"] != request.otp:
+    if not hmac.compare_digest(otp_data["otp_hash"], hash_otp(request.email, request.otp)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid OTP"
@@ -138,7 +164,10 @@ async def reset_password(request: ResetPasswordRequest):
         )
     
     # Clear OTP
-    del otp_store[request.email]
+    await password_reset_otps_collection.delete_one({"_id": request.email})
+    
+    user = await users_collection.find_one({"email": request.email}, {"_id": 1})
+    await audit("user", user["_id"], "password_reset")
     
     return {"message": "Password has been reset successfully"}
 
@@ -172,4 +201,6 @@ async def change_password(request: ChangePasswordRequest, current_user: User = D
             detail="Password update failed"
         )
     
+    await audit("user", current_user.id, "password_changed", current_user)
+    
     return {"message": "Password updated successfully"}
\ No newline at end of file
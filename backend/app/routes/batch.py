@@ -0,0 +1,97 @@
+import asyncio
+import json
+from typing import Any, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.security import OAuth2PasswordBearer
+
+from app.models.batch import BatchRequest, BatchRequestItem, BatchResponse
+from app.utils.auth import get_current_user
+
+router = APIRouter()
+
+# Most reads one batch may carry
+MAX_BATCH_SIZE = 20
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
+
+
+def _split_path(item: BatchRequestItem) -> Tuple[str, str]:
+    parts = urlsplit(item.path)
+    if parts.scheme or parts.netloc or not parts.path.startswith("/api/") or parts.path.startswith("/api/batch"):
+        raise HTTPException(status_code=400, detail=f"Batch paths must be API paths: {item.path}")
+    query = parts.query
+    if item.params:
+        extra = urlencode(item.params, doseq=True)
+        query = f"{query}&{extra}" if query else extra
+    return parts.path, query
+
+
+async def _get(request: Request, path: str, query: str, authenticated: Optional[tuple]) -> Tuple[int, Any]:
+    """Run one GET through the full app (middleware included) without a network hop"""
+    headers = [(b"accept", b"application/json")]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode("latin-1")))
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": {"authenticated": authenticated} if authenticated else {},
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    response_status = 500
+    chunks = []
+
+    async def send(message):
+        nonlocal response_status
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await request.app(scope, receive, send)
+    body = b"".join(chunks)
+    try:
+        return response_status, json.loads(body) if body else None
+    except ValueError:
+        return response_status, body.decode("utf-8", "replace")
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch(batch_request: BatchRequest, request: Request):
+    """
+    Run several read-only GETs in one round trip. The caller is authenticated
+    once and the reads run concurrently; each keeps its own status and body.
+    """
+    if not batch_request.requests:
+        return {"responses": []}
+    if len(batch_request.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {MAX_BATCH_SIZE} requests")
+    targets = [_split_path(item) for item in batch_request.requests]
+
+    authenticated = None
+    token = await optional_oauth2_scheme(request)
+    if token:
+        authenticated = (token, await get_current_user(request, token))
+
+    results = await asyncio.gather(*(_get(request, path, query, authenticated) for path, query in targets))
+    return {
+        "responses": [
+            {"id": item.id, "status": response_status, "body": body}
+            for item, (response_status, body) in zip(batch_request.requests, results)
+        ]
+    }
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from pydantic import ValidationError
+
+from app.models.payment import PaymentEvent, PaymentStats
+from app.models.user import User
+from app.utils.auth import get_admin_user
+from app.utils.payments import verify_signature, enqueue_event, payment_stats
+
+router = APIRouter()
+
+@router.post("/payments/webhook", status_code=status.HTTP_202_ACCEPTED)
+async def payment_webhook(request: Request):
+    """
+    Payment gateway callback. Verifies the HMAC signature and queues the event;
+    status updates are applied in batches in the background.
+    """
+    body = await request.body()
+    if not verify_signature(body, request.headers.get("x-signature")):
+        payment_stats.rejected += 1
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+    
+    try:
+        event = PaymentEvent.model_validate_json(body)
+    except ValidationError:
+        payment_stats.rejected += 1
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payment event")
+    
+    if not enqueue_event(event):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment queue is full",
+            headers={"Retry-After": "5"}
+        )
+    
+    return {"received": True}
+
+@router.get("/admin/payments/stats", response_model=PaymentStats)
+async def get_payment_stats(current_user: User = Depends(get_admin_user)):
+    return payment_stats
@@ -4,15 +4,22 @@ from bson import ObjectId
 from datetime import datetime
 
 from app.models.registration import Registration, RegistrationCreate, RegistrationUpdate
+from app.models.ticket import Ticket
 from app.models.user import User
-from app.utils.auth import get_current_user, get_admin_user
+from app.utils.audit import audit, changes_between
+from app.utils.auth import get_current_user, get_admin_user, get_optional_user
 from app.utils.db import registrations_collection, workshops_collection, users_collection
 from app.utils.email import send_registration_confirmation, send_registration_approval
+from app.utils.rollups import record_registration, record_status_change
+from app.utils.tickets import issue_ticket, with_ticket
+from app.utils.seat_holds import (
+    EXPIRED_STATUS, reserve_seat, release_seat, hold_expiry, record_hold_created, convert_holds, restore_expired
+)
 
 router = APIRouter()
 
 @router.post("/registrations", response_model=Registration)
-async def create_registration(registration: RegistrationCreate):
+async def create_registration(registration: RegistrationCreate, current_user: Optional[User] = Depends(get_optional_user)):
     # Validate workshop exists and is open for registration
     try:
         workshop = await workshops_collection.find_one({"_id": ObjectId(registration.workshop_id)})
@@ -28,18 +35,13 @@ async def create_registration(registration: RegistrationCreate):
     if workshop["status"] not in ["upcoming", "ongoing"]:
         raise HTTPException(status_code=400, detail="Workshop is not open for registration")
     
-    if workshop["registered_count"] >= workshop["max_participants"]:
-        raise HTTPException(status_code=400, detail="Workshop is already full")
-    
-    current_user = 0
+    user_id = str(current_user.id) if current_user else None
     # If user is logged in, use their data
     if current_user:
-        registration.user_id = str(current_user.id)
-        
         # Check if user already registered
         existing_reg = await registrations_collection.find_one({
             "workshop_id": registration.workshop_id,
-            "user_id": registration.user_id
+            "user_id": user_id
         })
         
         if existing_reg:
@@ -60,20 +62,33 @@ async def create_registration(registration: RegistrationCreate):
                 detail="This email is already registered for this workshop"
             )
     
+    # Take the seat before creating the registration so the workshop can't be overbooked
+    if not await reserve_seat(registration.workshop_id):
+        raise HTTPException(status_code=400, detail="Workshop is already full")
+    
     # Create registration
     registration_dict = registration.dict()
     registration_dict["created_at"] = datetime.utcnow()
     
-    # Set additional fields
+    # Set additional fields; statuses only change through admins and the payment gateway
+    registration_dict["user_id"] = user_id
+    registration_dict["payment_status"] = "pending"
+    registration_dict["registration_status"] = "pending"
     registration_dict["amount_paid"] = workshop["fee"]
     
-    result = await registrations_collection.insert_one(registration_dict)
+    # Unpaid registrations only hold their seat for a while
+    hold_expires_at = hold_expiry(workshop, registration_dict["created_at"])
+    if hold_expires_at:
+        registration_dict["hold_expires_at"] = hold_expires_at
     
-    # Update workshop registration count
-    await workshops_collection.update_one(
-        {"_id": ObjectId(registration.workshop_id)},
-        {"$inc": {"registered_count": 1}}
-    )
+    try:
+        result = await registrations_collection.insert_one(registration_dict)
+    except Exception:
+        await release_seat(registration.workshop_id)
+        raise
+    if "hold_expires_at" in registration_dict:
+        record_hold_created()
+    await record_registration(registration_dict)
     
     # Send confirmation email
     await send_registration_confirmation(
@@ -100,6 +115,7 @@ async def get_my_registrations(current_user: User = Depends(get_current_user)):
     
     for registration in registrations:
         registration["_id"] = str(registration["_id"])
+        with_ticket(registration)
 
     return registrations
 
@@ -120,7 +136,38 @@ async def get_registration(registration_id: str, current_user: User = Depends(ge
     ):
         raise HTTPException(status_code=403, detail="Not authorized to view this registration")
     
-    return registration
+    return with_ticket(registration)
+
+@router.get("/registrations/{registration_id}/ticket", response_model=Ticket)
+async def get_registration_ticket(registration_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Check-in ticket of an approved registration, verifiable offline at the venue
+    """
+    try:
+        registration = await registrations_collection.find_one(
+            {"_id": ObjectId(registration_id)},
+            {"user_id": 1, "workshop_id": 1, "registration_status": 1}
+        )
+    except:
+        raise HTTPException(status_code=404, detail="Invalid registration ID")
+    
+    if not registration:
+        raise HTTPException(status_code=404, detail="Registration not found")
+    
+    if current_user.role != "admin" and (
+        not registration.get("user_id") or 
+        str(registration.get("user_id")) != str(current_user.id)
+    ):
+        raise HTTPException(status_code=403, detail="Not authorized to view this registration")
+    
+    if registration.get("registration_status") != "approved":
+        raise HTTPException(status_code=409, detail="Tickets are issued once a registration is approved")
+    
+    return {
+        "registration_id": registration_id,
+        "workshop_id": registration["workshop_id"],
+        "ticket": issue_ticket(registration_id, registration["workshop_id"]),
+    }
 
 @router.put("/registrations/{registration_id}", response_model=Registration)
 async def update_registration_status(
@@ -141,6 +188,19 @@ async def update_registration_status(
     
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
+    changes = changes_between(registration, update_data)
+    
+    # An expired registration gave its seat back, so bringing it back needs one again
+    restored = None
+    if registration.get("registration_status") == EXPIRED_STATUS:
+        restore_to = update.registration_status or ("pending" if update.payment_status == "completed" else None)
+        if restore_to and restore_to != EXPIRED_STATUS:
+            restored = await restore_expired(registration, restore_to)
+            if restored is False:
+                raise HTTPException(status_code=400, detail="Workshop is already full")
+            if restored:
+                # Its status change is recorded in the rollups already
+                registration["registration_status"] = restore_to
     
     # Update registration
     result = await registrations_collection.update_one(
@@ -148,9 +208,22 @@ async def update_registration_status(
         {"$set": update_data}
     )
     
-    if result.modified_count == 0:
+    if result.modified_count == 0 and not restored:
         raise HTTPException(status_code=404, detail="Registration not updated")
     
+    await audit("registration", registration["_id"], "updated", current_user, changes)
+    
+    if update.registration_status:
+        await record_status_change(
+            registration,
+            registration.get("registration_status", "pending"),
+            update.registration_status
+        )
+    
+    # Paid or approved registrations keep their seat
+    if update.payment_status == "completed" or update.registration_status == "approved":
+        await convert_holds([registration["_id"]])
+    
     # Fetch updated registration
     updated_registration = await registrations_collection.find_one({"_id": ObjectId(registration_id)})
     
@@ -193,8 +266,11 @@ async def cancel_registration(registration_id: str, current_user: User = Depends
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Registration not found")
     
-    # Decrease workshop registration count
-    await workshops_collection.update_one(
-        {"_id": ObjectId(registration["workshop_id"])},
-        {"$inc": {"registered_count": -1}}
-    )
\ No newline at end of file
+    await record_registration(registration, -1)
+    await audit("registration", registration["_id"], "cancelled", current_user, {
+        "registration_status": {"from": registration.get("registration_status"), "to": None}
+    })
+    
+    # Decrease workshop registration count, unless an expired hold already gave the seat back
+    if registration.get("registration_status") != EXPIRED_STATUS:
+        await release_seat(registration["workshop_id"])
\ No newline at end of file
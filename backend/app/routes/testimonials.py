@@ -0,0 +1,92 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from typing import List
+from datetime import datetime
+
+from app.models.testimonial import Testimonial, TestimonialCreate, TestimonialUpdate, TestimonialPage
+from app.models.user import User
+from app.utils.auth import get_admin_user
+from app.utils.db import testimonials_collection, serialize_id, parse_mongo_doc, serialize_list
+from app.utils.feeds import testimonial_feed, select_testimonials
+from app.utils.http_cache import is_not_modified, set_cache_headers, not_modified_response
+
+router = APIRouter()
+
+@router.get("/testimonials", response_model=TestimonialPage)
+async def get_testimonials(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    order: str = Query("latest", pattern="^(latest|featured|random)$")
+):
+    """
+    Visible testimonials, newest first. order=featured keeps only featured
+    ones; order=random returns a random sample of `limit`.
+    """
+    feed = await testimonial_feed.get()
+    page = select_testimonials(feed["testimonials"], order, skip, limit)
+    if order == "random":
+        # Each response is a different sample
+        response.headers["Cache-Control"] = "no-store"
+        return page
+
+    etag = f'{feed["etag"][:-1]}-{order}-{skip}-{limit}"'
+    if is_not_modified(request, etag, feed["last_modified"]):
+        return not_modified_response(etag, feed["last_modified"])
+
+    set_cache_headers(response, etag, feed["last_modified"])
+    return page
+
+@router.get("/admin/testimonials", response_model=List[Testimonial])
+async def admin_get_testimonials(current_user: User = Depends(get_admin_user)):
+    """All testimonials, including hidden ones"""
+    cursor = testimonials_collection.find().sort("created_at", -1)
+    return await serialize_list(cursor)
+
+@router.post("/admin/testimonials", response_model=Testimonial, status_code=status.HTTP_201_CREATED)
+async def create_testimonial(testimonial: TestimonialCreate, current_user: User = Depends(get_admin_user)):
+    testimonial_dict = testimonial.model_dump()
+    testimonial_dict["created_at"] = datetime.utcnow()
+    testimonial_dict["updated_at"] = testimonial_dict["created_at"]
+
+    result = await testimonials_collection.insert_one(testimonial_dict)
+    testimonial_feed.invalidate()
+
+    created_testimonial = await testimonials_collection.find_one({"_id": result.inserted_id})
+    return parse_mongo_doc(created_testimonial)
+
+@router.put("/admin/testimonials/{testimonial_id}", response_model=Testimonial)
+async def update_testimonial(
+    testimonial_id: str,
+    testimonial_update: TestimonialUpdate,
+    current_user: User = Depends(get_admin_user)
+):
+    obj_id = serialize_id(testimonial_id)
+    if not obj_id:
+        raise HTTPException(status_code=404, detail="Invalid testimonial ID")
+
+    update_data = {k: v for k, v in testimonial_update.model_dump().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No valid update data provided")
+    update_data["updated_at"] = datetime.utcnow()
+
+    result = await testimonials_collection.update_one({"_id": obj_id}, {"$set": update_data})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Testimonial not found")
+    testimonial_feed.invalidate()
+
+    updated_testimonial = await testimonials_collection.find_one({"_id": obj_id})
+    return parse_mongo_doc(updated_testimonial)
+
+@router.delete("/admin/testimonials/{testimonial_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_testimonial(testimonial_id: str, current_user: User = Depends(get_admin_user)):
+    obj_id = serialize_id(testimonial_id)
+    if not obj_id:
+        raise HTTPException(status_code=404, detail="Invalid testimonial ID")
+
+    result = await testimonials_collection.delete_one({"_id": obj_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Testimonial not found")
+    testimonial_feed.invalidate()
+
+    return None
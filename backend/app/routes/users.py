@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from typing import List, Optional
 from bson import ObjectId
+from datetime import datetime
 
-from app.models.user import User, UserUpdate
+from app.models.user import User, UserUpdate, UserDashboard
+from app.utils.audit import audit, changes_between
 from app.utils.auth import get_current_user, get_admin_user, get_password_hash
-from app.utils.db import users_collection
+from app.utils.db import users_collection, registrations_collection, workshops_collection, with_user_search_fields
 
 router = APIRouter()
 
@@ -12,6 +14,90 @@ router = APIRouter()
 async def get_user_profile(current_user: User = Depends(get_current_user)):
     return current_user
 
+# Workshop fields shown on dashboard cards
+WORKSHOP_SUMMARY_PROJECTION = {
+    "title": 1,
+    "short_description": 1,
+    "image_url": 1,
+    "images": 1,
+    "start_date": 1,
+    "end_date": 1,
+    "location": 1,
+    "fee": 1,
+    "status": 1,
+}
+
+@router.get("/me/dashboard", response_model=UserDashboard)
+async def get_my_dashboard(
+    registrations_limit: int = Query(100, ge=1, le=500),
+    recommended_limit: int = Query(3, ge=1, le=20),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Everything the user dashboard needs in one aggregation: the user's
+    registrations joined with workshop summaries, plus upcoming workshops
+    open to their grade that they haven't registered for
+    """
+    recommended_match = {
+        "status": "upcoming",
+        "registration_deadline": {"$gt": datetime.utcnow()},
+    }
+    if current_user.grade is not None:
+        recommended_match["eligible_grades"] = current_user.grade
+    
+    pipeline = [
+        {"$match": {"user_id": str(current_user.id)}},
+        {"$sort": {"created_at": -1}},
+        {"$facet": {
+            "registrations": [
+                {"$limit": registrations_limit},
+                {"$lookup": {
+                    "from": workshops_collection.name,
+                    "let": {"wid": {"$convert": {"input": "$workshop_id", "to": "objectId", "onError": None, "onNull": None}}},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$_id", "$$wid"]}}},
+                        {"$project": WORKSHOP_SUMMARY_PROJECTION},
+                    ],
+                    "as": "workshop",
+                }},
+                {"$set": {"workshop": {"$first": "$workshop"}}},
+            ],
+            "registered": [{"$group": {"_id": None, "ids": {"$push": "$workshop_id"}}}],
+        }},
+        # $facet always emits one document, so this runs even with no registrations
+        {"$lookup": {
+            "from": workshops_collection.name,
+            "let": {"registered": {"$ifNull": [{"$first": "$registered.ids"}, []]}},
+            "pipeline": [
+                {"$match": recommended_match},
+                {"$match": {"$expr": {"$not": {"$in": [{"$toString": "$_id"}, "$$registered"]}}}},
+                {"$sort": {"start_date": 1}},
+                {"$limit": recommended_limit},
+                {"$project": WORKSHOP_SUMMARY_PROJECTION},
+            ],
+            "as": "recommended_workshops",
+        }},
+    ]
+    result = (await registrations_collection.aggregate(pipeline).to_list(1))[0]
+    
+    registrations = result["registrations"]
+    for registration in registrations:
+        registration["_id"] = str(registration["_id"])
+        workshop = registration.get("workshop")
+        if workshop:
+            workshop["_id"] = str(workshop["_id"])
+            registration["workshop_title"] = workshop["title"]
+    
+    recommended = result["recommended_workshops"]
+    for workshop in recommended:
+        workshop["_id"] = str(workshop["_id"])
+    
+    return {
+        "user": current_user,
+        "registrations": registrations,
+        "recommended_workshops": recommended
+    }
+
 @router.put("/users/me", response_model=User)
 async def update_user_profile(user_update: UserUpdate, current_user: User = Depends(get_current_user)):
     # Filter out None values
@@ -22,6 +108,8 @@ async def update_user_profile(user_update: UserUpdate, current_user: User = Depe
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No fields to update"
         )
+    changes = changes_between(current_user.model_dump(), update_data)
+    with_user_search_fields(update_data)
     
     # Update user document
     result = await users_collection.update_one(
@@ -35,6 +123,8 @@ async def update_user_profile(user_update: UserUpdate, current_user: User = Depe
             detail="User update failed"
         )
     
+    await audit("user", current_user.id, "updated", current_user, changes)
+    
     # Get updated user
     updated_user = await users_collection.find_one({"_id": ObjectId(current_user.id)})
     return updated_user
@@ -46,7 +136,7 @@ async def get_users(skip: int = 0, limit: int = 100, role: Optional[str] = None,
     if role:
         query["role"] = role
     
-    users = await users_collection.find(query).skip(skip).limit(limit).to_list(limit)
+    users = await users_collection.find(query, {"password": 0}).skip(skip).limit(limit).to_list(limit)
     return users
 
 @router.get("/users/{user_id}", response_model=User)
@@ -1,17 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
 from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime
 
-from app.models.workshop import Workshop, WorkshopCreate, WorkshopUpdate
+from app.config import get_settings
+from app.models.workshop import Workshop, WorkshopCreate, WorkshopUpdate, HomeFeed
 from app.models.user import User
 from app.utils.auth import get_current_user, get_admin_user
 from app.utils.db import workshops_collection, registrations_collection, serialize_id, parse_mongo_doc, serialize_list
+from app.utils.feeds import home_workshops_feed, testimonial_feed, select_testimonials
+from app.utils.images import ImageWorkersUnavailable, images_available, store_workshop_image
+from app.utils.http_cache import compute_etag, last_modified, is_not_modified, set_cache_headers, not_modified_response
 
 router = APIRouter()
 
 @router.get("/workshops", response_model=List[Workshop])
 async def get_workshops(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 20,
     status: Optional[str] = None,
@@ -36,10 +42,45 @@ async def get_workshops(
     # Get workshops
     cursor = workshops_collection.find(query).sort("start_date", 1).skip(skip).limit(limit)
     workshops = await serialize_list(cursor)
+    
+    # Answer revalidations without serializing the list
+    etag = compute_etag(workshops, sorted(request.query_params.multi_items()))
+    modified = last_modified(workshops)
+    if is_not_modified(request, etag, modified):
+        return not_modified_response(etag, modified)
+    
+    set_cache_headers(response, etag, modified)
     return workshops
 
+@router.get("/home", response_model=HomeFeed)
+async def get_home_feed(
+    request: Request,
+    response: Response,
+    testimonials_limit: int = Query(3, ge=0, le=20)
+):
+    """Featured and upcoming workshops plus featured testimonials, served from in-memory feeds"""
+    workshops = await home_workshops_feed.get()
+    testimonials = await testimonial_feed.get()
+    
+    etag = f'"{workshops["etag"][1:-1]}-{testimonials["etag"][1:-1]}-{testimonials_limit}"'
+    modified = max(filter(None, [workshops["last_modified"], testimonials["last_modified"]]), default=None)
+    if is_not_modified(request, etag, modified):
+        return not_modified_response(etag, modified)
+    
+    # Featured testimonials first, topped up with the latest ones
+    featured = select_testimonials(testimonials["testimonials"], "featured", 0, testimonials_limit)["items"]
+    featured_ids = {t["_id"] for t in featured}
+    latest = [t for t in testimonials["testimonials"] if t["_id"] not in featured_ids]
+    
+    set_cache_headers(response, etag, modified)
+    return {
+        "featured_workshops": workshops["featured_workshops"],
+        "upcoming_workshops": workshops["upcoming_workshops"],
+        "testimonials": (featured + latest)[:testimonials_limit]
+    }
+
 @router.get("/workshops/{workshop_id}", response_model=Workshop)
-async def get_workshop(workshop_id: str):
+async def get_workshop(workshop_id: str, request: Request, response: Response):
     obj_id = serialize_id(workshop_id)
     if not obj_id:
         raise HTTPException(status_code=404, detail="Invalid workshop ID")
@@ -49,15 +90,23 @@ async def get_workshop(workshop_id: str):
     if workshop is None:
         raise HTTPException(status_code=404, detail="Workshop not found")
     
+    etag = compute_etag([workshop])
+    modified = last_modified([workshop])
+    if is_not_modified(request, etag, modified):
+        return not_modified_response(etag, modified)
+    
+    set_cache_headers(response, etag, modified)
     return parse_mongo_doc(workshop)
 
 @router.post("/workshops", response_model=Workshop)
 async def create_workshop(workshop: WorkshopCreate, current_user: User = Depends(get_admin_user)):
     workshop_dict = workshop.model_dump()
     workshop_dict["created_at"] = datetime.utcnow()
+    workshop_dict["updated_at"] = workshop_dict["created_at"]
     workshop_dict["registered_count"] = 0
     
     result = await workshops_collection.insert_one(workshop_dict)
+    home_workshops_feed.invalidate()
     created_workshop = await workshops_collection.find_one({"_id": result.inserted_id})
     
     return parse_mongo_doc(created_workshop)
@@ -76,6 +125,7 @@ async def update_workshop(workshop_id: str, workshop_update: WorkshopUpdate, cur
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No fields to update"
         )
+    update_data["updated_at"] = datetime.utcnow()
     
     # Update workshop
     result = await workshops_collection.update_one(
@@ -88,11 +138,77 @@ async def update_workshop(workshop_id: str, workshop_update: WorkshopUpdate, cur
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Workshop not found or no changes made"
         )
+    # A link other than the uploaded hero replaces the upload, whose variants the cards would keep showing
+    if "image_url" in update_data:
+        await workshops_collection.update_one(
+            {"_id": obj_id, "images": {"$exists": True}, "images.hero.url": {"$ne": update_data["image_url"]}},
+            {"$unset": {"images": ""}}
+        )
+    home_workshops_feed.invalidate()
     
     # Get updated workshop
     updated_workshop = await workshops_collection.find_one({"_id": obj_id})
     return parse_mongo_doc(updated_workshop)
 
+# Accepted upload types and the extension their originals are kept under
+IMAGE_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/gif": "gif"}
+
+@router.put("/workshops/{workshop_id}/image", response_model=Workshop)
+async def upload_workshop_image(workshop_id: str, request: Request, current_user: User = Depends(get_admin_user)):
+    """
+    Replace a workshop's image with an upload sent as the raw request body
+    (Content-Type image/jpeg, png, webp or gif). Thumb, card and hero WebP
+    variants are generated and image_url points at the hero.
+    """
+    obj_id = serialize_id(workshop_id)
+    if not obj_id:
+        raise HTTPException(status_code=404, detail="Invalid workshop ID")
+    if not images_available():
+        raise HTTPException(status_code=400, detail="Image uploads need Pillow installed on the server")
+    
+    settings = get_settings()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in IMAGE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be one of {', '.join(IMAGE_TYPES)}"
+        )
+    if int(request.headers.get("content-length") or 0) > settings.image_max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Image is too large")
+    
+    # Checked while reading too, for chunked uploads without a Content-Length
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.image_max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Image is too large")
+        chunks.append(chunk)
+    if not size:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    
+    if not await workshops_collection.find_one({"_id": obj_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Workshop not found")
+    
+    try:
+        images = await store_workshop_image(
+            b"".join(chunks),
+            IMAGE_TYPES[content_type],
+            settings.media_base_url or str(request.base_url)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImageWorkersUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    await workshops_collection.update_one(
+        {"_id": obj_id},
+        {"$set": {"images": images, "image_url": images["hero"]["url"], "updated_at": datetime.utcnow()}}
+    )
+    home_workshops_feed.invalidate()
+    
+    updated_workshop = await workshops_collection.find_one({"_id": obj_id})
+    return parse_mongo_doc(updated_workshop)
+
 @router.delete("/workshops/{workshop_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_workshop(workshop_id: str, current_user: User = Depends(get_admin_user)):
     obj_id = serialize_id(workshop_id)
@@ -104,6 +220,13 @@ async def delete_workshop(workshop_id: str, current_user: User = Depends(get_adm
     if not workshop:
         raise HTTPException(status_code=404, detail="Workshop not found")
     
+    # Archived registrations (in the archive collection or a file) would be orphaned
+    if workshop.get("archived_at"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete an archived workshop"
+        )
+    
     # Check if there are any registrations
     registrations = await registrations_collection.count_documents({"workshop_id": workshop_id})
     if registrations > 0:
@@ -114,5 +237,6 @@ async def delete_workshop(workshop_id: str, current_user: User = Depends(get_adm
     
     # Delete workshop
     result = await workshops_collection.delete_one({"_id": obj_id})
+    home_workshops_feed.invalidate()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Workshop not found")
\ No newline at end of file
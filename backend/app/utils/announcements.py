@@ -0,0 +1,102 @@
+import asyncio
+import html
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.models.announcement import AnnouncementJob
+from app.utils.db import registrations_collection
+from app.utils.jobs import JobStore
+from app.utils.email import (
+    SMTPPool, RateLimiter, build_message, ANNOUNCEMENT_SUBJECT, ANNOUNCEMENT_TEMPLATE
+)
+
+logger = logging.getLogger(__name__)
+
+# Job progress, readable from every worker
+announcement_jobs: JobStore[AnnouncementJob] = JobStore("announcement", AnnouncementJob)
+
+RECIPIENT_PROJECTION = {"email": 1, "full_name": 1}
+
+
+async def create_job(workshop_id: str, subject: str) -> AnnouncementJob:
+    job = AnnouncementJob(id=uuid.uuid4().hex, workshop_id=workshop_id, subject=subject)
+    return await announcement_jobs.add(job)
+
+
+def recipient_query(workshop_id: str, statuses: Optional[List[str]]) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"workshop_id": workshop_id}
+    if statuses:
+        query["registration_status"] = {"$in": statuses}
+    return query
+
+
+async def run_announcement(
+    job: AnnouncementJob,
+    workshop: Dict[str, Any],
+    message: str,
+    statuses: Optional[List[str]] = None,
+):
+    """
+    Stream matching registrations and send one rendered announcement to each,
+    using a pool of persistent SMTP connections behind a shared rate limit
+    """
+    query = recipient_query(job.workshop_id, statuses)
+    pool = SMTPPool()
+    limiter = RateLimiter()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=pool.size * 4)
+
+    # Everything that is the same for every recipient is escaped once
+    shared = {
+        "subject": html.escape(job.subject),
+        "workshop_title": html.escape(workshop["title"]),
+        "workshop_date": workshop["start_date"].strftime("%Y-%m-%d %H:%M"),
+        "location": html.escape(workshop.get("location", "")),
+        "message": html.escape(message).replace("\n", "<br>"),
+    }
+    subject = ANNOUNCEMENT_SUBJECT.substitute(subject=job.subject, workshop_title=workshop["title"])
+
+    async def sender():
+        while True:
+            registration = await queue.get()
+            if registration is None:
+                return
+            # Nothing about one recipient may stop the sender, or the producer would block on a full queue
+            try:
+                content = ANNOUNCEMENT_TEMPLATE.substitute(
+                    shared, user_name=html.escape(registration.get("full_name") or "")
+                )
+                await limiter.wait()
+                await pool.send(build_message(registration["email"], subject, content))
+                job.sent += 1
+            except Exception:
+                logger.exception("Failed to send announcement %s to registration %s", job.id, registration.get("_id"))
+                job.failed += 1
+            try:
+                await announcement_jobs.save_progress(job)
+            except Exception:
+                logger.exception("Failed to save progress of announcement %s", job.id)
+
+    job.status = "running"
+    senders: List[asyncio.Task] = []
+    try:
+        job.total = await registrations_collection.count_documents(query)
+        await announcement_jobs.save(job)
+        senders = [asyncio.create_task(sender()) for _ in range(pool.size)]
+        async for registration in registrations_collection.find(query, RECIPIENT_PROJECTION):
+            await queue.put(registration)
+        for _ in senders:
+            await queue.put(None)
+        await asyncio.gather(*senders)
+        job.status = "completed"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        for task in senders:
+            task.cancel()
+        await asyncio.gather(*senders, return_exceptions=True)
+        job.finished_at = datetime.utcnow()
+        await pool.close()
+        await announcement_jobs.finish(job)
@@ -0,0 +1,195 @@
+import asyncio
+import gzip
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId, json_util
+
+from app.config import get_settings
+from app.utils.db import registrations_collection, registrations_archive_collection, workshops_collection
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ("collection", "ndjson")
+
+# Lines handed to the writer thread at a time, and bytes of lines read back per thread call
+FILE_BATCH_SIZE = 1000
+FILE_READ_HINT = 1 << 20
+
+
+def archive_file_path(workshop_id: str) -> str:
+    return os.path.join(get_settings().archive_dir, f"registrations_{workshop_id}.ndjson.gz")
+
+
+async def _summarize(workshop_id: str) -> Dict[str, Any]:
+    """Counts left behind on the workshop once its registrations are moved"""
+    pipeline = [
+        {"$match": {"workshop_id": workshop_id}},
+        {"$facet": {
+            "total": [{"$group": {"_id": None, "count": {"$sum": 1}, "amount_paid": {"$sum": "$amount_paid"}}}],
+            "registration_status": [{"$group": {"_id": "$registration_status", "count": {"$sum": 1}}}],
+            "payment_status": [{"$group": {"_id": "$payment_status", "count": {"$sum": 1}}}],
+        }},
+    ]
+    result = (await registrations_collection.aggregate(pipeline).to_list(1))[0]
+    total = result["total"][0] if result["total"] else {"count": 0, "amount_paid": 0}
+    return {
+        "registrations": total["count"],
+        "amount_paid": total["amount_paid"],
+        "registration_status": {r["_id"]: r["count"] for r in result["registration_status"] if r["_id"]},
+        "payment_status": {r["_id"]: r["count"] for r in result["payment_status"] if r["_id"]},
+    }
+
+
+async def _archive_to_collection(workshop_id: str) -> int:
+    # Copied server-side; re-running after a partial failure keeps existing copies
+    await registrations_collection.aggregate([
+        {"$match": {"workshop_id": workshop_id}},
+        {"$merge": {"into": registrations_archive_collection.name, "on": "_id", "whenMatched": "keepExisting"}},
+    ]).to_list(None)
+    return await registrations_archive_collection.count_documents({"workshop_id": workshop_id})
+
+
+async def _archive_to_file(workshop_id: str) -> int:
+    # The file is written from a thread in batches, so the event loop only waits on Mongo
+    path = archive_file_path(workshop_id)
+    await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+    f = await asyncio.to_thread(gzip.open, path + ".tmp", "wt", encoding="utf-8")
+    written = 0
+    try:
+        lines = []
+        async for registration in registrations_collection.find({"workshop_id": workshop_id}):
+            lines.append(json_util.dumps(registration) + "\n")
+            if len(lines) >= FILE_BATCH_SIZE:
+                await asyncio.to_thread(f.writelines, lines)
+                written += len(lines)
+                lines = []
+        await asyncio.to_thread(f.writelines, lines)
+        written += len(lines)
+    finally:
+        await asyncio.to_thread(f.close)
+    await asyncio.to_thread(os.replace, path + ".tmp", path)
+    return written
+
+
+async def archive_workshop(workshop: Dict[str, Any], archive_format: str = "collection") -> Dict[str, Any]:
+    """
+    Move one workshop's registrations out of the hot collection, leaving a
+    summary on the workshop document
+    """
+    workshop_id = str(workshop["_id"])
+    summary = await _summarize(workshop_id)
+
+    if archive_format == "ndjson":
+        archived = await _archive_to_file(workshop_id)
+        location = archive_file_path(workshop_id)
+    else:
+        archived = await _archive_to_collection(workshop_id)
+        location = registrations_archive_collection.name
+
+    # Only drop the hot copies once every one of them is in the archive
+    if archived < summary["registrations"]:
+        raise RuntimeError(
+            f"Archived {archived} of {summary['registrations']} registrations for workshop {workshop_id}"
+        )
+    await registrations_collection.delete_many({"workshop_id": workshop_id})
+
+    await workshops_collection.update_one(
+        {"_id": workshop["_id"]},
+        {"$set": {
+            "archived_at": datetime.utcnow(),
+            "archive_format": archive_format,
+            "archive_location": location,
+            "archive_summary": summary,
+        }}
+    )
+    return {"workshop_id": workshop_id, "title": workshop.get("title"), **summary}
+
+
+async def archive_completed_workshops(
+    older_than_days: Optional[int] = None,
+    archive_format: str = "collection",
+) -> List[Dict[str, Any]]:
+    """Archive every completed workshop that ended before the cutoff"""
+    if older_than_days is None:
+        older_than_days = get_settings().archive_after_days
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    cursor = workshops_collection.find(
+        {"status": "completed", "end_date": {"$lt": cutoff}, "archived_at": {"$exists": False}},
+        {"title": 1}
+    )
+    results = []
+    async for workshop in cursor:
+        try:
+            results.append(await archive_workshop(workshop, archive_format))
+        except Exception as e:
+            logger.error("Failed to archive workshop %s: %s", workshop["_id"], e)
+    return results
+
+
+async def iter_archived_registrations(workshop: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Registrations of an archived workshop, from wherever they were archived to"""
+    workshop_id = str(workshop["_id"])
+    if workshop.get("archive_format") == "ndjson":
+        f = await asyncio.to_thread(gzip.open, workshop["archive_location"], "rt", encoding="utf-8")
+        try:
+            while True:
+                lines = await asyncio.to_thread(f.readlines, FILE_READ_HINT)
+                if not lines:
+                    break
+                for line in lines:
+                    yield json_util.loads(line)
+        finally:
+            await asyncio.to_thread(f.close)
+    else:
+        async for registration in registrations_archive_collection.find({"workshop_id": workshop_id}):
+            yield registration
+
+
+async def file_archived_workshops(workshop_ids: Optional[List[str]] = None, projection: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """Workshops whose registrations were archived to ndjson files, optionally only some of them"""
+    query: Dict[str, Any] = {"archived_at": {"$exists": True}, "archive_format": "ndjson"}
+    if workshop_ids is not None:
+        query["_id"] = {"$in": [ObjectId(w) for w in workshop_ids if ObjectId.is_valid(w)]}
+    return await workshops_collection.find(
+        query, {"title": 1, "archive_format": 1, "archive_location": 1, **(projection or {})}
+    ).to_list(None)
+
+
+def _naive_utc(value: Any) -> Any:
+    # Archived documents carry naive UTC datetimes, as pymongo returns them; query bounds may be aware
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def matches_filter(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """
+    Whether a registration read from an archive file matches a Mongo filter.
+    Only equality, $in and $gte/$lt ranges are supported, which is what the
+    admin registration listing and exports build.
+    """
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$gte" in condition and (value is None or value < _naive_utc(condition["$gte"])):
+                return False
+            if "$lt" in condition and (value is None or value >= _naive_utc(condition["$lt"])):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    # Archival job: python -m app.utils.archive [older_than_days] [collection|ndjson]
+    import sys
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    fmt = sys.argv[2] if len(sys.argv) > 2 else "collection"
+    for archived in asyncio.run(archive_completed_workshops(days, fmt)):
+        print(f"Archived {archived['registrations']} registrations of {archived['title']} ({archived['workshop_id']})")
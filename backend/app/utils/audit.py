@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.config import get_settings
+from app.models.audit import AuditStats
+from app.utils.db import audit_log_collection
+
+logger = logging.getLogger(__name__)
+
+# Attempts at writing one batch before its events are given up on
+WRITE_ATTEMPTS = 3
+
+audit_stats = AuditStats()
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+
+
+def changes_between(before: Dict[str, Any], after: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """{field: {"from": old, "to": new}} for the fields whose value differs"""
+    return {
+        field: {"from": before.get(field), "to": after[field]}
+        for field in (fields or after.keys())
+        if field in after and before.get(field) != after[field]
+    }
+
+
+async def audit(
+    entity_type: str,
+    entity_id: Any,
+    action: str,
+    actor=None,
+    changes: Optional[Dict[str, Any]] = None,
+):
+    """
+    Append an event to the audit journal. Events are queued and written in
+    batches; when the queue is full this waits for room, slowing writers
+    down rather than losing events. `actor` is the acting User, None for the system.
+    """
+    event = {
+        # Assigned here so a retried batch cannot write an event twice
+        "_id": ObjectId(),
+        "entity_type": entity_type,
+        "entity_id": str(entity_id),
+        "action": action,
+        "actor_id": str(actor.id) if actor is not None else None,
+        "actor_email": actor.email if actor is not None else None,
+        "at": datetime.utcnow(),
+        "changes": changes or {},
+    }
+    audit_stats.recorded += 1
+    if _queue is None:
+        # No writer running (scripts, tests): write straight through
+        await write_batch([event])
+        return
+    await _queue.put(event)
+    audit_stats.queued = _queue.qsize()
+
+
+async def write_batch(events: List[dict]):
+    for attempt in range(1, WRITE_ATTEMPTS + 1):
+        try:
+            await audit_log_collection.insert_many(events, ordered=False)
+            break
+        except BulkWriteError as e:
+            # Events a previous attempt already wrote come back as duplicate keys
+            if all(error.get("code") == 11000 for error in e.details.get("writeErrors", [])):
+                break
+            error = e
+        except PyMongoError as e:
+            error = e
+        if attempt == WRITE_ATTEMPTS:
+            audit_stats.failed += len(events)
+            logger.error("Dropped %d audit events after %d attempts: %s", len(events), attempt, error)
+            return
+        await asyncio.sleep(0.5 * attempt)
+    audit_stats.written += len(events)
+    audit_stats.batches += 1
+
+
+async def _collect_batch() -> List[dict]:
+    settings = get_settings()
+    batch = [await _queue.get()]
+    deadline = asyncio.get_running_loop().time() + settings.audit_flush_interval_ms / 1000
+    while len(batch) < settings.audit_batch_size:
+        timeout = deadline - asyncio.get_running_loop().time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _run_worker():
+    while True:
+        batch = await _collect_batch()
+        try:
+            await write_batch(batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+            audit_stats.queued = _queue.qsize()
+
+
+def start_audit_writer():
+    global _queue, _worker
+    _queue = asyncio.Queue(maxsize=get_settings().audit_queue_size)
+    _worker = asyncio.create_task(_run_worker())
+
+
+async def stop_audit_writer():
+    """Write whatever is still queued, then stop the batch writer"""
+    global _queue, _worker
+    if _worker is None:
+        return
+    await _queue.join()
+    _worker.cancel()
+    _queue = _worker = None
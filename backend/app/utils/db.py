@@ -1,28 +1,114 @@
-import os
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 from typing import List, Dict, Any
 
-load_dotenv()
+from app.config import get_settings
 
-mongodb_uri = os.getenv("MONGODB_URI")
-database_name = os.getenv("DATABASE_NAME")
+_client = None
 
-client = AsyncIOMotorClient(mongodb_uri)
-db = client[database_name]
+def get_client():
+    """Create the Motor client on first use rather than at import time"""
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from app.utils.db_monitoring import command_listeners
+        _client = AsyncIOMotorClient(get_settings().mongodb_uri, event_listeners=command_listeners())
+    return _client
+
+def get_db():
+    return get_client()[get_settings().database_name]
+
+def close_db():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+class LazyCollection:
+    """
+    Stand-in for a Motor collection that resolves it on first attribute access,
+    so modules can import collections without opening a client
+    """
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
 
 # Collections
-users_collection = db.users
-workshops_collection = db.workshops
-registrations_collection = db.registrations
-testimonials_collection = db.testimonials
+users_collection = LazyCollection("users")
+workshops_collection = LazyCollection("workshops")
+registrations_collection = LazyCollection("registrations")
+testimonials_collection = LazyCollection("testimonials")
+registration_rollups_collection = LazyCollection("registration_rollups")
+idempotency_keys_collection = LazyCollection("idempotency_keys")
+registrations_archive_collection = LazyCollection("registrations_archive")
+rate_limits_collection = LazyCollection("rate_limits")
+background_jobs_collection = LazyCollection("background_jobs")
+password_reset_otps_collection = LazyCollection("password_reset_otps")
+audit_log_collection = LazyCollection("audit_log")
+
+async def ensure_ttl_index(collection: LazyCollection, field: str, seconds: int):
+    """
+    TTL index on a field whose expiry comes from settings. create_index
+    refuses to change expireAfterSeconds on an existing index, so a changed
+    setting is applied with collMod instead.
+    """
+    existing = (await collection.index_information()).get(f"{field}_1")
+    if existing is None:
+        await collection.create_index(field, expireAfterSeconds=seconds)
+    elif existing.get("expireAfterSeconds") != seconds:
+        await get_db().command(
+            "collMod", collection.name,
+            index={"keyPattern": {field: 1}, "expireAfterSeconds": seconds}
+        )
 
 async def init_db():
     # Create indexes for performance
     await users_collection.create_index("email", unique=True)
+    await users_collection.create_index("search_name")
+    await users_collection.create_index("search_email")
+    await users_collection.create_index([("role", 1), ("is_active", 1), ("created_at", -1)])
+    await users_collection.create_index([("grade", 1), ("school", 1), ("created_at", -1)])
+    # Fill the lowercase search fields on users created before they existed
+    await users_collection.update_many(
+        {"search_email": {"$exists": False}},
+        [{"$set": {"search_name": {"$toLower": "$full_name"}, "search_email": {"$toLower": "$email"}}}]
+    )
     await workshops_collection.create_index("id", unique=True)
     await registrations_collection.create_index([("user_id", 1), ("workshop_id", 1)], unique=True, sparse=True)
+    await registrations_collection.create_index([("workshop_id", 1), ("registration_status", 1), ("created_at", -1)])
+    await registrations_collection.create_index([("user_id", 1), ("created_at", -1)])
+    # Only registrations currently holding an unpaid seat are indexed
+    await registrations_collection.create_index(
+        "hold_expires_at", partialFilterExpression={"hold_expires_at": {"$exists": True}}
+    )
+    await registrations_collection.create_index("seat_release_pending", sparse=True)
+    await registrations_collection.create_index([("registration_status", 1), ("created_at", -1)])
+    await registrations_collection.create_index([("payment_status", 1), ("created_at", -1)])
+    await registrations_collection.create_index([("grade", 1), ("school", 1), ("created_at", -1)])
+    await registrations_collection.create_index([("created_at", -1)])
+    await registration_rollups_collection.create_index(
+        [("period", 1), ("bucket", 1), ("workshop_id", 1), ("grade", 1), ("school", 1)],
+        unique=True
+    )
+    await registrations_archive_collection.create_index([("workshop_id", 1), ("created_at", -1)])
+    await workshops_collection.create_index([("status", 1), ("end_date", 1)])
+    await workshops_collection.create_index([("status", 1), ("eligible_grades", 1), ("start_date", 1)])
+    await ensure_ttl_index(idempotency_keys_collection, "created_at", get_settings().idempotency_ttl_seconds)
+    await rate_limits_collection.create_index("expires_at", expireAfterSeconds=0)
+    await password_reset_otps_collection.create_index("expires_at", expireAfterSeconds=0)
+    await background_jobs_collection.create_index([("kind", 1), ("created_at", -1)])
+    await audit_log_collection.create_index([("entity_type", 1), ("entity_id", 1), ("at", -1)])
+    await audit_log_collection.create_index([("actor_id", 1), ("at", -1)])
+    await audit_log_collection.create_index([("at", -1)])
+
+# Lowercase copies of searchable user fields, so prefix search can use an index
+def with_user_search_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    if data.get("full_name") is not None:
+        data["search_name"] = data["full_name"].lower()
+    if data.get("email") is not None:
+        data["search_email"] = str(data["email"]).lower()
+    return data
 
 # Helper functions for ObjectId conversion
 def serialize_id(id_str):
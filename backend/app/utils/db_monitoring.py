@@ -0,0 +1,247 @@
+import json
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from pymongo import monitoring
+
+from app.config import get_settings
+from app.utils.profiling import ProfileCommandListener
+from app.utils.tracing import Span, current_route, current_span, tracing_enabled
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """
+    Turns pymongo command events into child spans of the request that issued
+    them. Motor copies the caller's context into its executor threads, so the
+    current span is visible here.
+    """
+    def __init__(self):
+        self._pending: Dict[int, Span] = {}
+
+    def started(self, event):
+        parent = current_span()
+        if parent is None:
+            return
+        collection = event.command.get(event.command_name)
+        self._pending[event.request_id] = Span(
+            f"mongo.{event.command_name}",
+            "client",
+            parent.trace_id,
+            parent.span_id,
+            **{
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.collection": collection if isinstance(collection, str) else None,
+            }
+        )
+
+    def _finish(self, event, error: Optional[str] = None):
+        span = self._pending.pop(event.request_id, None)
+        if span is None:
+            return
+        span.start_ns = time.time_ns() - event.duration_micros * 1000
+        span.error = error
+        span.end()
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure))
+
+
+# Commands whose plans can be explained
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values with "?" while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(v) for v in value]
+        # Pipelines and $or branches keep their structure; value lists collapse
+        return shapes if any(isinstance(v, (dict, list)) for v in shapes) else "?"
+    return "?"
+
+
+def _command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    shape = {"command": command_name, "collection": command.get(command_name)}
+    for key in ("filter", "query", "pipeline", "sort", "updates", "deletes"):
+        if key in command:
+            shape[key] = query_shape(command[key])
+    return shape
+
+
+def _find_execution_stats(explain: Any) -> Optional[Dict[str, Any]]:
+    # find/count put executionStats at the top; aggregate nests it under its $cursor stage
+    if isinstance(explain, dict):
+        if "executionStats" in explain:
+            return explain["executionStats"]
+        values = explain.values()
+    elif isinstance(explain, list):
+        values = explain
+    else:
+        return None
+    for value in values:
+        stats = _find_execution_stats(value)
+        if stats:
+            return stats
+    return None
+
+
+def _plan_stages(plan: Any) -> list:
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("inputStage", "executionStages"):
+        stages += _plan_stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+class SlowQueryDetector(monitoring.CommandListener):
+    """
+    Flags commands slower than a threshold and explains them on a background
+    thread with executionStats. Results are grouped by query shape and by the
+    route that issued them, and written to a JSON report.
+    """
+    def __init__(self, threshold_ms: float, report_path: str, explain_interval: float = 60.0):
+        self.threshold_ms = threshold_ms
+        self.report_path = report_path
+        self.explain_interval = explain_interval
+        self._pending: Dict[int, tuple] = {}
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._explain_queue: queue.Queue = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+
+    def started(self, event):
+        if event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        self._pending[event.request_id] = (
+            event.database_name,
+            event.command,
+            current_route() or "(no route)",
+        )
+
+    def succeeded(self, event):
+        pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        database, command, route = pending
+        shape = _command_shape(event.command_name, command)
+        key = json.dumps(shape, sort_keys=True)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._shapes.setdefault(key, {
+                "shape": shape,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": Counter(),
+                "explain": None,
+                "last_explained": None,
+            })
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["routes"][route] += 1
+            due = entry["last_explained"] is None or now - entry["last_explained"] >= self.explain_interval
+            if due:
+                entry["last_explained"] = now
+        if due:
+            self._enqueue_explain(key, database, event.command_name, command)
+
+    def failed(self, event):
+        self._pending.pop(event.request_id, None)
+
+    def _enqueue_explain(self, key: str, database: str, command_name: str, command: Dict[str, Any]):
+        # Session and cluster metadata cannot be sent inside an explain
+        explainable = {k: v for k, v in command.items() if not k.startswith("$") and k not in ("lsid", "txnNumber")}
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._explain_loop, name="slow-query-explain", daemon=True)
+            self._worker.start()
+        try:
+            self._explain_queue.put_nowait((key, database, explainable))
+        except queue.Full:
+            pass
+
+    def _explain_loop(self):
+        from pymongo import MongoClient
+
+        # A separate synchronous client, so explains are never themselves monitored
+        client = MongoClient(get_settings().mongodb_uri)
+        while True:
+            key, database, command = self._explain_queue.get()
+            try:
+                explain = client[database].command({"explain": command, "verbosity": "executionStats"})
+                stats = _find_execution_stats(explain) or {}
+                summary = {
+                    "docs_examined": stats.get("totalDocsExamined"),
+                    "keys_examined": stats.get("totalKeysExamined"),
+                    "returned": stats.get("nReturned"),
+                    "execution_ms": stats.get("executionTimeMillis"),
+                    "stages": _plan_stages(stats.get("executionStages")),
+                }
+            except Exception as e:
+                summary = {"error": str(e)}
+            with self._lock:
+                self._shapes[key]["explain"] = summary
+            self.write_report()
+
+    def report(self) -> Dict[str, Any]:
+        """Slow commands grouped by query shape and by issuing route"""
+        with self._lock:
+            shapes = [
+                {
+                    "shape": entry["shape"],
+                    "count": entry["count"],
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "routes": dict(entry["routes"]),
+                    "explain": entry["explain"],
+                }
+                for entry in self._shapes.values()
+            ]
+        shapes.sort(key=lambda s: s["avg_ms"] * s["count"], reverse=True)
+
+        routes: Dict[str, Dict[str, Any]] = {}
+        for shape in shapes:
+            for route, count in shape["routes"].items():
+                by_route = routes.setdefault(route, {"count": 0, "shapes": []})
+                by_route["count"] += count
+                by_route["shapes"].append(shape["shape"])
+        return {"threshold_ms": self.threshold_ms, "by_shape": shapes, "by_route": routes}
+
+    def write_report(self):
+        with open(self.report_path, "w") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+
+
+# Created with the Motor client when SLOW_QUERY_MS is set
+slow_query_detector: Optional[SlowQueryDetector] = None
+
+
+def command_listeners():
+    """pymongo listeners to register on the Motor client"""
+    global slow_query_detector
+    settings = get_settings()
+    listeners = []
+    if tracing_enabled():
+        listeners.append(MongoCommandTracer())
+    if settings.profile_enabled:
+        listeners.append(ProfileCommandListener())
+    if settings.slow_query_ms is not None:
+        slow_query_detector = SlowQueryDetector(settings.slow_query_ms, settings.slow_query_report)
+        listeners.append(slow_query_detector)
+    return listeners
@@ -1,39 +1,138 @@
-import os
+import asyncio
+import logging
 import smtplib
+import time
+from typing import Optional
+from string import Template
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.config import get_settings
+from app.utils.profiling import profile_timer
+from app.utils.tracing import start_span
 
-SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = int(os.getenv("SMTP_PORT"))
-SMTP_USERNAME = os.getenv("SMTP_USERNAME")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-EMAIL_FROM = os.getenv("EMAIL_FROM")
+logger = logging.getLogger(__name__)
 
-async def send_email(to_email: str, subject: str, html_content: str):
-    """
-    Sends an email using the configured SMTP server
-    """
+def open_smtp_connection():
+    settings = get_settings()
+    server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
+    server.starttls()
+    server.login(settings.smtp_username, settings.smtp_password)
+    return server
+
+def build_message(to_email: str, subject: str, html_content: str):
     msg = MIMEMultipart()
-    msg["From"] = EMAIL_FROM
+    msg["From"] = get_settings().email_from
     msg["To"] = to_email
     msg["Subject"] = subject
-    
-    # Add HTML content
     msg.attach(MIMEText(html_content, "html"))
+    return msg
+
+async def send_email(to_email: str, subject: str, html_content: str):
+    """
+    Sends an email using the configured SMTP server
+    """
+    msg = build_message(to_email, subject, html_content)
     
-    try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        return True
-    except Exception as e:
-        print(f"Failed to send email: {str(e)}")
-        return False
+    with start_span("smtp.send", kind="client", **{"email.subject": subject}) as span, profile_timer("smtp", subject):
+        try:
+            server = open_smtp_connection()
+            server.send_message(msg)
+            server.quit()
+            return True
+        except Exception as e:
+            span.record_error(e)
+            logger.warning("Failed to send email: %s", e)
+            return False
+
+class SMTPConnection:
+    """
+    A persistent SMTP session that reconnects once if the server dropped it
+    """
+    def __init__(self):
+        self.server = None
+
+    def _connect(self):
+        self.server = open_smtp_connection()
+
+    def send(self, msg):
+        if self.server is None:
+            self._connect()
+        try:
+            self.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self._connect()
+            self.server.send_message(msg)
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except smtplib.SMTPException:
+                pass
+            self.server = None
+
+class SMTPPool:
+    """
+    A small pool of persistent SMTP connections shared by bulk senders.
+    Blocking SMTP calls run in worker threads so the event loop stays free.
+    """
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or get_settings().smtp_pool_size
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(SMTPConnection())
+
+    async def send(self, msg):
+        conn = await self._idle.get()
+        try:
+            with start_span("smtp.send", kind="client", **{"email.subject": msg["Subject"], "smtp.pooled": True}), \
+                    profile_timer("smtp", msg["Subject"]):
+                await asyncio.to_thread(conn.send, msg)
+        except Exception:
+            # Drop the broken session; the next send on this slot reconnects
+            await asyncio.to_thread(conn.close)
+            raise
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def close(self):
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            await asyncio.to_thread(conn.close)
+
+class RateLimiter:
+    """
+    Spaces calls at least 1/rate seconds apart across all callers
+    """
+    def __init__(self, rate: Optional[float] = None):
+        rate = get_settings().email_rate_per_second if rate is None else rate
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# Precompiled bulk templates, rendered with substitute() per recipient
+ANNOUNCEMENT_SUBJECT = Template("$subject: $workshop_title")
+ANNOUNCEMENT_TEMPLATE = Template("""
+    <html>
+    <body>
+        <h2>$subject</h2>
+        <p>Dear $user_name,</p>
+        <p>We have an update about the workshop <strong>$workshop_title</strong>.</p>
+        <p>$message</p>
+        <p>Workshop Date: $workshop_date<br>Location: $location</p>
+        <p>Best regards,<br>Jnana Prabodhini Vijnana Dals Team</p>
+    </body>
+    </html>
+    """)
 
 # Email templates
 async def send_registration_confirmation(to_email: str, user_name: str, workshop_name: str):
@@ -0,0 +1,284 @@
+import asyncio
+import csv
+import gzip
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from app.config import get_settings
+from app.models.export import ExportCreate, ExportJob
+from app.utils.archive import file_archived_workshops, iter_archived_registrations, matches_filter
+from app.utils.db import (
+    registrations_collection, registrations_archive_collection, users_collection, workshops_collection
+)
+from app.utils.jobs import JobStore
+
+# Export progress, readable from every worker
+export_jobs: JobStore[ExportJob] = JobStore("export", ExportJob)
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Rows handed to the file writer at a time
+EXPORT_BATCH_SIZE = 5000
+
+# Output columns, in order: registration fields first, then the joined ones
+EXPORT_COLUMNS = [
+    "registration_id", "created_at", "registration_status", "payment_status", "amount_paid", "payment_id",
+    "full_name", "email", "grade", "school", "phone", "parent_name", "parent_phone",
+    "user_id", "user_is_active", "user_created_at",
+    "workshop_id", "workshop_title", "workshop_start_date", "workshop_end_date", "workshop_location", "workshop_fee",
+    "archived",
+]
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def create_job(export: ExportCreate, requested_by: str) -> ExportJob:
+    job = ExportJob(id=uuid.uuid4().hex, format=export.format, requested_by=requested_by)
+    return await export_jobs.add(job)
+
+
+def export_file_path(job: ExportJob) -> str:
+    extension = "csv.gz" if job.format == "csv" else "parquet"
+    return os.path.join(get_settings().export_dir, f"registrations_{job.id}.{extension}")
+
+
+def export_query(export: ExportCreate) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if export.workshop_ids:
+        query["workshop_id"] = {"$in": export.workshop_ids}
+    if export.registration_status:
+        query["registration_status"] = {"$in": export.registration_status}
+    if export.payment_status:
+        query["payment_status"] = {"$in": export.payment_status}
+    if export.grade is not None:
+        query["grade"] = export.grade
+    if export.school:
+        query["school"] = export.school
+    if export.created_from or export.created_to:
+        query["created_at"] = {}
+        if export.created_from:
+            query["created_at"]["$gte"] = export.created_from
+        if export.created_to:
+            query["created_at"]["$lt"] = export.created_to
+    return query
+
+
+def export_pipeline(export: ExportCreate) -> List[Dict[str, Any]]:
+    """Matching registrations (optionally with archived ones) joined with user and workshop fields"""
+    match = {"$match": export_query(export)}
+    pipeline = [match, {"$set": {"archived": False}}]
+    if export.include_archived:
+        pipeline.append({"$unionWith": {
+            "coll": registrations_archive_collection.name,
+            "pipeline": [match, {"$set": {"archived": True}}],
+        }})
+    pipeline += [
+        {"$lookup": {
+            "from": users_collection.name,
+            "let": {"uid": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None, "onNull": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$uid"]}}},
+                {"$project": {"_id": 0, "is_active": 1, "created_at": 1}},
+            ],
+            "as": "user",
+        }},
+        {"$lookup": {
+            "from": workshops_collection.name,
+            "let": {"wid": {"$convert": {"input": "$workshop_id", "to": "objectId", "onError": None, "onNull": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$wid"]}}},
+                {"$project": {"_id": 0, "title": 1, "start_date": 1, "end_date": 1, "location": 1, "fee": 1}},
+            ],
+            "as": "workshop",
+        }},
+        {"$project": {
+            "_id": 0,
+            "registration_id": {"$toString": "$_id"},
+            "created_at": 1,
+            "registration_status": 1,
+            "payment_status": 1,
+            "amount_paid": 1,
+            "payment_id": 1,
+            "full_name": 1,
+            "email": 1,
+            "grade": 1,
+            "school": 1,
+            "phone": 1,
+            "parent_name": 1,
+            "parent_phone": 1,
+            "user_id": 1,
+            "user_is_active": {"$first": "$user.is_active"},
+            "user_created_at": {"$first": "$user.created_at"},
+            "workshop_id": 1,
+            "workshop_title": {"$first": "$workshop.title"},
+            "workshop_start_date": {"$first": "$workshop.start_date"},
+            "workshop_end_date": {"$first": "$workshop.end_date"},
+            "workshop_location": {"$first": "$workshop.location"},
+            "workshop_fee": {"$first": "$workshop.fee"},
+            "archived": 1,
+        }},
+    ]
+    return pipeline
+
+
+# Workshop fields joined onto rows read from archive files
+FILE_ARCHIVE_WORKSHOP_FIELDS = {"title": 1, "start_date": 1, "end_date": 1, "location": 1, "fee": 1}
+
+
+async def file_archive_rows(workshops: List[Dict[str, Any]], query: Dict[str, Any]):
+    """
+    Batches of matching registrations from workshops archived to ndjson
+    files, shaped like export_pipeline's rows
+    """
+    for workshop in workshops:
+        batch = []
+        async for registration in iter_archived_registrations(workshop):
+            if matches_filter(registration, query):
+                batch.append(registration)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                yield await _join_file_rows(batch, workshop)
+                batch = []
+        if batch:
+            yield await _join_file_rows(batch, workshop)
+
+
+async def _join_file_rows(registrations: List[Dict[str, Any]], workshop: Dict[str, Any]) -> List[Dict[str, Any]]:
+    user_ids = {r.get("user_id") for r in registrations if r.get("user_id") and ObjectId.is_valid(r["user_id"])}
+    users = {}
+    if user_ids:
+        users = {
+            str(u["_id"]): u
+            async for u in users_collection.find(
+                {"_id": {"$in": [ObjectId(u) for u in user_ids]}}, {"is_active": 1, "created_at": 1}
+            )
+        }
+    rows = []
+    for registration in registrations:
+        user = users.get(registration.get("user_id"), {})
+        row = {column: registration.get(column) for column in EXPORT_COLUMNS}
+        row.update({
+            "registration_id": str(registration["_id"]),
+            "user_is_active": user.get("is_active"),
+            "user_created_at": user.get("created_at"),
+            "workshop_title": workshop.get("title"),
+            "workshop_start_date": workshop.get("start_date"),
+            "workshop_end_date": workshop.get("end_date"),
+            "workshop_location": workshop.get("location"),
+            "workshop_fee": workshop.get("fee"),
+            "archived": True,
+        })
+        rows.append(row)
+    return rows
+
+
+class CSVWriter:
+    """Gzip-compressed CSV with a header row"""
+    def __init__(self, path: str):
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Parquet file written one row group per batch"""
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("registration_id", pa.string()), ("created_at", pa.timestamp("ms")),
+            ("registration_status", pa.string()), ("payment_status", pa.string()),
+            ("amount_paid", pa.float64()), ("payment_id", pa.string()),
+            ("full_name", pa.string()), ("email", pa.string()), ("grade", pa.int32()),
+            ("school", pa.string()), ("phone", pa.string()), ("parent_name", pa.string()),
+            ("parent_phone", pa.string()), ("user_id", pa.string()), ("user_is_active", pa.bool_()),
+            ("user_created_at", pa.timestamp("ms")), ("workshop_id", pa.string()),
+            ("workshop_title", pa.string()), ("workshop_start_date", pa.timestamp("ms")),
+            ("workshop_end_date", pa.timestamp("ms")), ("workshop_location", pa.string()),
+            ("workshop_fee", pa.float64()), ("archived", pa.bool_()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+async def run_export(job: ExportJob, export: ExportCreate):
+    """
+    Stream the export query into a compressed file, a batch at a time. File
+    writes and compression run in a worker thread so the event loop keeps
+    serving requests.
+    """
+    path = export_file_path(job)
+    writer = None
+    job.status = "running"
+    try:
+        query = export_query(export)
+        job.total = await registrations_collection.count_documents(query)
+        file_workshops = []
+        if export.include_archived:
+            job.total += await registrations_archive_collection.count_documents(query)
+            # Workshops archived to files are read from disk, counted first so progress stays meaningful
+            file_workshops = await file_archived_workshops(export.workshop_ids or None, FILE_ARCHIVE_WORKSHOP_FIELDS)
+            for workshop in file_workshops:
+                async for registration in iter_archived_registrations(workshop):
+                    job.total += matches_filter(registration, query)
+        await export_jobs.save(job)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        writer_class = CSVWriter if job.format == "csv" else ParquetWriter
+        writer = await asyncio.to_thread(writer_class, path + ".tmp")
+
+        batch = []
+        cursor = registrations_collection.aggregate(export_pipeline(export), batchSize=EXPORT_BATCH_SIZE)
+        async for row in cursor:
+            batch.append(row)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                await asyncio.to_thread(writer.write, batch)
+                job.exported += len(batch)
+                await export_jobs.save_progress(job)
+                batch = []
+        if batch:
+            await asyncio.to_thread(writer.write, batch)
+            job.exported += len(batch)
+        async for batch in file_archive_rows(file_workshops, query):
+            await asyncio.to_thread(writer.write, batch)
+            job.exported += len(batch)
+            await export_jobs.save_progress(job)
+
+        await asyncio.to_thread(writer.close)
+        writer = None
+        os.replace(path + ".tmp", path)
+        job.filename = os.path.basename(path)
+        job.size_bytes = os.path.getsize(path)
+        job.status = "completed"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        if writer is not None:
+            await asyncio.to_thread(writer.close)
+        if os.path.exists(path + ".tmp"):
+            os.remove(path + ".tmp")
+    finally:
+        job.finished_at = datetime.utcnow()
+        await export_jobs.finish(job)
@@ -0,0 +1,93 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+from app.utils.db import testimonials_collection, workshops_collection, serialize_list
+from app.utils.http_cache import compute_etag, last_modified
+
+# Workshops shown on the home page
+HOME_FEATURED_LIMIT = 5
+HOME_UPCOMING_LIMIT = 3
+
+
+class Feed:
+    """
+    Precomputed, read-only snapshot of a small public listing.
+
+    Snapshots are rebuilt from Mongo when invalidated by a write in this
+    process, or once they are older than feed_ttl_seconds so that writes made
+    through other workers show up too. Readers never wait on Mongo unless the
+    feed has never been built.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = asyncio.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._built_at = 0.0
+        self._stale = True
+
+    def invalidate(self):
+        self._stale = True
+
+    def _fresh(self) -> bool:
+        age = time.monotonic() - self._built_at
+        return self._snapshot is not None and not self._stale and age <= get_settings().feed_ttl_seconds
+
+    async def get(self) -> Dict[str, Any]:
+        if self._fresh():
+            return self._snapshot
+        if self._snapshot is not None and self._lock.locked():
+            # A rebuild is already running; serve the previous snapshot meanwhile
+            return self._snapshot
+        async with self._lock:
+            if not self._fresh():
+                await self.rebuild()
+            return self._snapshot
+
+    async def rebuild(self):
+        # Cleared before loading so a write during the load triggers another rebuild
+        self._stale = False
+        sections = await self._loader()
+        docs = [doc for items in sections.values() for doc in items]
+        self._snapshot = {
+            **sections,
+            "etag": compute_etag(docs),
+            "last_modified": last_modified(docs),
+        }
+        self._built_at = time.monotonic()
+
+
+async def _load_testimonials() -> Dict[str, List[Dict[str, Any]]]:
+    cursor = testimonials_collection.find({"is_visible": True}).sort("created_at", -1)
+    return {"testimonials": await serialize_list(cursor)}
+
+
+async def _load_home_workshops() -> Dict[str, List[Dict[str, Any]]]:
+    featured = workshops_collection.find({"featured": True}).sort("start_date", 1).limit(HOME_FEATURED_LIMIT)
+    upcoming = workshops_collection.find({"status": "upcoming"}).sort("start_date", 1).limit(HOME_UPCOMING_LIMIT)
+    return {
+        "featured_workshops": await serialize_list(featured),
+        "upcoming_workshops": await serialize_list(upcoming),
+    }
+
+
+testimonial_feed = Feed(_load_testimonials)
+home_workshops_feed = Feed(_load_home_workshops)
+
+
+def select_testimonials(
+    items: List[Dict[str, Any]],
+    order: str = "latest",
+    skip: int = 0,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """Page or sample visible testimonials from a feed snapshot"""
+    if order == "featured":
+        items = [t for t in items if t.get("featured")]
+    if order == "random":
+        page = random.sample(items, min(limit, len(items)))
+    else:
+        page = items[skip:skip + limit]
+    return {"items": page, "total": len(items), "skip": skip, "limit": limit}
@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+# Public catalogue responses may be reused for a minute and served stale while
+# a CDN or browser revalidates them in the background
+PUBLIC_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+def document_version(doc: Dict[str, Any]) -> Optional[datetime]:
+    """Last time a document changed, falling back to its creation time"""
+    return doc.get("updated_at") or doc.get("created_at")
+
+
+def compute_etag(docs: Iterable[Dict[str, Any]], *extra: Any) -> str:
+    """
+    Strong ETag over the ids and versions of a set of documents plus any
+    request parameters that shape the response
+    """
+    digest = hashlib.sha1()
+    for part in extra:
+        digest.update(repr(part).encode())
+    for doc in docs:
+        version = document_version(doc)
+        digest.update(f"{doc.get('_id')}:{version.isoformat() if version else ''};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def last_modified(docs: Iterable[Dict[str, Any]]) -> Optional[datetime]:
+    versions = [v for v in (document_version(doc) for doc in docs) if v]
+    if not versions:
+        return None
+    latest = max(versions)
+    if latest.tzinfo is None:
+        latest = latest.replace(tzinfo=timezone.utc)
+    return latest.replace(microsecond=0)
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the current version"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return modified <= since
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, modified: Optional[datetime]):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+    if modified:
+        response.headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+
+def not_modified_response(etag: str, modified: Optional[datetime]) -> Response:
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, modified)
+    return response
@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from app.config import get_settings
+from app.utils.db import idempotency_keys_collection
+
+# Completed responses kept in-process so repeats on the same worker skip Mongo
+LOCAL_CACHE_SIZE = 10000
+
+# How long a repeat waits for a first attempt running on another worker
+WAIT_TIMEOUT_SECONDS = 30
+
+# A claim older than this belongs to a worker that crashed or was killed, and may be taken over
+CLAIM_LEASE_SECONDS = 60
+
+
+class StoredResponse:
+    __slots__ = ("status", "headers", "body", "body_hash")
+
+    def __init__(self, status: int, headers: list, body: bytes, body_hash: str):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.body_hash = body_hash
+
+    def to_doc(self) -> Dict:
+        return {
+            "status_code": self.status,
+            "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in self.headers],
+            "body": self.body,
+        }
+
+    @classmethod
+    def from_doc(cls, doc: Dict) -> "StoredResponse":
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in doc["headers"]]
+        return cls(doc["status_code"], headers, doc["body"], doc["body_hash"])
+
+
+# Returned by _wait_for_other_worker when this attempt took over a stale claim
+TAKEN_OVER = object()
+
+# Replayed response headers that describe the original body
+REPLAYED_HEADERS = {b"content-type", b"location", b"etag"}
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware honouring an Idempotency-Key header on selected POST routes.
+
+    The first request with a key runs the handler and stores its response;
+    repeats replay the stored response without running the handler, and
+    concurrent repeats wait for the first attempt to finish. A claim that
+    outlives CLAIM_LEASE_SECONDS is taken over by the next attempt. Keys are
+    scoped to the route and the caller's Authorization header, and reusing a
+    key with a different body is rejected.
+    """
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = set(paths)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._completed: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        key = headers.get(b"idempotency-key")
+        if not key:
+            return await self.app(scope, receive, send)
+
+        body = await self._read_body(receive)
+        body_hash = hashlib.sha256(body).hexdigest()
+        scope_key = hashlib.sha256(
+            b"\0".join([scope["path"].encode(), headers.get(b"authorization", b""), key])
+        ).hexdigest()
+
+        stored = await self._lookup(scope_key)
+        if stored is not None:
+            return await self._replay(stored, body_hash, send)
+
+        # Another request with this key is running in this worker: wait for it
+        inflight = self._inflight.get(scope_key)
+        if inflight is not None:
+            stored = await asyncio.shield(inflight)
+            if stored is not None:
+                return await self._replay(stored, body_hash, send)
+            return await self._error(send, 409, "A request with this Idempotency-Key did not complete; please retry")
+
+        # Registered before any await, so later duplicates in this worker wait on it
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[scope_key] = future
+        stored = None
+        owner = uuid.uuid4().hex
+        try:
+            # Claim the key across workers; losing the race means another worker is running it
+            if not await self._claim(scope_key, body_hash, owner):
+                stored = await self._wait_for_other_worker(scope_key, body_hash, owner)
+                if stored is None:
+                    return await self._error(send, 409, "A request with this Idempotency-Key did not complete; please retry")
+                if stored is not TAKEN_OVER:
+                    return await self._replay(stored, body_hash, send)
+                stored = None
+
+            try:
+                stored = await self._run(scope, body, body_hash, receive, send)
+            finally:
+                if stored is None:
+                    # Release the key so a retry can run the handler again
+                    await idempotency_keys_collection.delete_one({"_id": scope_key, "owner": owner})
+            if stored is None:
+                return
+            self._remember(scope_key, stored)
+            # Only while still the owner, so an attempt whose claim was taken over can't overwrite the result
+            await idempotency_keys_collection.update_one(
+                {"_id": scope_key, "owner": owner},
+                {"$set": {"status": "completed", **stored.to_doc()}}
+            )
+        finally:
+            del self._inflight[scope_key]
+            future.set_result(stored)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def _run(self, scope, body: bytes, body_hash: str, receive, send) -> Optional[StoredResponse]:
+        """Run the handler, forwarding its response and capturing it for replay"""
+        sent_body = False
+
+        async def replay_body():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # The body has been consumed, so the server's next message is the disconnect
+            return await receive()
+
+        status = 500
+        response_headers = []
+        chunks = []
+
+        async def capture(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = [
+                    (k, v) for k, v in message.get("headers", []) if k.lower() in REPLAYED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_body, capture)
+        if status >= 500:
+            # Server errors are not final; let the client retry with the same key
+            return None
+        return StoredResponse(status, response_headers, b"".join(chunks), body_hash)
+
+    async def _lookup(self, scope_key: str) -> Optional[StoredResponse]:
+        cached = self._completed.get(scope_key)
+        if cached is not None:
+            expires_at, stored = cached
+            if expires_at > time.monotonic():
+                return stored
+            del self._completed[scope_key]
+
+        doc = await idempotency_keys_collection.find_one({"_id": scope_key, "status": "completed"})
+        if doc is None:
+            return None
+        stored = StoredResponse.from_doc(doc)
+        self._remember(scope_key, stored)
+        return stored
+
+    async def _claim(self, scope_key: str, body_hash: str, owner: str) -> bool:
+        from pymongo.errors import DuplicateKeyError
+
+        now = datetime.utcnow()
+        try:
+            await idempotency_keys_collection.insert_one({
+                "_id": scope_key,
+                "status": "in_progress",
+                "body_hash": body_hash,
+                "owner": owner,
+                "claimed_at": now,
+                "created_at": now,
+            })
+            return True
+        except DuplicateKeyError:
+            return await self._take_over(scope_key, body_hash, owner)
+
+    @staticmethod
+    async def _take_over(scope_key: str, body_hash: str, owner: str) -> bool:
+        """Claim a key whose in-progress attempt outlived its lease"""
+        now = datetime.utcnow()
+        result = await idempotency_keys_collection.update_one(
+            {
+                "_id": scope_key,
+                "status": "in_progress",
+                "claimed_at": {"$lt": now - timedelta(seconds=CLAIM_LEASE_SECONDS)},
+            },
+            {"$set": {"owner": owner, "body_hash": body_hash, "claimed_at": now}}
+        )
+        return result.modified_count == 1
+
+    async def _wait_for_other_worker(self, scope_key: str, body_hash: str, owner: str):
+        """
+        The other attempt's stored response, TAKEN_OVER once its claim expired
+        and this attempt holds it instead, or None when it failed or ran too long
+        """
+        deadline = time.monotonic() + WAIT_TIMEOUT_SECONDS
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+            stored = await self._lookup(scope_key)
+            if stored is not None:
+                return stored
+            if await idempotency_keys_collection.count_documents({"_id": scope_key}) == 0:
+                # The first attempt failed and released the key
+                return None
+            if await self._take_over(scope_key, body_hash, owner):
+                return TAKEN_OVER
+        return None
+
+    def _remember(self, scope_key: str, stored: StoredResponse):
+        ttl = get_settings().idempotency_ttl_seconds
+        self._completed[scope_key] = (time.monotonic() + ttl, stored)
+        self._completed.move_to_end(scope_key)
+        while len(self._completed) > LOCAL_CACHE_SIZE:
+            self._completed.popitem(last=False)
+
+    async def _replay(self, stored: StoredResponse, body_hash: str, send):
+        if stored.body_hash != body_hash:
+            return await self._error(send, 422, "Idempotency-Key was already used with a different request body")
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _error(send, status: int, detail: str):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
@@ -0,0 +1,181 @@
+"""
+Workshop images.
+
+Uploads are rendered in a process pool into WebP variants (thumb, card,
+hero) under IMAGE_DIR/workshops, served at /media/workshops, and the
+original is kept under IMAGE_DIR/originals. Every file is named after a
+hash of its content, so its URL changes whenever the bytes do and it can
+be cached forever.
+"""
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from starlette.staticfiles import StaticFiles
+
+from app.config import get_settings
+
+# Variant name -> (longest edge in pixels, WebP quality)
+VARIANTS = {
+    "thumb": (160, 70),
+    "card": (480, 78),
+    "hero": (1600, 82),
+}
+
+# Guard against decompression bombs: larger images are refused before decoding
+MAX_PIXELS = 40_000_000
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ImageWorkersUnavailable(RuntimeError):
+    """The render pool broke twice in a row, e.g. workers killed for memory"""
+
+
+def images_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def _write_once(path: str, data: bytes):
+    """Content-addressed files never change, so an existing one is already right"""
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def render_variants(original: bytes, image_dir: str) -> Dict[str, dict]:
+    """
+    Decode an upload and write its variants; runs in a worker process.
+    Raises ValueError when the upload is not a usable image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    # Pillow only refuses images above twice its limit, so the size in the
+    # header is checked here, before any pixel is decoded
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        image = Image.open(io.BytesIO(original))
+        if image.width * image.height > MAX_PIXELS:
+            raise ValueError(f"Images may have at most {MAX_PIXELS // 1_000_000} megapixels")
+        image.load()
+    except (UnidentifiedImageError, OSError):
+        raise ValueError("Not a usable image")
+
+    # Phones store rotation in EXIF; bake it in before EXIF is dropped
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    out_dir = os.path.join(image_dir, "workshops")
+    os.makedirs(out_dir, exist_ok=True)
+    variants = {}
+    for name, (edge, quality) in VARIANTS.items():
+        variant = image.copy()
+        # Never upscales
+        variant.thumbnail((edge, edge), Image.LANCZOS)
+        buffer = io.BytesIO()
+        variant.save(buffer, "WEBP", quality=quality, method=6)
+        data = buffer.getvalue()
+        filename = f"{name}-{content_hash(data)}.webp"
+        _write_once(os.path.join(out_dir, filename), data)
+        variants[name] = {"path": f"workshops/{filename}", "width": variant.width, "height": variant.height}
+    return variants
+
+
+def _pool_executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Forking a process with a running event loop and Mongo client threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=get_settings().image_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _pool
+
+
+def variants_dir() -> str:
+    return os.path.join(get_settings().image_dir, "workshops")
+
+
+def ensure_image_dirs():
+    os.makedirs(os.path.join(get_settings().image_dir, "originals"), exist_ok=True)
+    os.makedirs(variants_dir(), exist_ok=True)
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool so the next upload starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+
+async def store_workshop_image(original: bytes, extension: str, base_url: str) -> Dict[str, dict]:
+    """
+    Render an upload's variants, then keep the original; returns each
+    variant's URL and size. Raises ValueError for anything but an image and
+    ImageWorkersUnavailable when the render pool keeps breaking.
+    """
+    image_dir = get_settings().image_dir
+    loop = asyncio.get_running_loop()
+    # A worker that dies (e.g. killed for memory) breaks the whole pool; retry once on a fresh one
+    for _ in range(2):
+        pool = _pool_executor()
+        try:
+            variants = await loop.run_in_executor(pool, render_variants, original, image_dir)
+            break
+        except BrokenProcessPool:
+            _discard_pool(pool)
+    else:
+        raise ImageWorkersUnavailable("Image processing is unavailable, try again later")
+    await asyncio.to_thread(
+        _write_once, os.path.join(image_dir, "originals", f"{content_hash(original)}.{extension}"), original
+    )
+    return {
+        name: {"url": f"{base_url.rstrip('/')}/media/{variant['path']}", "width": variant["width"], "height": variant["height"]}
+        for name, variant in variants.items()
+    }
+
+
+class WorkshopImageFiles(StaticFiles):
+    """
+    Serves the variants directory. Names carry the content hash, so browsers
+    and CDNs may cache them for a year. The directory is resolved from
+    settings on the first request rather than at import time.
+    """
+    def __init__(self):
+        super().__init__(directory=None, check_dir=False)
+
+    async def check_config(self):
+        self.directory = variants_dir()
+        self.all_directories = self.get_directories(self.directory)
+        await super().check_config()
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
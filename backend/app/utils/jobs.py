@@ -0,0 +1,69 @@
+import time
+from typing import Dict, Generic, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.utils.db import background_jobs_collection
+
+# Least time between progress writes of a running job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+JobT = TypeVar("JobT", bound=BaseModel)
+
+
+class JobStore(Generic[JobT]):
+    """
+    Background job records shared by every worker process.
+
+    Jobs run on the worker that accepted them and are updated in memory
+    there; their state is written through to Mongo on creation, on status
+    changes and at most once a second while running, so any worker can
+    answer a progress poll.
+    """
+    def __init__(self, kind: str, model: Type[JobT]):
+        self.kind = kind
+        self.model = model
+        self._local: Dict[str, JobT] = {}
+        self._saved_at: Dict[str, float] = {}
+
+    async def add(self, job: JobT) -> JobT:
+        self._local[job.id] = job
+        await self.save(job)
+        return job
+
+    async def save(self, job: JobT):
+        self._saved_at[job.id] = time.monotonic()
+        await background_jobs_collection.replace_one(
+            {"_id": job.id},
+            {"kind": self.kind, **job.model_dump(exclude={"id"})},
+            upsert=True
+        )
+
+    async def save_progress(self, job: JobT):
+        if time.monotonic() - self._saved_at.get(job.id, 0) >= PROGRESS_INTERVAL_SECONDS:
+            await self.save(job)
+
+    async def finish(self, job: JobT):
+        """Final write; the job is then only kept in Mongo"""
+        await self.save(job)
+        self._local.pop(job.id, None)
+        self._saved_at.pop(job.id, None)
+
+    async def get(self, job_id: str) -> Optional[JobT]:
+        job = self._local.get(job_id)
+        if job is not None:
+            return job
+        doc = await background_jobs_collection.find_one({"_id": job_id, "kind": self.kind})
+        if doc is None:
+            return None
+        doc["id"] = doc.pop("_id")
+        return self.model.model_validate(doc)
+
+    async def list(self, limit: int = 100) -> List[JobT]:
+        cursor = background_jobs_collection.find({"kind": self.kind}).sort("created_at", -1).limit(limit)
+        jobs = []
+        async for doc in cursor:
+            doc["id"] = doc.pop("_id")
+            # Running jobs on this worker are fresher in memory
+            jobs.append(self._local.get(doc["id"]) or self.model.model_validate(doc))
+        return jobs
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from bson import ObjectId
+
+from app.config import get_settings
+from app.models.payment import PaymentEvent, PaymentStats
+from app.utils.audit import audit
+from app.utils.db import registrations_collection, workshops_collection
+from app.utils.email import send_registration_approval
+from app.utils.rollups import record_status_change
+from app.utils.seat_holds import convert_holds, restore_paid_holds
+
+logger = logging.getLogger(__name__)
+
+# Recently applied (payment_id, status) pairs, to drop gateway redeliveries early
+RECENT_EVENTS_SIZE = 50000
+
+PAYMENT_STATUSES = {"completed", "failed"}
+
+# Seconds between attempts at a batch that failed to apply, doubling up to the max
+RETRY_BACKOFF_START = 1
+RETRY_BACKOFF_MAX = 60
+
+# How long shutdown waits for queued events before giving up on them
+STOP_TIMEOUT = 30
+
+payment_stats = PaymentStats()
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+_recent: "OrderedDict[tuple, None]" = OrderedDict()
+_tasks: Set[asyncio.Task] = set()
+
+
+def sign_payload(body: bytes, secret: str) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: Optional[str]) -> bool:
+    secret = get_settings().payment_webhook_secret
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature)
+
+
+def enqueue_event(event: PaymentEvent) -> bool:
+    """
+    Queue an event for the batch writer. Returns False when the queue is full
+    so the caller can ask the gateway to retry later.
+    """
+    payment_stats.received += 1
+    key = (event.payment_id, event.status)
+    if key in _recent:
+        payment_stats.duplicates += 1
+        return True
+    try:
+        _queue.put_nowait(event)
+    except asyncio.QueueFull:
+        return False
+    payment_stats.queued = _queue.qsize()
+    return True
+
+
+def _remember(key: tuple):
+    _recent[key] = None
+    _recent.move_to_end(key)
+    while len(_recent) > RECENT_EVENTS_SIZE:
+        _recent.popitem(last=False)
+
+
+async def _collect_batch() -> List[PaymentEvent]:
+    settings = get_settings()
+    batch = [await _queue.get()]
+    deadline = asyncio.get_running_loop().time() + settings.payment_batch_interval_ms / 1000
+    while len(batch) < settings.payment_batch_size:
+        timeout = deadline - asyncio.get_running_loop().time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def apply_batch(events: List[PaymentEvent]):
+    """
+    Apply a batch of payment events with one bulk_write. Within a batch the
+    last event per payment wins; filters skip registrations that already
+    carry the same payment_id and status, so redeliveries are no-ops, and
+    a failure never overwrites a completed payment. Every
+    step after the write is conditional too, so a failed batch can be
+    applied again as a whole.
+    """
+    from pymongo import UpdateOne
+
+    latest: Dict[str, PaymentEvent] = {}
+    for event in events:
+        if event.status not in PAYMENT_STATUSES:
+            payment_stats.rejected += 1
+            continue
+        if event.payment_id in latest:
+            payment_stats.duplicates += 1
+        latest[event.payment_id] = event
+
+    by_registration: Dict[ObjectId, PaymentEvent] = {}
+    for event in latest.values():
+        try:
+            by_registration[ObjectId(event.registration_id)] = event
+        except Exception:
+            payment_stats.rejected += 1
+    if not by_registration:
+        return
+
+    operations = []
+    for oid, event in by_registration.items():
+        fields = {"payment_status": event.status, "payment_id": event.payment_id}
+        if event.amount is not None:
+            fields["amount_paid"] = event.amount
+        query = {"_id": oid, "$or": [
+            {"payment_id": {"$ne": event.payment_id}},
+            {"payment_status": {"$ne": event.status}},
+        ]}
+        if event.status == "failed":
+            # A completed payment is final; a late or redelivered failure must not undo it
+            query["payment_status"] = {"$ne": "completed"}
+        operations.append(UpdateOne(query, {"$set": fields}))
+
+    result = await registrations_collection.bulk_write(operations, ordered=False)
+    payment_stats.applied += result.modified_count
+    payment_stats.batches += 1
+
+    auto_approve = get_settings().payment_auto_approve
+    # Paid registrations stop holding their seat on a timer
+    paid = [oid for oid, e in by_registration.items() if e.status == "completed"]
+    await convert_holds(paid)
+    # Payments that arrived after their hold lapsed take a seat again if one is free
+    restored = await restore_paid_holds(paid, "approved" if auto_approve else "pending")
+    for registration in restored:
+        await audit("registration", registration["_id"], "restored_after_payment", changes={
+            "registration_status": {"from": "expired", "to": "approved" if auto_approve else "pending"}
+        })
+
+    approved = await _approve_paid(paid) if auto_approve else []
+    for event in latest.values():
+        _remember((event.payment_id, event.status))
+    if auto_approve and (approved or restored):
+        _track(asyncio.create_task(_send_approvals(approved + restored)))
+
+
+async def _approve_paid(registration_ids: List[ObjectId]) -> List[dict]:
+    """
+    Approve paid registrations that are still pending. Each approval is its
+    own conditional update and only those it actually changed get rollups,
+    audit entries and emails, so a retried batch approves nobody twice.
+    """
+    if not registration_ids:
+        return []
+    candidates = await registrations_collection.find(
+        {"_id": {"$in": registration_ids}, "registration_status": "pending", "payment_status": "completed"},
+        {"workshop_id": 1, "email": 1, "full_name": 1, "grade": 1, "school": 1, "created_at": 1}
+    ).to_list(None)
+    results = await asyncio.gather(*(
+        registrations_collection.update_one(
+            {"_id": registration["_id"], "registration_status": "pending", "payment_status": "completed"},
+            {"$set": {"registration_status": "approved"}}
+        )
+        for registration in candidates
+    ))
+    approved = [registration for registration, result in zip(candidates, results) if result.modified_count]
+    for registration in approved:
+        await record_status_change(registration, "pending", "approved")
+        await audit("registration", registration["_id"], "auto_approved", changes={
+            "registration_status": {"from": "pending", "to": "approved"}
+        })
+    payment_stats.auto_approved += len(approved)
+    return approved
+
+
+def _track(task: asyncio.Task):
+    """Keep a reference to a background task until it finishes and log its failure"""
+    _tasks.add(task)
+    task.add_done_callback(_task_done)
+
+
+def _task_done(task: asyncio.Task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Payment background task failed", exc_info=task.exception())
+
+
+async def _send_approvals(registrations: List[dict]):
+    workshop_ids = {ObjectId(r["workshop_id"]) for r in registrations}
+    workshops = {
+        str(w["_id"]): w
+        async for w in workshops_collection.find({"_id": {"$in": list(workshop_ids)}}, {"title": 1, "start_date": 1})
+    }
+    for registration in registrations:
+        workshop = workshops.get(registration["workshop_id"])
+        if not workshop:
+            continue
+        try:
+            await send_registration_approval(
+                registration["email"],
+                registration["full_name"],
+                workshop["title"],
+                workshop["start_date"].strftime("%Y-%m-%d %H:%M")
+            )
+        except Exception:
+            logger.exception("Failed to send the approval email for registration %s", registration["_id"])
+
+
+async def _run_worker():
+    while True:
+        batch = await _collect_batch()
+        # Events were acknowledged to the gateway, so a failed batch is retried
+        # until it applies; meanwhile the queue fills and new webhooks get 503
+        delay = RETRY_BACKOFF_START
+        while True:
+            try:
+                await apply_batch(batch)
+                break
+            except Exception:
+                payment_stats.retries += 1
+                logger.exception("Failed to apply %d payment events, retrying in %ds", len(batch), delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_BACKOFF_MAX)
+        for _ in batch:
+            _queue.task_done()
+        payment_stats.queued = _queue.qsize()
+
+
+def start_payment_worker():
+    global _queue, _worker
+    _queue = asyncio.Queue(maxsize=get_settings().payment_queue_size)
+    _worker = asyncio.create_task(_run_worker())
+
+
+async def stop_payment_worker():
+    """Apply whatever is still queued, then stop the batch writer"""
+    global _worker
+    if _worker is None:
+        return
+    try:
+        await asyncio.wait_for(_queue.join(), STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error("Stopping with %d payment events not applied", _queue.qsize())
+    _worker.cancel()
+    _worker = None
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
@@ -0,0 +1,294 @@
+"""
+On-demand request profiling.
+
+With PROFILE_ENABLED set, a request is profiled when an admin sends
+`X-Profile: 1` or when it is picked by PROFILE_SAMPLE_RATE (optionally only
+under PROFILE_PATHS). A sampler thread then records the handling task's
+stack every PROFILE_INTERVAL_MS, on-CPU or suspended in an await, so the
+profile shows wall-clock time. Mongo commands and SMTP sends made while
+handling the request are timed alongside. Each profile is written to
+PROFILE_DIR as folded stacks weighted in microseconds (`<id>.folded`,
+readable by flamegraph.pl or speedscope) plus a JSON summary (`<id>.json`), and the response carries
+its id in an X-Profile-Id header. When disabled the middleware only
+checks a flag.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from pymongo import monitoring
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class RequestProfile:
+    def __init__(self, task: asyncio.Task, root, interval: float):
+        self.id = os.urandom(8).hex()
+        self.interval = interval
+        # Folded stack -> microseconds of wall time it accounts for
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        # (kind, name) -> [calls, total_ms, max_ms]
+        self.timings: Dict[Tuple[str, str], List[float]] = {}
+        self._timings_lock = threading.Lock()  # Mongo events arrive on executor threads
+        self._task = task
+        self._root = root  # frame stacks are reported from, so server and middleware frames are left out
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profile-{self.id}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def record(self, kind: str, name: str, duration_ms: float):
+        with self._timings_lock:
+            timing = self.timings.setdefault((kind, name), [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += duration_ms
+            timing[2] = max(timing[2], duration_ms)
+
+    def _run(self):
+        # Weighting each sample by the time since the previous one keeps CPU-bound
+        # stretches, during which this thread waits for the GIL, from being undercounted
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            stack = self._sample()
+            now = time.perf_counter()
+            if stack:
+                self.stacks[stack] += int((now - last) * 1e6)
+                self.samples += 1
+            last = now
+
+    def _sample(self) -> Optional[str]:
+        # On-CPU: the task's outermost frame is on the loop thread's stack
+        frame = sys._current_frames().get(self._loop_thread)
+        running = []
+        while frame is not None:
+            running.append(frame)
+            if frame is self._root:
+                return ";".join(_frame_label(f) for f in reversed(running))
+            frame = frame.f_back
+
+        # Suspended: follow the coroutine chain down to what it awaits
+        labels = []
+        awaitable = self._task.get_coro()
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is self._root or (labels and frame is not None):
+                labels.append(_frame_label(frame))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        if not labels:
+            return None
+        return ";".join(labels) + ";(waiting)"
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, scope: dict, trigger: str, status_code: Optional[int], duration_ms: float) -> dict:
+        route = scope.get("route")
+        endpoint = getattr(route, "endpoint", None)
+        timings = [
+            {"kind": kind, "name": name, "calls": calls, "total_ms": round(total, 3), "max_ms": round(longest, 3)}
+            for (kind, name), (calls, total, longest) in self.timings.items()
+        ]
+        timings.sort(key=lambda t: t["total_ms"], reverse=True)
+        return {
+            "id": self.id,
+            "created_at": datetime.utcnow(),
+            "trigger": trigger,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "handler": getattr(endpoint, "__name__", None),
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "timings": timings,
+        }
+
+
+@contextmanager
+def profile_timer(kind: str, name: str):
+    """Time a block into the current request's profile; free when none is running"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record(kind, name, (time.perf_counter() - started) * 1000)
+
+
+class ProfileCommandListener(monitoring.CommandListener):
+    """
+    Times Mongo commands into the profile of the request that issued them.
+    Motor copies the caller's context into its executor threads.
+    """
+    def __init__(self):
+        self._pending: Dict[int, Tuple[RequestProfile, str]] = {}
+
+    def started(self, event):
+        profile = _current_profile.get()
+        if profile is None:
+            return
+        collection = event.command.get(event.command_name)
+        name = f"{event.command_name} {collection}" if isinstance(collection, str) else event.command_name
+        self._pending[event.request_id] = (profile, name)
+
+    def _finish(self, event):
+        pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        profile, name = pending
+        profile.record("mongo", name, event.duration_micros / 1000)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+
+def profiling_enabled() -> bool:
+    return get_settings().profile_enabled
+
+
+def _is_admin_token(authorization: bytes) -> bool:
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    settings = get_settings()
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return False
+    return payload.get("role") == "admin"
+
+
+def profile_path(profile_id: str, extension: str) -> str:
+    return os.path.join(get_settings().profile_dir, f"{profile_id}.{extension}")
+
+
+def _write_profile(profile: RequestProfile, summary: dict):
+    settings = get_settings()
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    with open(profile_path(profile.id, "folded"), "w") as f:
+        f.write(profile.folded())
+    with open(profile_path(profile.id, "json"), "w") as f:
+        json.dump(summary, f, default=str)
+
+    # Keep only the newest profiles
+    summaries = sorted(
+        (entry for entry in os.scandir(settings.profile_dir) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in summaries[settings.profile_keep:]:
+        profile_id = entry.name[:-len(".json")]
+        for extension in ("json", "folded"):
+            try:
+                os.remove(profile_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[dict]:
+    """Stored profile summaries, newest first"""
+    directory = get_settings().profile_dir
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".json"):
+            with open(entry.path) as f:
+                summaries.append(json.load(f))
+    summaries.sort(key=lambda summary: summary["created_at"], reverse=True)
+    return summaries
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if not profile_id.isalnum():
+        return None
+    try:
+        with open(profile_path(profile_id, "json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware running admin-requested or sampled requests under the
+    sampling profiler and saving the result to disk.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile") == b"1" and _is_admin_token(headers.get(b"authorization", b"")):
+            return "header"
+        settings = get_settings()
+        if settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate:
+            prefixes = [p.strip() for p in settings.profile_paths.split(",") if p.strip()]
+            if not prefixes or scope["path"].startswith(tuple(prefixes)):
+                return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_enabled():
+            return await self.app(scope, receive, send)
+        trigger = self._trigger(scope)
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(asyncio.current_task(), sys._getframe(), get_settings().profile_interval_ms / 1000)
+        status_code = None
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _current_profile.reset(token)
+            summary = profile.summary(scope, trigger, status_code, (time.perf_counter() - started) * 1000)
+            try:
+                await asyncio.to_thread(_write_profile, profile, summary)
+            except OSError as e:
+                logger.warning("Could not save profile %s: %s", profile.id, e)
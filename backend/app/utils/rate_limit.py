@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+from app.utils.db import rate_limits_collection
+
+# Buckets kept by the in-memory store; the least recently used are dropped first
+MEMORY_STORE_SIZE = 100000
+
+
+class RateLimit:
+    """
+    Token bucket: up to `limit` requests at once, refilled continuously at
+    limit/window per second, so no sliding window of `window` seconds ever
+    allows more than about 2 * limit requests and a steady caller gets `limit`.
+    """
+    def __init__(self, name: str, limit: int, window: int):
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.window
+
+
+class MemoryStore:
+    """Buckets in this worker's memory; enough when the API runs as one process"""
+    def __init__(self, size: int = MEMORY_STORE_SIZE):
+        self.size = size
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rule: RateLimit) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (rule.limit, now))
+        tokens = min(rule.limit, tokens + (now - updated) * rule.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.size:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class MongoStore:
+    """
+    Buckets shared by every worker, one document per key, refilled and taken
+    from in a single atomic pipeline update
+    """
+    async def take(self, key: str, rule: RateLimit) -> Tuple[bool, float]:
+        from pymongo import ReturnDocument
+
+        now = datetime.utcnow()
+        elapsed_seconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [
+            rule.limit,
+            {"$add": [{"$ifNull": ["$tokens", rule.limit]}, {"$multiply": [elapsed_seconds, rule.rate]}]},
+        ]}
+        doc = await rate_limits_collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    # A bucket untouched for a whole window is full again and can be dropped
+                    "expires_at": now + timedelta(seconds=rule.window),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["allowed"], doc["tokens"]
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = MongoStore() if get_settings().rate_limit_store == "mongo" else MemoryStore()
+    return _store
+
+
+def client_ip(request: Request) -> str:
+    if get_settings().rate_limit_trust_proxy:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce(rule: RateLimit, *identities: Optional[str]):
+    """
+    Take a token for each identity (IP, email, ...) and reject the request
+    with 429 as soon as one of them is out of tokens
+    """
+    for identity in identities:
+        if not identity:
+            continue
+        allowed, tokens = await get_store().take(f"{rule.name}:{identity.lower()}", rule)
+        if not allowed:
+            retry_after = max(1, int((1 - tokens) / rule.rate) + 1)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+
+async def limit_by_ip_and_email(request: Request, limits: Tuple[RateLimit, RateLimit], email: str):
+    ip_limit, email_limit = limits
+    await enforce(ip_limit, client_ip(request))
+    await enforce(email_limit, email)
+
+
+def login_limits() -> Tuple[RateLimit, RateLimit]:
+    settings = get_settings()
+    return (
+        RateLimit("login-ip", settings.login_attempts_per_ip, settings.login_window_seconds),
+        RateLimit("login-email", settings.login_attempts_per_email, settings.login_window_seconds),
+    )
+
+
+def otp_limits() -> Tuple[RateLimit, RateLimit]:
+    settings = get_settings()
+    return (
+        RateLimit("otp-ip", settings.otp_requests_per_ip, settings.otp_window_seconds),
+        RateLimit("otp-email", settings.otp_requests_per_email, settings.otp_window_seconds),
+    )
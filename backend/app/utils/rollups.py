@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.utils.archive import file_archived_workshops, iter_archived_registrations
+from app.utils.db import registrations_collection, registrations_archive_collection, registration_rollups_collection
+
+# Granularities kept in the rollup collection
+ROLLUP_PERIODS = ("day", "hour")
+
+# Dimensions a rollup query can be grouped by
+ROLLUP_DIMENSIONS = ("workshop_id", "grade", "school")
+
+
+def truncate_to_period(value: datetime, period: str) -> datetime:
+    """Truncate a datetime to the start of its day or hour bucket"""
+    if period == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_key(registration: Dict[str, Any], period: str) -> Dict[str, Any]:
+    created_at = registration.get("created_at") or datetime.utcnow()
+    return {
+        "period": period,
+        "bucket": truncate_to_period(created_at, period),
+        "workshop_id": str(registration.get("workshop_id")),
+        "grade": registration.get("grade"),
+        "school": registration.get("school"),
+    }
+
+
+async def _apply(registration: Dict[str, Any], inc: Dict[str, int]):
+    for period in ROLLUP_PERIODS:
+        await registration_rollups_collection.update_one(
+            _rollup_key(registration, period),
+            {"$inc": inc},
+            upsert=True
+        )
+
+
+async def record_registration(registration: Dict[str, Any], delta: int = 1):
+    """
+    Add (or, with delta=-1, remove) a registration from its day and hour buckets
+    """
+    status = registration.get("registration_status", "pending")
+    await _apply(registration, {"count": delta, f"statuses.{status}": delta})
+
+
+async def record_status_change(registration: Dict[str, Any], old_status: str, new_status: str):
+    """
+    Move a registration between status counters in the buckets it was created in
+    """
+    if old_status == new_status:
+        return
+    await _apply(registration, {f"statuses.{old_status}": -1, f"statuses.{new_status}": 1})
+
+
+async def record_status_changes(registrations: List[Dict[str, Any]], old_status: str, new_status: str):
+    """
+    record_status_change for many registrations at once: the deltas are
+    summed per bucket and applied with one bulk_write
+    """
+    if old_status == new_status or not registrations:
+        return
+    from pymongo import UpdateOne
+
+    deltas: Dict[tuple, List[Any]] = {}
+    for registration in registrations:
+        for period in ROLLUP_PERIODS:
+            key = _rollup_key(registration, period)
+            deltas.setdefault(tuple(key.values()), [key, 0])[1] += 1
+    await registration_rollups_collection.bulk_write([
+        UpdateOne(key, {"$inc": {f"statuses.{old_status}": -count, f"statuses.{new_status}": count}}, upsert=True)
+        for key, count in deltas.values()
+    ], ordered=False)
+
+
+def _backfill_pipeline(period: str) -> List[Dict[str, Any]]:
+    key = {
+        "bucket": {"$dateTrunc": {"date": "$created_at", "unit": period}},
+        "workshop_id": "$workshop_id",
+        "grade": "$grade",
+        "school": "$school",
+    }
+    match = {"$match": {"created_at": {"$type": "date"}}}
+    return [
+        match,
+        # Archived registrations keep counting towards the history
+        {"$unionWith": {"coll": registrations_archive_collection.name, "pipeline": [match]}},
+        {"$group": {
+            "_id": {**key, "status": "$registration_status"},
+            "count": {"$sum": 1},
+        }},
+        {"$group": {
+            "_id": {k: f"$_id.{k}" for k in key},
+            "count": {"$sum": "$count"},
+            "statuses": {"$push": {"k": {"$ifNull": ["$_id.status", "pending"]}, "v": "$count"}},
+        }},
+        {"$project": {
+            "_id": 0,
+            "period": {"$literal": period},
+            "bucket": "$_id.bucket",
+            "workshop_id": "$_id.workshop_id",
+            "grade": "$_id.grade",
+            "school": "$_id.school",
+            "count": 1,
+            "statuses": {"$arrayToObject": "$statuses"},
+        }},
+        {"$merge": {
+            "into": registration_rollups_collection.name,
+            "on": ["period", "bucket", "workshop_id", "grade", "school"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+async def _backfill_file_archives():
+    """
+    Rollups of workshops archived to ndjson files, counted while streaming
+    each file. A workshop's registrations all live in one place, so these
+    buckets never overlap the ones built from the collections.
+    """
+    buckets: Dict[tuple, Dict[str, Any]] = {}
+    for workshop in await file_archived_workshops():
+        async for registration in iter_archived_registrations(workshop):
+            if not isinstance(registration.get("created_at"), datetime):
+                continue
+            status = registration.get("registration_status") or "pending"
+            for period in ROLLUP_PERIODS:
+                key = _rollup_key(registration, period)
+                bucket = buckets.setdefault(tuple(key.values()), {**key, "count": 0, "statuses": {}})
+                bucket["count"] += 1
+                bucket["statuses"][status] = bucket["statuses"].get(status, 0) + 1
+        if len(buckets) >= 1000:
+            await _write_buckets(buckets)
+            buckets = {}
+    await _write_buckets(buckets)
+
+
+async def _write_buckets(buckets: Dict[tuple, Dict[str, Any]]):
+    from pymongo import ReplaceOne
+
+    if buckets:
+        await registration_rollups_collection.bulk_write([
+            ReplaceOne({k: bucket[k] for k in ("period", "bucket", "workshop_id", "grade", "school")}, bucket, upsert=True)
+            for bucket in buckets.values()
+        ], ordered=False)
+
+
+async def backfill_rollups():
+    """
+    Rebuild the rollup collection from the raw registrations, including
+    archived ones (one-off aggregation)
+    """
+    await registration_rollups_collection.delete_many({})
+    for period in ROLLUP_PERIODS:
+        await registrations_collection.aggregate(_backfill_pipeline(period)).to_list(None)
+    await _backfill_file_archives()
+    return await registration_rollups_collection.count_documents({})
+
+
+async def query_rollups(
+    start: datetime,
+    end: datetime,
+    period: str = "day",
+    group_by: Optional[List[str]] = None,
+    workshop_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Sum rollup buckets in [start, end) grouped by bucket and the requested dimensions
+    """
+    group_by = group_by or []
+    match = {"period": period, "bucket": {"$gte": start, "$lt": end}}
+    if workshop_id:
+        match["workshop_id"] = workshop_id
+
+    group_id = {"bucket": "$bucket"}
+    for dimension in group_by:
+        group_id[dimension] = f"${dimension}"
+
+    pipeline = [
+        {"$match": match},
+        {"$project": {
+            **{k: 1 for k in group_id},
+            "statuses": {"$objectToArray": {"$ifNull": ["$statuses", {}]}},
+        }},
+        {"$unwind": "$statuses"},
+        {"$group": {
+            "_id": {**group_id, "status": "$statuses.k"},
+            "count": {"$sum": "$statuses.v"},
+        }},
+    ]
+    raw = await registration_rollups_collection.aggregate(pipeline).to_list(None)
+    return _merge_status_rows(raw, group_by)
+
+
+def _merge_status_rows(raw: List[Dict[str, Any]], group_by: List[str]) -> List[Dict[str, Any]]:
+    # Fold per-status rows back into one row per bucket/group; every registration
+    # is counted under exactly one status, so the statuses sum to the total
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for item in raw:
+        key = tuple(item["_id"].get(k) for k in ["bucket", *group_by])
+        row = rows.setdefault(key, {
+            "bucket": item["_id"]["bucket"],
+            **{k: item["_id"].get(k) for k in group_by},
+            "count": 0,
+            "statuses": {},
+        })
+        status = item["_id"]["status"]
+        row["statuses"][status] = row["statuses"].get(status, 0) + item["count"]
+    for row in rows.values():
+        row["count"] = sum(row["statuses"].values())
+    return sorted(rows.values(), key=lambda r: r["bucket"])
+
+
+def daily_series(rows: List[Dict[str, Any]], start: datetime, days: int) -> List[Dict[str, Any]]:
+    """Expand day-bucket rows into a dense [{date, count}] series"""
+    counts = {row["bucket"]: row["count"] for row in rows}
+    series = []
+    for i in range(days):
+        date = start + timedelta(days=i)
+        series.append({"date": date.strftime("%Y-%m-%d"), "count": counts.get(date, 0)})
+    return series
+
+
+if __name__ == "__main__":
+    # One-off backfill: python -m app.utils.rollups
+    import asyncio
+
+    print(f"Rebuilt {asyncio.run(backfill_rollups())} rollup buckets")
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.config import get_settings
+from app.models.registration import SeatHoldStats
+from app.utils.db import registrations_collection, workshops_collection
+from app.utils.rollups import record_status_change, record_status_changes
+
+logger = logging.getLogger(__name__)
+
+# Registration status given to holds that lapsed without payment
+EXPIRED_STATUS = "expired"
+
+# Fields the rollups need from each expired registration
+EXPIRED_PROJECTION = {"workshop_id": 1, "grade": 1, "school": 1, "created_at": 1, "registration_status": 1}
+
+# A sweep's claimed seats still unreleased after this long belong to a sweep that died
+STALE_RELEASE_AFTER = timedelta(minutes=10)
+
+seat_hold_stats = SeatHoldStats()
+_sweeper: Optional[asyncio.Task] = None
+
+
+async def reserve_seat(workshop_id: str) -> bool:
+    """
+    Take a seat in one conditional update, so concurrent registrations can't
+    push a workshop past max_participants. Returns False when it is full.
+    """
+    result = await workshops_collection.update_one(
+        {"_id": ObjectId(workshop_id), "$expr": {"$lt": ["$registered_count", "$max_participants"]}},
+        {"$inc": {"registered_count": 1}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+    return result.modified_count == 1
+
+
+async def release_seat(workshop_id: str, count: int = 1):
+    await workshops_collection.update_one(
+        {"_id": ObjectId(workshop_id)},
+        {"$inc": {"registered_count": -count}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+
+
+def hold_expiry(workshop: Dict[str, Any], now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    When a new pending-payment registration for this workshop stops holding
+    its seat; None for free workshops or when holds are disabled
+    """
+    minutes = get_settings().seat_hold_minutes
+    if minutes <= 0 or not workshop.get("fee"):
+        return None
+    return (now or datetime.utcnow()) + timedelta(minutes=minutes)
+
+
+def record_hold_created():
+    seat_hold_stats.created += 1
+
+
+async def convert_holds(registration_ids: List[ObjectId]) -> int:
+    """Paid or approved registrations keep their seat for good"""
+    if not registration_ids:
+        return 0
+    result = await registrations_collection.update_many(
+        {"_id": {"$in": registration_ids}, "hold_expires_at": {"$exists": True}},
+        {"$unset": {"hold_expires_at": ""}}
+    )
+    seat_hold_stats.converted += result.modified_count
+    return result.modified_count
+
+
+async def _release(sweep_id: str) -> int:
+    """
+    Give back the seats of the registrations a sweep claimed. The sweep id
+    gives the caller sole ownership, so one update_many clears the markers
+    and only the registrations it cleared have their seats returned; a crash
+    in between leaks seats rather than overbooking them.
+    """
+    from pymongo import UpdateOne
+
+    claimed = await registrations_collection.find(
+        {"seat_release_pending": sweep_id}, EXPIRED_PROJECTION
+    ).to_list(None)
+    if not claimed:
+        return 0
+
+    result = await registrations_collection.update_many(
+        {"seat_release_pending": sweep_id}, {"$unset": {"seat_release_pending": ""}}
+    )
+    released = claimed
+    if result.modified_count != len(claimed):
+        # A late payment took some back in the meantime (restore_paid_holds): they are no longer expired
+        released = await registrations_collection.find(
+            {
+                "_id": {"$in": [registration["_id"] for registration in claimed]},
+                "registration_status": EXPIRED_STATUS,
+                "seat_release_pending": {"$exists": False},
+            },
+            EXPIRED_PROJECTION
+        ).to_list(None)
+    if not released:
+        return 0
+
+    per_workshop: Dict[str, int] = {}
+    for registration in released:
+        per_workshop[registration["workshop_id"]] = per_workshop.get(registration["workshop_id"], 0) + 1
+    now = datetime.utcnow()
+    await workshops_collection.bulk_write([
+        UpdateOne(
+            {"_id": ObjectId(workshop_id)},
+            {"$inc": {"registered_count": -count}, "$set": {"updated_at": now}}
+        )
+        for workshop_id, count in per_workshop.items()
+    ], ordered=False)
+
+    await record_status_changes(released, "pending", EXPIRED_STATUS)
+    return len(released)
+
+
+async def sweep_expired_holds(now: Optional[datetime] = None) -> int:
+    """
+    Expire every lapsed hold without a completed payment and give its seat back.
+
+    One update_many claims all lapsed holds (a payment that lands first
+    takes the registration out of the filter, one that lands after is
+    handled by restore_paid_holds). The claimed registrations are tagged
+    with the sweep's id, then their seats are returned per workshop.
+    """
+    now = now or datetime.utcnow()
+    sweep_id = uuid.uuid4().hex
+
+    # Registrations claimed by a sweep that stopped before releasing them are
+    # re-tagged with this sweep's id first, so each has a single owner even
+    # when several workers recover at once
+    for stale_id in await registrations_collection.distinct(
+        "seat_release_pending",
+        {"seat_release_pending": {"$exists": True}, "expired_at": {"$lt": now - STALE_RELEASE_AFTER}}
+    ):
+        await registrations_collection.update_many(
+            {"seat_release_pending": stale_id, "expired_at": {"$lt": now - STALE_RELEASE_AFTER}},
+            {"$set": {"seat_release_pending": sweep_id}}
+        )
+
+    await registrations_collection.update_many(
+        # Failed payments lapse too; only a completed one keeps the seat
+        {"hold_expires_at": {"$lte": now}, "payment_status": {"$ne": "completed"}, "registration_status": "pending"},
+        {
+            "$set": {"registration_status": EXPIRED_STATUS, "expired_at": now, "seat_release_pending": sweep_id},
+            "$unset": {"hold_expires_at": ""},
+        }
+    )
+    released = await _release(sweep_id)
+
+    seat_hold_stats.expired += released
+    seat_hold_stats.sweeps += 1
+    seat_hold_stats.last_sweep_at = now
+    return released
+
+
+async def restore_expired(registration: Dict[str, Any], status: str) -> Optional[bool]:
+    """
+    Take an expired registration back to `status` with a seat. A seat the
+    sweep has not returned yet is simply kept, otherwise one is reserved
+    again. Returns False when the workshop has filled up in the meantime and
+    None when the registration was no longer expired.
+    """
+    # Still claimed by a sweep: taking it back out keeps its seat
+    result = await registrations_collection.update_one(
+        {"_id": registration["_id"], "registration_status": EXPIRED_STATUS, "seat_release_pending": {"$exists": True}},
+        {"$set": {"registration_status": status}, "$unset": {"seat_release_pending": "", "expired_at": "", "paid_after_expiry": ""}}
+    )
+    if result.modified_count:
+        await record_status_change(registration, "pending", status)
+        return True
+
+    if not await reserve_seat(registration["workshop_id"]):
+        return False
+    result = await registrations_collection.update_one(
+        {"_id": registration["_id"], "registration_status": EXPIRED_STATUS},
+        {"$set": {"registration_status": status}, "$unset": {"expired_at": "", "paid_after_expiry": ""}}
+    )
+    if not result.modified_count:
+        await release_seat(registration["workshop_id"])
+        return None
+    await record_status_change(registration, EXPIRED_STATUS, status)
+    return True
+
+
+async def restore_paid_holds(registration_ids: List[ObjectId], status: str = "pending") -> List[dict]:
+    """
+    Bring back registrations whose payment completed after their hold
+    expired. When the workshop has filled up in the meantime the
+    registration stays expired and is flagged paid_after_expiry for an
+    admin. Returns the restored registrations.
+    """
+    if not registration_ids:
+        return []
+    expired = await registrations_collection.find(
+        {"_id": {"$in": registration_ids}, "registration_status": EXPIRED_STATUS, "payment_status": "completed"},
+        {**EXPIRED_PROJECTION, "email": 1, "full_name": 1}
+    ).to_list(None)
+
+    restored = []
+    for registration in expired:
+        outcome = await restore_expired(registration, status)
+        if outcome:
+            restored.append(registration)
+        elif outcome is False:
+            await registrations_collection.update_one(
+                {"_id": registration["_id"]}, {"$set": {"paid_after_expiry": True}}
+            )
+            logger.warning("Registration %s was paid after its hold expired and the workshop is full", registration["_id"])
+    return restored
+
+
+async def active_holds() -> int:
+    return await registrations_collection.count_documents({"hold_expires_at": {"$exists": True}})
+
+
+async def _run_sweeper(interval: int):
+    while True:
+        try:
+            released = await sweep_expired_holds()
+            if released:
+                logger.info("Released %d expired seat holds", released)
+        except Exception:
+            logger.exception("Seat hold sweep failed")
+        await asyncio.sleep(interval)
+
+
+def start_hold_sweeper():
+    global _sweeper
+    settings = get_settings()
+    if settings.seat_hold_minutes > 0:
+        _sweeper = asyncio.create_task(_run_sweeper(settings.seat_hold_sweep_seconds))
+
+
+def stop_hold_sweeper():
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        _sweeper = None
+
+
+if __name__ == "__main__":
+    # One-off sweep: python -m app.utils.seat_holds
+    print(f"Released {asyncio.run(sweep_expired_holds())} expired seat holds")
@@ -0,0 +1,107 @@
+import asyncio
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from app.config import get_settings
+
+# Request headers that change the response of a public read, so they are part of the key
+KEY_HEADERS = (b"authorization", b"if-none-match", b"if-modified-since")
+
+
+class SingleFlightStats:
+    def __init__(self):
+        self.routes: Dict[str, Dict[str, int]] = {}
+
+    def record(self, route: str, outcome: str):
+        counters = self.routes.setdefault(route, {"executed": 0, "coalesced": 0, "fallbacks": 0})
+        counters[outcome] += 1
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for route, counters in self.routes.items():
+            served = counters["executed"] + counters["coalesced"]
+            report[route] = {**counters, "coalesced_ratio": counters["coalesced"] / served if served else 0.0}
+        return report
+
+
+single_flight_stats = SingleFlightStats()
+
+
+class SingleFlightMiddleware:
+    """
+    ASGI middleware coalescing concurrent identical GET requests.
+
+    The first request for a key runs the handler; identical requests that
+    arrive while it is in flight wait for it and get a copy of its response
+    instead of running their own queries. Keys are the path plus the sorted
+    query string and the headers that shape the response. Nothing is kept
+    once the first request completes, so this is not a cache.
+    """
+    def __init__(self, app, paths: Iterable[str], enabled: Optional[bool] = None):
+        self.app = app
+        self.patterns: List[re.Pattern] = [re.compile(f"^{path}$") for path in paths]
+        self.enabled = get_settings().single_flight_enabled if enabled is None else enabled
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    def _route(self, path: str) -> Optional[str]:
+        for pattern in self.patterns:
+            if pattern.match(path):
+                return pattern.pattern[1:-1]
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        route = self._route(scope["path"])
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)))
+        key = (scope["path"], query, *(headers.get(name, b"") for name in KEY_HEADERS))
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            response = await asyncio.shield(leader)
+            if response is not None:
+                single_flight_stats.record(route, "coalesced")
+                return await self._replay(response, send)
+            # The first request failed; run this one on its own
+            single_flight_stats.record(route, "fallbacks")
+            return await self.app(scope, receive, send)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        response = None
+        try:
+            response = await self._run(scope, receive, send)
+            single_flight_stats.record(route, "executed")
+        finally:
+            del self._inflight[key]
+            future.set_result(response)
+
+    async def _run(self, scope, receive, send) -> Optional[Tuple[dict, bytes]]:
+        """Run the handler, forwarding its response and capturing it for the waiting requests"""
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Copied before send: outer middlewares add per-request headers to the original
+                start = {**message, "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if start is None or start["status"] >= 500:
+            return None
+        return start, b"".join(chunks)
+
+    @staticmethod
+    async def _replay(response: Tuple[dict, bytes], send):
+        start, body = response
+        await send({"type": "http.response.start", "status": start["status"], "headers": list(start.get("headers", []))})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,119 @@
+"""
+Check-in tickets for approved registrations.
+
+A ticket is the registration id and workshop id (12 bytes each) followed by
+an Ed25519 signature over them, base64url-encoded without padding into 118
+characters that fit a small QR code. Each workshop has its own key pair,
+derived from TICKET_SECRET (falling back to JWT_SECRET), and a roster
+snapshot carries only that workshop's public key: check-in devices verify
+the signature and that the registration is on the roster, but cannot mint
+tickets. Needs the cryptography package.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.config import get_settings
+from app.utils.db import registrations_collection
+
+SIGNATURE_BYTES = 64
+TICKET_BYTES = 24 + SIGNATURE_BYTES
+
+
+@lru_cache(maxsize=1024)
+def _signing_key(workshop_id: str, secret: str):
+    # cryptography is only loaded once a ticket is first issued or checked
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+    seed = hmac.new(secret.encode(), b"ticket:" + ObjectId(workshop_id).binary, hashlib.sha256).digest()
+    return Ed25519PrivateKey.from_private_bytes(seed)
+
+
+def signing_key(workshop_id: str):
+    settings = get_settings()
+    return _signing_key(workshop_id, settings.ticket_secret or settings.jwt_secret)
+
+
+def workshop_public_key(workshop_id: str) -> bytes:
+    """Raw 32-byte Ed25519 public key that verifies this workshop's tickets"""
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+    return signing_key(workshop_id).public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+
+def issue_ticket(registration_id: str, workshop_id: str) -> str:
+    body = ObjectId(registration_id).binary + ObjectId(workshop_id).binary
+    signature = signing_key(workshop_id).sign(body)
+    return base64.urlsafe_b64encode(body + signature).decode().rstrip("=")
+
+
+def verify_ticket(ticket: str, workshop_id: str) -> str:
+    """Registration id of a genuine ticket for this workshop; ValueError otherwise"""
+    from cryptography.exceptions import InvalidSignature
+
+    try:
+        raw = base64.urlsafe_b64decode(ticket + "=" * (-len(ticket) % 4))
+    except (binascii.Error, ValueError):
+        raise ValueError("malformed ticket")
+    if len(raw) != TICKET_BYTES:
+        raise ValueError("malformed ticket")
+    body, signature = raw[:24], raw[24:]
+    if body[12:] != ObjectId(workshop_id).binary:
+        raise ValueError("ticket is for another workshop")
+    try:
+        signing_key(workshop_id).public_key().verify(signature, body)
+    except InvalidSignature:
+        raise ValueError("bad ticket signature")
+    return str(ObjectId(body[:12]))
+
+
+def with_ticket(registration: dict) -> dict:
+    """Attach the ticket to an approved registration document"""
+    if registration.get("registration_status") == "approved":
+        registration["ticket"] = issue_ticket(str(registration["_id"]), registration["workshop_id"])
+    return registration
+
+
+async def sync_check_ins(workshop_id: str, check_ins: List[Tuple[str, datetime]]) -> Dict[str, object]:
+    """
+    Apply a batch of offline check-ins with one bulk_write. Each registration
+    keeps its earliest check-in time, so replays and overlapping syncs from
+    several devices are harmless.
+    """
+    earliest: Dict[str, datetime] = {}
+    invalid = []
+    for ticket, checked_in_at in check_ins:
+        try:
+            registration_id = verify_ticket(ticket, workshop_id)
+        except ValueError:
+            invalid.append(ticket)
+            continue
+        if checked_in_at.tzinfo:
+            checked_in_at = checked_in_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if registration_id not in earliest or checked_in_at < earliest[registration_id]:
+            earliest[registration_id] = checked_in_at
+
+    applied = 0
+    if earliest:
+        result = await registrations_collection.bulk_write([
+            UpdateOne(
+                {"_id": ObjectId(registration_id), "workshop_id": workshop_id, "registration_status": "approved"},
+                {"$min": {"checked_in_at": checked_in_at}}
+            )
+            for registration_id, checked_in_at in earliest.items()
+        ], ordered=False)
+        applied = result.modified_count
+
+    return {
+        "received": len(check_ins),
+        "applied": applied,
+        "unchanged": len(earliest) - applied,
+        "invalid": invalid,
+    }
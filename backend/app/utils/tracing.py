@@ -0,0 +1,281 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+
+# Spans go through this logger; a QueueHandler keeps the export off the event loop
+span_logger = logging.getLogger("app.tracing")
+span_logger.propagate = False
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+# ASGI scope of the request being handled; the router stores the matched route on it
+_current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], **attributes):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes: Dict[str, Any] = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None):
+        self.end_ns = end_ns or time.time_ns()
+        span_logger.info(self.name, extra={"span": self.to_dict()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned when the current request is not sampled, so callers never branch"""
+    trace_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def tracing_enabled() -> bool:
+    return get_settings().trace_exporter != "none"
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_route() -> Optional[str]:
+    """Path template of the route handling the current request, once routed"""
+    scope = _current_scope.get()
+    route = scope.get("route") if scope else None
+    return getattr(route, "path", None)
+
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", trace_id: Optional[str] = None, **attributes):
+    """
+    Record a child of the current span. With trace_id given, start a new root
+    span instead; without either there is nothing to attach to and this is free.
+    """
+    parent = _current_span.get()
+    if parent is None and trace_id is None:
+        yield NOOP_SPAN
+        return
+
+    span = Span(
+        name,
+        kind,
+        trace_id or parent.trace_id,
+        parent.span_id if parent and not trace_id else None,
+        **attributes
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[str]:
+    """Trace id from a W3C traceparent header (version-traceid-parentid-flags)"""
+    if not header:
+        return None
+    parts = header.split("-")
+    if len(parts) == 4 and len(parts[1]) == 32:
+        return parts[1]
+    return None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that opens a sampled root span per HTTP request, names it
+    after the matched route and returns the trace id in an X-Trace-Id header.
+    It also exposes the request scope to current_route().
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _current_scope.set(scope)
+        try:
+            await self._traced(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+    async def _traced(self, scope, receive, send):
+        if not tracing_enabled():
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        trace_id = parse_traceparent(headers.get(b"traceparent", b"").decode() or None)
+        if trace_id is None:
+            if random.random() >= get_settings().trace_sample_rate:
+                return await self.app(scope, receive, send)
+            trace_id = _new_id(16)
+
+        with start_span(f"{scope['method']} {scope['path']}", kind="server", trace_id=trace_id) as span:
+            span.set_attribute("http.method", scope["method"])
+            span.set_attribute("http.target", scope["path"])
+
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"x-trace-id", trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("handler", getattr(route.endpoint, "__name__", str(route.endpoint)))
+
+
+class JSONLinesHandler(logging.FileHandler):
+    def format(self, record):
+        return json.dumps(record.span, default=str)
+
+
+class OTLPHandler(logging.handlers.BufferingHandler):
+    """
+    Buffers spans and posts them as OTLP/HTTP JSON to a local collector,
+    flushing on size or after flush_interval seconds
+    """
+    def __init__(self, endpoint: str, capacity: int = 256, flush_interval: float = 2.0):
+        super().__init__(capacity)
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record):
+        return (
+            len(self.buffer) >= self.capacity
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def _otlp_span(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        end_ns = span["start_ns"] + int(span["duration_ms"] * 1e6)
+        otlp = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": SPAN_KINDS.get(span["kind"], 1),
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [
+                {"key": k, "value": {"stringValue": str(v)}}
+                for k, v in span["attributes"].items() if v is not None
+            ],
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+        }
+        if span["parent_id"]:
+            otlp["parentSpanId"] = span["parent_id"]
+        return otlp
+
+    def flush(self):
+        self.acquire()
+        try:
+            spans, self.buffer = self.buffer, []
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+        if not spans:
+            return
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "shibir-api"}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [self._otlp_span(r.span) for r in spans]}],
+        }]}
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError:
+            # Dropping spans is preferable to blocking or crashing the exporter thread
+            pass
+
+
+def setup_tracing():
+    """Start the background span exporter configured in settings"""
+    global _listener
+    settings = get_settings()
+    if settings.trace_exporter == "none" or _listener is not None:
+        return
+
+    if settings.trace_exporter == "otlp":
+        target = OTLPHandler(settings.trace_otlp_endpoint)
+    else:
+        target = JSONLinesHandler(settings.trace_file)
+
+    span_queue = queue.SimpleQueue()
+    span_logger.setLevel(logging.INFO)
+    span_logger.addHandler(logging.handlers.QueueHandler(span_queue))
+    _listener = logging.handlers.QueueListener(span_queue, target)
+    _listener.start()
+
+
+def shutdown_tracing():
+    """Drain queued spans and stop the exporter"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    for handler in list(span_logger.handlers):
+        span_logger.removeHandler(handler)
+    _listener = None
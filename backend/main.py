@@ -1,31 +1,99 @@
-import uvicorn
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import workshops, users, registrations, admin, auth
-from app.utils.db import init_db
-import uvicorn
-import requests
-import time
-import datetime
-import os
-from dotenv import load_dotenv
+from app.config import get_settings
+from app.routes import workshops, users, registrations, admin, auth, payments, testimonials, batch
+from app.utils.audit import start_audit_writer, stop_audit_writer
+from app.utils.db import init_db, close_db
+from app.utils.images import WorkshopImageFiles, ensure_image_dirs, shutdown_image_pool
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.payments import start_payment_worker, stop_payment_worker
+from app.utils.single_flight import SingleFlightMiddleware
+from app.utils.seat_holds import start_hold_sweeper, stop_hold_sweeper
+from app.utils.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+
+logger = logging.getLogger(__name__)
+
+
+# Function to hit the GET API every few minutes
+async def hit_api(url: str, interval: int):
+    import json
+    import urllib.request
+
+    def fetch():
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return json.loads(response.read())
+
+    while True:
+        try:
+            body = await asyncio.to_thread(fetch)
+            logger.info("Keepalive ping: %s", body)
+        except Exception as e:
+            logger.warning("Keepalive ping failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resources are created here rather than at import time
+    settings = get_settings()
+    setup_tracing()
+    await init_db()
+    ensure_image_dirs()
+    start_audit_writer()
+    start_payment_worker()
+    start_hold_sweeper()
+
+    keepalive = None
+    if settings.backend_api:
+        keepalive = asyncio.create_task(hit_api(settings.backend_api, settings.keepalive_interval_seconds))
+
+    yield
+
+    if keepalive:
+        keepalive.cancel()
+    stop_hold_sweeper()
+    await shutdown_image_pool()
+    await stop_payment_worker()
+    # Last, so events from the workers stopped above are written too
+    await stop_audit_writer()
+    close_db()
+    shutdown_tracing()
 
-load_dotenv()
 
 app = FastAPI(
     title="Science Workshop Registration Portal",
     description="API for Jnana Prabodhini's Vijnana Dals program",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-# CORS configuration
+# Concurrent identical catalogue reads share one query and one response body
+app.add_middleware(
+    SingleFlightMiddleware,
+    paths=["/api/workshops", "/api/workshops/[^/]+", "/api/home", "/api/testimonials"],
+)
+
+# Retried sign-ups and registrations replay the first response instead of re-running
+app.add_middleware(IdempotencyMiddleware, paths=["/api/registrations", "/api/auth/register"])
+
+# Admin-requested or sampled requests run under the profiler (a flag check when PROFILE_ENABLED is off)
+app.add_middleware(ProfilingMiddleware)
+
+# CORS configuration (added after, so it also wraps replayed responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # React Vite default port
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "Idempotent-Replayed", "X-Profile-Id"],
 )
+app.add_middleware(TracingMiddleware)
 
 # Include all route modules
 app.include_router(auth.router, tags=["Authentication"], prefix="/api")
@@ -33,38 +101,21 @@ app.include_router(users.router, tags=["Users"], prefix="/api")
 app.include_router(workshops.router, tags=["Workshops"], prefix="/api")
 app.include_router(registrations.router, tags=["Registrations"], prefix="/api")
 app.include_router(admin.router, tags=["Admin"], prefix="/api/admin")
+app.include_router(payments.router, tags=["Payments"], prefix="/api")
+app.include_router(testimonials.router, tags=["Testimonials"], prefix="/api")
+app.include_router(batch.router, tags=["Batch"], prefix="/api")
 
-@app.on_event("startup")
-async def startup_event():
-    await init_db()
+# Uploaded workshop image variants, named by content hash and cached for a year
+app.mount("/media/workshops", WorkshopImageFiles(), name="media")
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Science Workshop Registration Portal API"}
 
 
-# Function to hit the GET API every 5 minutes
-def hit_api():
-    while True:
-        try:
-            BACKEND_API = os.getenv("BACKEND_API")
-            response = requests.get(BACKEND_API)
-            print(f"Current Time: {datetime.datetime.now().strftime('%H:%M:%S')}")
-            print(response.json())
-        except requests.exceptions.RequestException as e:
-            print(f"Current Time: {datetime.datetime.now().strftime('%H%M%S')}")
-            print(f"Error: {e}")
-        time.sleep(300)
-
-
-# Start the API hitter in a separate thread
-import threading
-
-thread = threading.Thread(target=hit_api)
-thread.daemon = True  # Set as daemon so it exits when main thread exits
-thread.start()
-
-# Run the FastAPI app
+# Development server with auto-reload; production runs serve.py
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    import uvicorn
+
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
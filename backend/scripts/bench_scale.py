@@ -0,0 +1,202 @@
+"""
+Data-scale benchmark for the API's read paths.
+
+Seeds a scratch database at increasing fractions of the production-like
+volumes from seed_dataset.py, calls each read route in-process at every
+scale, and records the Mongo command time it spent (plus wall time). The
+growth exponent of each route's DB time is fitted on a log-log scale, and
+the run exits non-zero if any route grows super-linearly with data size.
+
+Run from the backend directory against a local MongoDB (the scratch
+database is dropped and re-seeded at every scale):
+
+    python scripts/bench_scale.py
+    python scripts/bench_scale.py --scales 0.01 0.05 0.25 1 --max-exponent 1.15
+"""
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pymongo import monitoring
+
+import seed_dataset
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Total server time of the Mongo commands issued since the last reset"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.micros = 0
+        self.commands = 0
+
+    def reset(self):
+        with self._lock:
+            self.micros = 0
+            self.commands = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        with self._lock:
+            self.micros += event.duration_micros
+            self.commands += 1
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+def routes(user, workshop_id):
+    """(name, method, path, params, as_admin) for every read route worth timing"""
+    month_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
+    return [
+        ("workshops list", "GET", "/api/workshops", {"status": "upcoming", "limit": 20}, False),
+        ("workshops search", "GET", "/api/workshops", {"search": "robotics", "limit": 20}, False),
+        ("workshop detail", "GET", f"/api/workshops/{workshop_id}", {}, False),
+        ("home feed", "GET", "/api/home", {}, False),
+        ("testimonials", "GET", "/api/testimonials", {}, False),
+        ("my dashboard", "GET", "/api/me/dashboard", {}, False),
+        ("my registrations", "GET", "/api/registrations/me", {}, False),
+        ("admin dashboard", "GET", "/api/admin/dashboard", {}, True),
+        ("admin analytics", "GET", "/api/admin/analytics/registrations", {"start": month_ago, "group_by": "workshop_id"}, True),
+        ("admin users page", "GET", "/api/admin/users", {"limit": 50}, True),
+        ("admin users filter", "GET", "/api/admin/users", {"grade": 9, "school": seed_dataset.SCHOOLS[0], "limit": 50}, True),
+        ("admin users prefix", "GET", "/api/admin/users", {"search": user["full_name"][:4], "limit": 50}, True),
+        ("admin users contains", "GET", "/api/admin/users", {"search": "desh", "match": "contains", "limit": 50}, True),
+        ("admin registrations", "GET", "/api/admin/registrations", {"limit": 50}, True),
+        ("admin registrations filter", "GET", "/api/admin/registrations",
+         {"workshop_id": workshop_id, "registration_status": "pending", "limit": 50}, True),
+        ("admin export", "POST", f"/api/admin/export/registrations/{workshop_id}", {}, True),
+    ]
+
+
+async def run_scale(client, timer, repeat):
+    """Median DB and wall milliseconds per route against the seeded database"""
+    from app.utils.auth import create_access_token
+    from app.utils.db import get_db
+
+    db = get_db()
+    user = await db.users.find_one({"role": "user", "grade": {"$ne": None}}, sort=[("_id", 1)])
+    # The most registered-for workshop is the worst case for per-workshop routes
+    workshop = await db.workshops.find_one({}, sort=[("registered_count", -1)])
+    tokens = {
+        False: create_access_token({"sub": user["email"], "role": user["role"]}),
+        True: create_access_token({"sub": seed_dataset.ADMIN_EMAIL, "role": "admin"}),
+    }
+
+    results = {}
+    for name, method, path, params, as_admin in routes(user, str(workshop["_id"])):
+        headers = {"Authorization": f"Bearer {tokens[as_admin]}"}
+        db_ms, wall_ms = [], []
+        for attempt in range(repeat + 1):
+            timer.reset()
+            started = time.perf_counter()
+            response = await client.request(method, path, params=params, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: {method} {path} returned {response.status_code}: {response.text[:200]}")
+            if attempt:
+                # The first call warms caches and connections
+                db_ms.append(timer.micros / 1000)
+                wall_ms.append(elapsed)
+        results[name] = (statistics.median(db_ms), statistics.median(wall_ms))
+    return results
+
+
+def growth_exponent(sizes, times, floor_ms):
+    """Least-squares slope of log(time) over log(size); flat when times stay under the noise floor"""
+    if max(times) < floor_ms:
+        return 0.0
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, floor_ms / 10)) for t in times]
+    mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+
+
+async def benchmark(args):
+    import httpx
+    from pymongo import MongoClient
+
+    from app.config import get_settings
+    from app.utils.db import close_db
+
+    timer = CommandTimer()
+    # Registered before the app's client is created so it sees every command
+    monitoring.register(timer)
+
+    from main import app
+
+    settings = get_settings()
+    sync_client = MongoClient(settings.mongodb_uri)
+    per_scale = {}
+    sizes = []
+    for scale in args.scales:
+        users = max(1, int(seed_dataset.TARGET_USERS * scale))
+        workshops = max(1, int(seed_dataset.TARGET_WORKSHOPS * scale))
+        registrations = int(seed_dataset.TARGET_REGISTRATIONS * scale)
+        print(f"scale {scale}: seeding {users} users, {workshops} workshops, {registrations} registrations", flush=True)
+        seed_dataset.seed(sync_client[settings.database_name], users, workshops, registrations)
+        await seed_dataset.prepare()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            per_scale[scale] = await run_scale(client, timer, args.repeat)
+        close_db()
+        sizes.append(users + workshops + registrations)
+
+    if not args.keep:
+        sync_client.drop_database(settings.database_name)
+    sync_client.close()
+
+    failures = []
+    header = "".join(f"{f'x{scale}':>18}" for scale in args.scales)
+    print(f"\n{'route':<28}{header}{'exponent':>10}   (db ms / wall ms)")
+    for name in per_scale[args.scales[0]]:
+        db_times = [per_scale[scale][name][0] for scale in args.scales]
+        cells = "".join(f"{db:>9.1f} /{wall:>7.1f}" for db, wall in (per_scale[scale][name] for scale in args.scales))
+        exponent = growth_exponent(sizes, db_times, args.floor_ms)
+        flag = "  SUPER-LINEAR" if exponent > args.max_exponent else ""
+        print(f"{name:<28}{cells}{exponent:>10.2f}{flag}")
+        if flag:
+            failures.append(name)
+
+    if failures:
+        print(f"\nFAIL: DB time grows faster than size^{args.max_exponent} for: {', '.join(failures)}")
+        return 1
+    print(f"\nOK: every route's DB time grows at most as size^{args.max_exponent}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[0.01, 0.03, 0.1],
+                        help="fractions of the target volumes, smallest first")
+    parser.add_argument("--database", default="shibir_bench", help="scratch database, dropped afterwards")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-exponent", type=float, default=1.2,
+                        help="fail when DB time grows faster than data size to this power")
+    parser.add_argument("--floor-ms", type=float, default=2.0,
+                        help="routes whose DB time stays under this are treated as flat")
+    parser.add_argument("--keep", action="store_true", help="keep the last scale's data")
+    args = parser.parse_args()
+    if len(args.scales) < 2:
+        parser.error("need at least two scales")
+
+    os.environ["DATABASE_NAME"] = args.database
+    # Keep the feeds from answering from a previous scale's data
+    os.environ["FEED_TTL_SECONDS"] = "0"
+    sys.exit(asyncio.run(benchmark(args)))
+
+
+if __name__ == "__main__":
+    main()
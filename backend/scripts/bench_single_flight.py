@@ -0,0 +1,115 @@
+"""
+Load test for single-flight coalescing of catalogue reads.
+
+Runs serve.py twice against a scratch database, once with
+SINGLE_FLIGHT_ENABLED=false and once with it on, fires spikes of identical
+GET /api/workshops/{id} and GET /api/workshops?featured=true&limit=5
+requests, and compares the Mongo operations per second the server issued
+(from serverStatus opcounters) alongside request throughput and latency.
+
+Run from the backend directory against a local MongoDB:
+
+    python scripts/bench_single_flight.py
+    python scripts/bench_single_flight.py --concurrency 500 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_workers import seed_workshops, wait_until_ready
+
+
+def mongo_ops(client) -> int:
+    """Queries and commands the server has run so far"""
+    counters = client.admin.command("serverStatus")["opcounters"]
+    return counters["query"] + counters["command"] + counters["getmore"]
+
+
+async def spike(base_url, paths, concurrency, duration):
+    """`concurrency` connections each requesting the hot paths back to back"""
+    import httpx
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def connection(offset):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                path, params = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, params=params)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+        await asyncio.gather(*(connection(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--database", default="shibir_bench")
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+
+    from app.config import get_settings
+
+    os.environ["DATABASE_NAME"] = args.database
+    workshop_ids = seed_workshops(args.database)
+    paths = [
+        (f"/api/workshops/{workshop_ids[0]}", {}),
+        ("/api/workshops", {"featured": "true", "limit": 5}),
+    ]
+    base_url = f"http://127.0.0.1:{args.port}"
+    mongo = MongoClient(get_settings().mongodb_uri)
+
+    results = {}
+    for enabled in (False, True):
+        env = {**os.environ, "DATABASE_NAME": args.database, "SINGLE_FLIGHT_ENABLED": str(enabled).lower()}
+        server = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(args.workers), "--port", str(args.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        try:
+            wait_until_ready(base_url)
+            ops_before = mongo_ops(mongo)
+            latencies, errors = asyncio.run(spike(base_url, paths, args.concurrency, args.duration))
+            ops = mongo_ops(mongo) - ops_before
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) >= 2 else [0.0] * 99
+        results[enabled] = (len(latencies) / args.duration, ops / args.duration, quantiles[49], quantiles[98], errors)
+    mongo.close()
+
+    print(f"\n{'single-flight':<15}{'req/s':>10}{'mongo ops/s':>13}{'ops/request':>13}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for enabled, (rps, ops, p50, p99, errors) in results.items():
+        per_request = ops / rps if rps else 0.0
+        print(f"{'on' if enabled else 'off':<15}{rps:>10.0f}{ops:>13.0f}{per_request:>13.3f}{p50:>9.1f}{p99:>9.1f}{errors:>8}")
+    off, on = results[False], results[True]
+    if on[1]:
+        print(f"\nMongo ops/s reduced {off[1] / on[1]:.1f}x with single-flight on")
+
+
+if __name__ == "__main__":
+    main()
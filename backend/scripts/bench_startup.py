@@ -0,0 +1,115 @@
+"""
+Cold-start benchmark for the API.
+
+Measures the cumulative import time of `main` (via `python -X importtime`)
+and the time from launching uvicorn to the first 200 from `GET /`, and exits
+non-zero if either exceeds its budget or if importing `main` pulls in modules
+that should only be loaded lazily.
+
+Run from the backend directory (time-to-first-200 needs a reachable MongoDB):
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --max-import-ms 800 --skip-server
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that importing `main` must not load: they are created on first use
+LAZY_MODULES = ("motor", "passlib", "requests")
+
+
+def measure_imports(runs: int):
+    """Best-of-N cumulative import time of `main` and the set of modules it loaded"""
+    best = None
+    modules = set()
+    slowest = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        rows = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            # "import time:  self [us] | cumulative | imported package"
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(cumulative_us), int(self_us), name.strip()))
+        modules = {name.split(".")[0] for _, _, name in rows}
+        total = next(cumulative for cumulative, _, name in rows if name == "main")
+        if best is None or total < best:
+            best = total
+            slowest = sorted(rows, key=lambda r: r[1], reverse=True)[:10]
+    return best / 1000, modules, slowest
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_200(timeout: float) -> float:
+    """Milliseconds from spawning uvicorn until `GET /` returns 200"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.02)
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving a request")
+        raise RuntimeError(f"no 200 from GET / within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=1500)
+    parser.add_argument("--max-startup-ms", type=float, default=5000)
+    parser.add_argument("--skip-server", action="store_true", help="only measure import time")
+    args = parser.parse_args()
+
+    failures = []
+
+    import_ms, modules, slowest = measure_imports(args.runs)
+    print(f"import main: {import_ms:.1f} ms (best of {args.runs}, budget {args.max_import_ms:.0f} ms)")
+    for cumulative, self_us, name in slowest:
+        print(f"  {self_us / 1000:8.1f} ms self  {name}")
+    if import_ms > args.max_import_ms:
+        failures.append(f"import time {import_ms:.1f} ms exceeds {args.max_import_ms:.0f} ms")
+    eager = sorted(set(LAZY_MODULES) & modules)
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+
+    if not args.skip_server:
+        startup_ms = measure_first_200(args.max_startup_ms / 1000 * 4)
+        print(f"time to first 200: {startup_ms:.1f} ms (budget {args.max_startup_ms:.0f} ms)")
+        if startup_ms > args.max_startup_ms:
+            failures.append(f"time to first 200 {startup_ms:.1f} ms exceeds {args.max_startup_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
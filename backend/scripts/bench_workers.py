@@ -0,0 +1,203 @@
+"""
+Multi-worker throughput benchmark.
+
+Starts serve.py with 1, 2, 4 and 8 workers in turn against a scratch
+database, drives the catalogue routes (workshop list and detail) and the
+registration route with closed-loop load from separate client processes,
+and reports requests per second, per worker core, and latency percentiles.
+
+Run from the backend directory against a local MongoDB:
+
+    python scripts/bench_workers.py
+    python scripts/bench_workers.py --workers 1 2 4 --duration 20 --concurrency 128
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def seed_workshops(database_name: str, count: int = 50):
+    """Open workshops big enough that registrations never fill them; returns their ids"""
+    from pymongo import MongoClient
+
+    from app.config import get_settings
+
+    client = MongoClient(get_settings().mongodb_uri)
+    db = client[database_name]
+    db.drop_collection("workshops")
+    db.drop_collection("registrations")
+    now = datetime.utcnow()
+    result = db.workshops.insert_many([{
+        "title": f"Benchmark Workshop {i}",
+        "description": "Load test workshop " * 20,
+        "short_description": "Load test workshop",
+        "image_url": "https://example.com/workshop.jpg",
+        "start_date": now + timedelta(days=30 + i),
+        "end_date": now + timedelta(days=31 + i),
+        "registration_deadline": now + timedelta(days=20),
+        "location": "Pune",
+        "max_participants": 10 ** 9,
+        # Free, so registrations take no seat hold
+        "fee": 0.0,
+        "eligible_grades": [8, 9, 10],
+        "featured": i < 5,
+        "status": "upcoming",
+        "created_at": now,
+        "updated_at": now,
+        "registered_count": 0,
+    } for i in range(count)])
+    client.close()
+    return [str(oid) for oid in result.inserted_ids]
+
+
+def request_factory(scenario: str, workshop_ids):
+    counter = 0
+
+    def catalogue():
+        nonlocal counter
+        counter += 1
+        if counter % 2:
+            return "GET", "/api/workshops", {"params": {"status": "upcoming", "limit": 20}}
+        return "GET", f"/api/workshops/{workshop_ids[counter % len(workshop_ids)]}", {}
+
+    def registration():
+        nonlocal counter
+        counter += 1
+        return "POST", "/api/registrations", {"json": {
+            "workshop_id": workshop_ids[counter % len(workshop_ids)],
+            "email": f"bench-{uuid.uuid4().hex}@example.com",
+            "full_name": "Bench Student",
+            "grade": 9,
+            "school": "Benchmark School",
+            "phone": "9000000000",
+            "parent_name": "Bench Parent",
+            "parent_phone": "9000000001",
+        }}
+
+    return catalogue if scenario == "catalogue" else registration
+
+
+def client_process(base_url, scenario, workshop_ids, concurrency, duration, results):
+    """One load-generating process: `concurrency` connections issuing requests back to back"""
+    import httpx
+
+    async def run():
+        next_request = request_factory(scenario, workshop_ids)
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            async def connection():
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    method, path, kwargs = next_request()
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, **kwargs)
+                        ok = response.status_code < 400
+                    except httpx.HTTPError:
+                        ok = False
+                    if ok:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    else:
+                        errors += 1
+            await asyncio.gather(*(connection() for _ in range(concurrency)))
+        return latencies, errors
+
+    results.put(asyncio.run(run()))
+
+
+def drive(base_url, scenario, workshop_ids, args):
+    processes = args.clients
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=client_process,
+            args=(base_url, scenario, workshop_ids, max(1, args.concurrency // processes), args.duration, results),
+        )
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    collected = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+
+    latencies = sorted(ms for batch, _ in collected for ms in batch)
+    errors = sum(e for _, e in collected)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) >= 2 else [0.0] * 99
+    return len(latencies) / args.duration, quantiles[49], quantiles[98], errors
+
+
+def wait_until_ready(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + "/", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--scenarios", nargs="+", default=["catalogue", "registration"],
+                        choices=["catalogue", "registration"])
+    parser.add_argument("--duration", type=float, default=15, help="seconds of load per scenario")
+    parser.add_argument("--concurrency", type=int, default=64, help="total open connections")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="load-generating processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database", default="shibir_bench")
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_NAME": args.database,
+        # Registration emails would measure the SMTP server, not the API
+        "SMTP_SERVER": "",
+    }
+    os.environ["DATABASE_NAME"] = args.database
+    workshop_ids = seed_workshops(args.database)
+    base_url = f"http://127.0.0.1:{args.port}"
+    cores = os.cpu_count() or 1
+
+    rows = []
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(workers), "--port", str(args.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        try:
+            wait_until_ready(base_url)
+            for scenario in args.scenarios:
+                rps, p50, p99, errors = drive(base_url, scenario, workshop_ids, args)
+                rows.append((workers, scenario, rps, rps / min(workers, cores), p50, p99, errors))
+                print(f"{workers} worker(s) {scenario}: {rps:.0f} req/s", flush=True)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"\n{'workers':>8} {'scenario':<14}{'req/s':>10}{'req/s/core':>12}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for workers, scenario, rps, per_core, p50, p99, errors in rows:
+        print(f"{workers:>8} {scenario:<14}{rps:>10.0f}{per_core:>12.0f}{p50:>9.1f}{p99:>9.1f}{errors:>8}")
+    if any(workers > cores for workers in args.workers):
+        print(f"\nNote: only {cores} CPU(s) here; per-core figures for more workers than CPUs divide by {cores}.")
+
+
+if __name__ == "__main__":
+    main()
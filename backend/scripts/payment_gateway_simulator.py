@@ -0,0 +1,115 @@
+"""
+Local stand-in for the payment gateway.
+
+Fires signed payment callbacks at the webhook at a target rate, including a
+fraction of redeliveries, and reports acknowledgement latency and throughput.
+
+Run from the backend directory against a running API:
+
+    python scripts/payment_gateway_simulator.py --count 5000 --rate 3000
+    python scripts/payment_gateway_simulator.py --from-mongo --duplicates 0.2
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_registration_ids(args):
+    if not args.from_mongo:
+        # Random ids exercise the ingestion path; they match no registration
+        return [uuid.uuid4().hex[:24] for _ in range(args.count)]
+
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    db = client[os.getenv("DATABASE_NAME", "shibir")]
+    cursor = db.registrations.find({"payment_status": "pending"}, {"_id": 1}).limit(args.count)
+    return [str(doc["_id"]) for doc in cursor]
+
+
+def build_events(registration_ids, count, duplicates):
+    events = []
+    for i in range(count):
+        if events and random.random() < duplicates:
+            # Gateways redeliver callbacks they think were lost
+            events.append(random.choice(events))
+            continue
+        events.append({
+            "event_id": uuid.uuid4().hex,
+            "payment_id": f"pay_{uuid.uuid4().hex[:16]}",
+            "registration_id": registration_ids[i % len(registration_ids)],
+            "status": "completed" if random.random() < 0.9 else "failed",
+            "amount": 500.0,
+        })
+    return events
+
+
+def send(url, secret, event):
+    body = json.dumps(event).encode()
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json", "X-Signature": signature}
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return status, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000/api/payments/webhook")
+    parser.add_argument("--secret", default=os.getenv("PAYMENT_WEBHOOK_SECRET", "dev-secret"))
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=3000, help="callbacks per minute")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="fraction of redelivered events")
+    parser.add_argument("--from-mongo", action="store_true", help="pay real pending registrations")
+    args = parser.parse_args()
+
+    registration_ids = load_registration_ids(args)
+    if not registration_ids:
+        parser.error("no registrations to pay")
+    events = build_events(registration_ids, args.count, args.duplicates)
+
+    interval = 60.0 / args.rate
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = []
+        for i, event in enumerate(events):
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(send, args.url, args.secret, event))
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(ms for status, ms in results if status == 202)
+    print(f"sent {len(results)} callbacks in {elapsed:.1f}s ({len(results) / elapsed * 60:.0f}/min)")
+    print(f"responses: {statuses}")
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"ack latency ms: p50={quantiles[49]:.1f} p95={quantiles[94]:.1f} p99={quantiles[98]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Synthetic dataset generator.
+
+Seeds a MongoDB database with users, workshops, registrations and
+testimonials shaped like UserInDB, WorkshopInDB, RegistrationInDB and
+Testimonial, at production-like volumes, then creates the app's indexes and
+backfills the registration rollups. Output is deterministic for a given seed.
+
+Run from the backend directory. The target database is dropped first, so it
+must be named explicitly; names without a scratch marker (bench, dev, test,
+scratch, seed) also need --yes-drop:
+
+    python scripts/seed_dataset.py --database shibir_bench --users 200000 --workshops 5000 --registrations 2000000
+    python scripts/seed_dataset.py --scale 0.05 --database shibir_dev
+
+Every generated account, including admin@example.com, has the password
+"password".
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Database names seeding may drop without --yes-drop
+SCRATCH_MARKERS = ("bench", "dev", "test", "scratch", "seed")
+
+# Volumes seeded at --scale 1
+TARGET_USERS = 200_000
+TARGET_WORKSHOPS = 5_000
+TARGET_REGISTRATIONS = 2_000_000
+
+ADMIN_EMAIL = "admin@example.com"
+PASSWORD = "password"
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Ananya", "Arjun", "Diya", "Gauri", "Ishaan", "Kavya", "Krishna", "Meera",
+    "Neha", "Omkar", "Pooja", "Pranav", "Priya", "Rahul", "Riya", "Rohan", "Sai", "Saanvi",
+    "Shreya", "Siddharth", "Sneha", "Tanvi", "Tejas", "Varun", "Vedant", "Vihaan", "Yash", "Zoya",
+]
+LAST_NAMES = [
+    "Bhat", "Chavan", "Deshmukh", "Deshpande", "Gokhale", "Iyer", "Jadhav", "Joshi", "Kale", "Kulkarni",
+    "Mehta", "Nair", "Patil", "Pawar", "Rao", "Sharma", "Shinde", "Thakur", "Vaidya", "Yadav",
+]
+SCHOOLS = [
+    f"{name} {kind}"
+    for name in ("Jnana Prabodhini", "Abhinav", "DPS", "Kendriya Vidyalaya", "Vidya Bhavan",
+                 "Modern", "New English", "St. Mary's", "Symbiosis", "Bal Shikshan")
+    for kind in ("School", "High School", "Vidyalaya")
+]
+SUBJECTS = [
+    "Astronomy", "Robotics", "Chemistry", "Electronics", "Botany", "Microbiology", "Geology",
+    "Mathematics", "Physics", "Coding", "Ecology", "Genetics", "Optics", "Aeromodelling",
+]
+FORMATS = ["Workshop", "Camp", "Lab", "Bootcamp", "Field Trip", "Olympiad Prep"]
+LOCATIONS = ["Pune", "Nigdi", "Solapur", "Harali", "Ambajogai", "Nashik", "Satara", "Mumbai"]
+
+
+def volumes(args):
+    """Explicit counts win over --scale"""
+    return (
+        args.users if args.users is not None else max(1, int(TARGET_USERS * args.scale)),
+        args.workshops if args.workshops is not None else max(1, int(TARGET_WORKSHOPS * args.scale)),
+        args.registrations if args.registrations is not None else int(TARGET_REGISTRATIONS * args.scale),
+    )
+
+
+def generate_users(rng, count, now, password_hash):
+    from app.utils.db import with_user_search_fields
+
+    yield with_user_search_fields({
+        "_id": ObjectId(),
+        "email": ADMIN_EMAIL,
+        "full_name": "Admin",
+        "password": password_hash,
+        "role": "admin",
+        "is_active": True,
+        "created_at": now - timedelta(days=730),
+    })
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield with_user_search_fields({
+            "_id": ObjectId(),
+            "email": f"{first}.{last}.{i}@example.com".lower(),
+            "full_name": f"{first} {last}",
+            "password": password_hash,
+            "role": "organizer" if rng.random() < 0.002 else "user",
+            "is_active": rng.random() > 0.03,
+            "created_at": now - timedelta(seconds=rng.randint(0, 730 * 86400)),
+            "grade": rng.randint(5, 12),
+            "school": rng.choice(SCHOOLS),
+            "phone": f"9{rng.randint(100000000, 999999999)}",
+            "parent_name": f"{rng.choice(FIRST_NAMES)} {last}",
+            "parent_phone": f"9{rng.randint(100000000, 999999999)}",
+        })
+
+
+def generate_workshops(rng, count, now):
+    for _ in range(count):
+        start = now + timedelta(days=rng.uniform(-700, 180))
+        end = start + timedelta(days=rng.choice([1, 2, 3, 5, 7]))
+        if rng.random() < 0.03:
+            status = "cancelled"
+        elif end < now:
+            status = "completed"
+        elif start < now:
+            status = "ongoing"
+        else:
+            status = "upcoming"
+        low = rng.randint(5, 10)
+        subject, kind = rng.choice(SUBJECTS), rng.choice(FORMATS)
+        created_at = start - timedelta(days=rng.randint(30, 120))
+        yield {
+            "_id": ObjectId(),
+            "title": f"{subject} {kind} {start:%b %Y}",
+            "description": f"A hands-on {subject.lower()} {kind.lower()} for grades {low} to {low + 2}. " * 4,
+            "short_description": f"Hands-on {subject.lower()} for curious students",
+            "image_url": f"https://example.com/images/{subject.lower()}.jpg",
+            "start_date": start,
+            "end_date": end,
+            "registration_deadline": start - timedelta(days=3),
+            "location": rng.choice(LOCATIONS),
+            "max_participants": rng.choice([30, 50, 100, 200, 500, 1000]),
+            "fee": float(rng.choice([0, 250, 500, 1000, 1500])),
+            "eligible_grades": list(range(low, low + 3)),
+            "featured": rng.random() < 0.01,
+            "status": status,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "registered_count": 0,
+        }
+
+
+def generate_registrations(rng, count, users, workshops):
+    """
+    Spread `count` registrations over users, each for distinct workshops.
+    Workshop popularity is skewed so a few workshops are much larger than most.
+    """
+    if not users or not workshops:
+        return
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(workshops))]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+
+    per_user, remainder = divmod(count, len(users))
+    for index, user in enumerate(users):
+        wanted = min(per_user + (1 if index < remainder else 0), len(workshops))
+        chosen = set()
+        while len(chosen) < wanted:
+            chosen.update(rng.choices(range(len(workshops)), cum_weights=cumulative, k=wanted - len(chosen)))
+        for workshop_index in chosen:
+            workshop = workshops[workshop_index]
+            workshop["registered_count"] += 1
+            paid = rng.random()
+            payment_status = "completed" if paid < 0.7 else "pending" if paid < 0.95 else "failed"
+            if payment_status == "completed":
+                registration_status = "approved" if rng.random() < 0.9 else "pending"
+            else:
+                registration_status = "rejected" if rng.random() < 0.1 else "pending"
+            created_at = workshop["registration_deadline"] - timedelta(seconds=rng.randint(0, 60 * 86400))
+            yield {
+                "_id": ObjectId(),
+                "workshop_id": str(workshop["_id"]),
+                "user_id": str(user["_id"]),
+                "email": user["email"],
+                "full_name": user["full_name"],
+                "grade": user["grade"],
+                "school": user["school"],
+                "phone": user["phone"],
+                "parent_name": user["parent_name"],
+                "parent_phone": user["parent_phone"],
+                "payment_status": payment_status,
+                "registration_status": registration_status,
+                "created_at": created_at,
+                "payment_id": f"pay_{rng.getrandbits(64):016x}" if payment_status == "completed" else None,
+                "amount_paid": workshop["fee"] if payment_status == "completed" else None,
+                "notes": None,
+            }
+
+
+def generate_testimonials(rng, count, now):
+    for i in range(count):
+        created_at = now - timedelta(days=rng.randint(0, 700))
+        yield {
+            "_id": ObjectId(),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "content": f"The {rng.choice(SUBJECTS).lower()} sessions were the highlight of my year.",
+            "role": rng.choice(["student", "teacher", "parent"]),
+            "is_visible": rng.random() > 0.1,
+            "featured": i < 3,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def insert_batches(collection, documents, batch_size):
+    batch = []
+    inserted = 0
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+
+def seed(db, users: int, workshops: int, registrations: int, seed_value: int = 42, batch_size: int = 10_000):
+    """Drop and re-seed `db` (a pymongo Database); returns the inserted counts"""
+    from app.utils.auth import get_password_hash
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+    for name in ("users", "workshops", "registrations", "registration_rollups", "testimonials",
+                 "registrations_archive", "idempotency_keys"):
+        db.drop_collection(name)
+
+    # Users and workshops are kept in memory to derive registrations from them
+    user_docs = list(generate_users(rng, users, now, get_password_hash(PASSWORD)))
+    insert_batches(db.users, user_docs, batch_size)
+    workshop_docs = list(generate_workshops(rng, workshops, now))
+
+    students = [user for user in user_docs if user["role"] != "admin"]
+    registration_count = insert_batches(
+        db.registrations, generate_registrations(rng, registrations, students, workshop_docs), batch_size
+    )
+    # registered_count is final once every registration has been generated
+    insert_batches(db.workshops, workshop_docs, batch_size)
+    insert_batches(db.testimonials, generate_testimonials(rng, 30, now), batch_size)
+    return {"users": len(user_docs), "workshops": len(workshop_docs), "registrations": registration_count}
+
+
+async def prepare(backfill: bool = True):
+    """Create the app's indexes and rebuild the rollups for the seeded data"""
+    from app.utils.db import init_db, close_db
+    from app.utils.rollups import backfill_rollups
+
+    await init_db()
+    if backfill:
+        await backfill_rollups()
+    close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="fraction of the target volumes")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--workshops", type=int)
+    parser.add_argument("--registrations", type=int)
+    parser.add_argument("--database", required=True, help="database to drop and seed; DATABASE_NAME is never used")
+    parser.add_argument("--yes-drop", action="store_true", help="allow dropping a database not named like a scratch one")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if not args.yes_drop and not any(marker in args.database.lower() for marker in SCRATCH_MARKERS):
+        parser.error(
+            f"{args.database!r} does not look like a scratch database ({', '.join(SCRATCH_MARKERS)}); "
+            "pass --yes-drop to drop and re-seed it anyway"
+        )
+    os.environ["DATABASE_NAME"] = args.database
+
+    from pymongo import MongoClient
+    from app.config import get_settings
+
+    settings = get_settings()
+    users, workshops, registrations = volumes(args)
+    print(f"Seeding {settings.database_name}: {users} users, {workshops} workshops, {registrations} registrations")
+
+    started = time.perf_counter()
+    client = MongoClient(settings.mongodb_uri)
+    counts = seed(client[settings.database_name], users, workshops, registrations, args.seed, args.batch_size)
+    client.close()
+    print(f"Inserted {counts} in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    asyncio.run(prepare())
+    print(f"Indexes and rollups built in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Production entrypoint.
+
+Runs the API in several worker processes sharing one listening socket, with
+uvloop and httptools when they are installed, no reload watcher, and
+keep-alive/backlog settings suited to sitting behind a proxy.
+
+    python serve.py                 # WEB_CONCURRENCY workers, one per CPU by default
+    python serve.py --workers 4 --port 8080
+
+Every worker runs its own lifespan (Mongo client, payment batcher, seat-hold
+sweeper). State that must be seen by all workers lives in Mongo: OTPs,
+idempotency keys, background job progress and, with RATE_LIMIT_STORE=mongo,
+rate-limit buckets. Public feeds are per-worker caches bounded by
+FEED_TTL_SECONDS.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from app.config import get_settings
+
+logger = logging.getLogger("serve")
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.web_concurrency or os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true", help="log every request (off by default)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     %(message)s")
+    loop, http = event_loop(), http_protocol()
+    logger.info("Starting %d worker(s) on %s:%d with %s loop and %s parser", args.workers, args.host, args.port, loop, http)
+    if args.workers > 1 and settings.rate_limit_store != "mongo":
+        logger.warning("RATE_LIMIT_STORE=memory keeps separate login/OTP limits in each of the %d workers", args.workers)
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=settings.listen_backlog,
+        timeout_keep_alive=settings.keepalive_timeout_seconds,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.forwarded_allow_ips,
+        log_level=args.log_level,
+        access_log=args.access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ const WorkshopCard = ({ workshop }) => {
   const { 
     title, 
     image_url, 
+    images,
     short_description, 
     start_date, 
     location, 
@@ -63,7 +64,7 @@ const WorkshopCard = ({ workshop }) => {
       <CardMedia
         component="img"
         height="180"
-        image={image_url || 'https://source.unsplash.com/random/?science,workshop'}
+        image={images?.card.url || image_url || 'https://source.unsplash.com/random/?science,workshop'}
         alt={title}
       />
       
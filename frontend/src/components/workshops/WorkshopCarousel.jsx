@@ -31,7 +31,7 @@ const WorkshopCarousel = ({ workshops = [], autoPlayInterval = 5000 }) => {
               borderRadius: 2,
               backgroundSize: 'cover',
               backgroundPosition: 'center',
-              backgroundImage: `linear-gradient(rgba(0,0,0,0.5), rgba(0,0,0,0.7)), url(${workshop.image_url})`,
+              backgroundImage: `linear-gradient(rgba(0,0,0,0.5), rgba(0,0,0,0.7)), url(${workshop.images?.hero.url || workshop.image_url})`,
               height: { xs: 300, sm: 400, md: 500 }
             }}
           >
@@ -2,6 +2,7 @@ import { createContext, useContext, useState, useEffect } from 'react';
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import { useSnackbar } from './SnackbarContext';
+import { withIdempotencyKey } from '../services/api';
 
 const AuthContext = createContext({
   user: null,
@@ -49,24 +50,20 @@ export const AuthProvider = ({ children }) => {
 
   const login = async (credentials) => {
     try {
-      const response = await axios.post('/api/auth/login', credentials);
-      const { access_token } = response.data;
+      // The profile comes back with the token, so no follow-up /auth/me call
+      const response = await axios.post('/api/auth/login', credentials, {
+        params: { include_user: true }
+      });
+      const { access_token, user: loggedInUser } = response.data;
       
       localStorage.setItem('token', access_token);
       
-      // Get user data
-      const userResponse = await axios.get('/api/auth/me', {
-        headers: {
-          Authorization: `Bearer ${access_token}`
-        }
-      });
-      
-      setUser(userResponse.data);
+      setUser(loggedInUser);
       
       showMessage('Login successful!', 'success');
       
       // Redirect based on user role
-      if (userResponse.data.role === 'admin') {
+      if (loggedInUser.role === 'admin') {
         navigate('/admin');
       } else {
         navigate('/dashboard');
@@ -88,7 +85,9 @@ export const AuthProvider = ({ children }) => {
 
   const register = async (userData) => {
     try {
-      await axios.post('/api/auth/register', userData);
+      await withIdempotencyKey((headers) =>
+        axios.post('/api/auth/register', userData, { headers })
+      );
       showMessage('Registration successful! Please log in.', 'success');
       navigate('/login');
       return true;
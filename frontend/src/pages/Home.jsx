@@ -20,11 +20,12 @@ import WorkshopCarousel from '../components/workshops/WorkshopCarousel';
 import WorkshopCard from '../components/workshops/WorkshopCard';
 import LoadingSpinner from '../components/common/LoadingSpinner';
 import ErrorMessage from '../components/common/ErrorMessage';
-import { getWorkshops } from '../services/api';
+import { getHomeFeed } from '../services/api';
 
 const Home = () => {
   const [featuredWorkshops, setFeaturedWorkshops] = useState([]);
   const [upcomingWorkshops, setUpcomingWorkshops] = useState([]);
+  const [testimonials, setTestimonials] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const theme = useTheme();
@@ -33,13 +34,11 @@ const Home = () => {
   useEffect(() => {
     const loadWorkshops = async () => {
       try {
-        // Load featured workshops
-        const featured = await getWorkshops({ featured: true, limit: 5 });
-        setFeaturedWorkshops(featured);
-        
-        // Load upcoming workshops
-        const upcoming = await getWorkshops({ status: 'upcoming', limit: 3 });
-        setUpcomingWorkshops(upcoming);
+        // Featured and upcoming workshops and testimonials in one request
+        const home = await getHomeFeed({ testimonials_limit: 3 });
+        setFeaturedWorkshops(home.featured_workshops);
+        setUpcomingWorkshops(home.upcoming_workshops);
+        setTestimonials(home.testimonials);
         
         setLoading(false);
       } catch (err) {
@@ -52,31 +51,6 @@ const Home = () => {
     loadWorkshops();
   }, []);
 
-  // Sample testimonials (could be loaded from API in real app)
-  const testimonials = [
-    {
-      id: 1,
-      name: 'Priya Sharma',
-      role: 'Student, Grade 10',
-      content: 'The astronomy workshop completely changed how I look at the night sky. The hands-on activities with telescopes and star maps were incredible!',
-      avatar: '/avatars/student1.jpg'
-    },
-    {
-      id: 2,
-      name: 'Anil Deshmukh',
-      role: 'Parent',
-      content: 'My daughter came home bubbling with excitement after the chemistry workshop. The experiments were safe yet fascinating, and she\'s now considering science as a career.',
-      avatar: '/avatars/parent1.jpg'
-    },
-    {
-      id: 3,
-      name: 'Mrs. Joshi',
-      role: 'Science Teacher, DPS School',
-      content: 'The Vijnana Dals workshops complement our school curriculum perfectly. They bring science to life in ways that traditional classrooms cannot.',
-      avatar: '/avatars/teacher1.jpg'
-    }
-  ];
-
   if (loading) {
     return <LoadingSpinner message="Loading workshops..." />;
   }
@@ -273,7 +247,7 @@ const Home = () => {
           
           <Grid container spacing={3}>
             {testimonials.map(testimonial => (
-              <Grid item key={testimonial.id} xs={12} md={4}>
+              <Grid item key={testimonial._id} xs={12} md={4}>
                 <Card sx={{ height: '100%', display: 'flex', flexDirection: 'column' }}>
                   <CardContent sx={{ flexGrow: 1 }}>
                     <Typography variant="body1" paragraph sx={{ fontStyle: 'italic' }}>
@@ -282,7 +256,6 @@ const Home = () => {
                     <Divider sx={{ my: 2 }} />
                     <Box sx={{ display: 'flex', alignItems: 'center' }}>
                       <Avatar 
-                        src={testimonial.avatar} 
                         alt={testimonial.name}
                         sx={{ mr: 2 }}
                       />
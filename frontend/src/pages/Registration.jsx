@@ -92,8 +92,7 @@ const Registration = () => {
       
       const registrationData = {
         ...values,
-        workshop_id: workshopId,
-        user_id: isAuthenticated ? user.id : undefined
+        workshop_id: workshopId
       };
       console.log(registrationData)
       await registerForWorkshop(registrationData);
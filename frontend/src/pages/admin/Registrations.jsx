@@ -25,6 +25,7 @@ import {
   FormControl,
   InputLabel,
   Grid,
+  TablePagination,
   Card,
   CardContent,
   CardActions
@@ -43,6 +44,10 @@ import ErrorMessage from '../../components/common/ErrorMessage';
 
 const AdminRegistrations = () => {
   const [registrations, setRegistrations] = useState([]);
+  const [totalRegistrations, setTotalRegistrations] = useState(0);
+  const [facets, setFacets] = useState({ registration_status: {}, payment_status: {}, workshops: [] });
+  const [page, setPage] = useState(0);
+  const [rowsPerPage, setRowsPerPage] = useState(50);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [tabValue, setTabValue] = useState(0);
@@ -53,18 +58,23 @@ const AdminRegistrations = () => {
   const [filterWorkshop, setFilterWorkshop] = useState('');
   const { showMessage } = useSnackbar();
   
-  // Get unique workshops for filtering
-  const workshops = [...new Set(registrations.map(reg => reg.workshop_title))];
+  // Workshops for filtering come from the server-side facet counts
+  const workshops = facets.workshops;
+  const tabStatuses = [null, 'pending', 'approved', 'rejected', 'expired'];
 
   useEffect(() => {
     loadRegistrations();
-  }, []);
+  }, [filterWorkshop, tabValue, page, rowsPerPage]);
   
   const loadRegistrations = async () => {
     try {
-      setLoading(true);
-      const data = await getAllRegistrations();
-      setRegistrations(data);
+      const params = { skip: page * rowsPerPage, limit: rowsPerPage };
+      if (filterWorkshop) params.workshop_id = filterWorkshop;
+      if (tabStatuses[tabValue]) params.registration_status = tabStatuses[tabValue];
+      const data = await getAllRegistrations(params);
+      setRegistrations(data.items);
+      setTotalRegistrations(data.total);
+      setFacets(data.facets);
       setLoading(false);
     } catch (err) {
       console.error('Error loading registrations:', err);
@@ -75,6 +85,7 @@ const AdminRegistrations = () => {
   
   const handleTabChange = (event, newValue) => {
     setTabValue(newValue);
+    setPage(0);
   };
   
   const handleActionClick = (registration, action) => {
@@ -142,18 +153,9 @@ const AdminRegistrations = () => {
     }
   };
   
-  const filteredRegistrations = filterWorkshop 
-    ? registrations.filter(reg => reg.workshop_title === filterWorkshop) 
-    : registrations;
-    
-  // Filter based on tab selection
-  const tabFilteredRegistrations = tabValue === 0
-    ? filteredRegistrations
-    : tabValue === 1
-      ? filteredRegistrations.filter(reg => reg.registration_status === 'pending')
-      : tabValue === 2
-        ? filteredRegistrations.filter(reg => reg.registration_status === 'approved')
-        : filteredRegistrations.filter(reg => reg.registration_status === 'rejected');
+  // Workshop and status filtering happen server-side
+  const tabFilteredRegistrations = registrations;
+  const statusCount = (status) => facets.registration_status[status] || 0;
     
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', { 
@@ -200,14 +202,17 @@ const AdminRegistrations = () => {
                 <Select
                   labelId="workshop-filter-label"
                   value={filterWorkshop}
-                  onChange={(e) => setFilterWorkshop(e.target.value)}
+                  onChange={(e) => {
+                    setFilterWorkshop(e.target.value);
+                    setPage(0);
+                  }}
                   label="Filter by Workshop"
                   startIcon={<FilterIcon />}
                 >
                   <MenuItem value="">All Workshops</MenuItem>
                   {workshops.map((workshop) => (
-                    <MenuItem key={workshop} value={workshop}>
-                      {workshop}
+                    <MenuItem key={workshop.workshop_id} value={workshop.workshop_id}>
+                      {workshop.workshop_title || 'Unknown Workshop'} ({workshop.count})
                     </MenuItem>
                   ))}
                 </Select>
@@ -215,7 +220,7 @@ const AdminRegistrations = () => {
             </Grid>
             <Grid item xs={12} md={6} sx={{ textAlign: 'right' }}>
               <Typography variant="body2" color="textSecondary">
-                Total Registrations: {registrations.length}
+                Total Registrations: {totalRegistrations}
               </Typography>
             </Grid>
           </Grid>
@@ -226,9 +231,10 @@ const AdminRegistrations = () => {
       <Box sx={{ borderBottom: 1, borderColor: 'divider', mb: 2 }}>
         <Tabs value={tabValue} onChange={handleTabChange}>
           <Tab label="All Registrations" />
-          <Tab label={`Pending (${registrations.filter(r => r.registration_status === 'pending').length})`} />
-          <Tab label={`Approved (${registrations.filter(r => r.registration_status === 'approved').length})`} />
-          <Tab label={`Rejected (${registrations.filter(r => r.registration_status === 'rejected').length})`} />
+          <Tab label={`Pending (${statusCount('pending')})`} />
+          <Tab label={`Approved (${statusCount('approved')})`} />
+          <Tab label={`Rejected (${statusCount('rejected')})`} />
+          <Tab label={`Expired (${statusCount('expired')})`} />
         </Tabs>
       </Box>
       
@@ -317,6 +323,18 @@ const AdminRegistrations = () => {
             )}
           </TableBody>
         </Table>
+        <TablePagination
+          component="div"
+          count={totalRegistrations}
+          page={page}
+          onPageChange={(e, newPage) => setPage(newPage)}
+          rowsPerPage={rowsPerPage}
+          onRowsPerPageChange={(e) => {
+            setRowsPerPage(parseInt(e.target.value, 10));
+            setPage(0);
+          }}
+          rowsPerPageOptions={[25, 50, 100, 200]}
+        />
       </TableContainer>
       
       {/* Action Dialog */}
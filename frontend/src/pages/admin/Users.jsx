@@ -22,7 +22,8 @@ import {
   MenuItem,
   FormControl,
   InputLabel,
-  Grid
+  Grid,
+  TablePagination
 } from '@mui/material';
 import {
   Edit as EditIcon,
@@ -37,6 +38,9 @@ import ErrorMessage from '../../components/common/ErrorMessage';
 
 const AdminUsers = () => {
   const [users, setUsers] = useState([]);
+  const [totalUsers, setTotalUsers] = useState(0);
+  const [page, setPage] = useState(0);
+  const [rowsPerPage, setRowsPerPage] = useState(50);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [dialogOpen, setDialogOpen] = useState(false);
@@ -52,14 +56,19 @@ const AdminUsers = () => {
   const { showMessage } = useSnackbar();
 
   useEffect(() => {
-    loadUsers();
-  }, []);
+    // Debounce so typing in the search box doesn't fire a request per keystroke
+    const timer = setTimeout(loadUsers, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm, filterRole, page, rowsPerPage]);
   
   const loadUsers = async () => {
     try {
-      setLoading(true);
-      const data = await getAllUsers();
-      setUsers(data);
+      const params = { skip: page * rowsPerPage, limit: rowsPerPage };
+      if (searchTerm) params.search = searchTerm;
+      if (filterRole) params.role = filterRole;
+      const data = await getAllUsers(params);
+      setUsers(data.items);
+      setTotalUsers(data.total);
       setLoading(false);
     } catch (err) {
       console.error('Error loading users:', err);
@@ -141,12 +150,8 @@ const AdminUsers = () => {
     // }
   };
   
-  const filteredUsers = users
-    .filter(user => 
-      user.full_name.toLowerCase().includes(searchTerm.toLowerCase()) || 
-      user.email.toLowerCase().includes(searchTerm.toLowerCase())
-    )
-    .filter(user => filterRole ? user.role === filterRole : true);
+  // Filtering and search happen server-side
+  const filteredUsers = users;
   
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', { 
@@ -192,7 +197,10 @@ const AdminUsers = () => {
               placeholder="Search by name or email"
               variant="outlined"
               value={searchTerm}
-              onChange={(e) => setSearchTerm(e.target.value)}
+              onChange={(e) => {
+                setSearchTerm(e.target.value);
+                setPage(0);
+              }}
               InputProps={{
                 startAdornment: <SearchIcon color="action" sx={{ mr: 1 }} />
               }}
@@ -206,7 +214,10 @@ const AdminUsers = () => {
               <Select
                 labelId="role-filter-label"
                 value={filterRole}
-                onChange={(e) => setFilterRole(e.target.value)}
+                onChange={(e) => {
+                  setFilterRole(e.target.value);
+                  setPage(0);
+                }}
                 label="Filter by Role"
                 startIcon={<FilterIcon />}
               >
@@ -220,7 +231,7 @@ const AdminUsers = () => {
           
           <Grid item xs={12} md={3} sx={{ textAlign: 'right' }}>
             <Typography variant="body2" color="textSecondary">
-              Total Users: {users.length}
+              Total Users: {totalUsers}
             </Typography>
           </Grid>
         </Grid>
@@ -289,6 +300,18 @@ const AdminUsers = () => {
             )}
           </TableBody>
         </Table>
+        <TablePagination
+          component="div"
+          count={totalUsers}
+          page={page}
+          onPageChange={(e, newPage) => setPage(newPage)}
+          rowsPerPage={rowsPerPage}
+          onRowsPerPageChange={(e) => {
+            setRowsPerPage(parseInt(e.target.value, 10));
+            setPage(0);
+          }}
+          rowsPerPageOptions={[25, 50, 100, 200]}
+        />
       </TableContainer>
       
       {/* Edit User Dialog */}
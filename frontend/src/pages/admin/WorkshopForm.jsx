@@ -24,7 +24,7 @@ import dayjs from 'dayjs';
 import { Formik, Form, FieldArray } from 'formik';
 import * as Yup from 'yup';
 import { useSnackbar } from '../../contexts/SnackbarContext';
-import { getWorkshopById, createWorkshop, updateWorkshop } from '../../services/api';
+import { getWorkshopById, createWorkshop, updateWorkshop, uploadWorkshopImage } from '../../services/api';
 import LoadingSpinner from '../../components/common/LoadingSpinner';
 import ErrorMessage from '../../components/common/ErrorMessage';
 
@@ -37,6 +37,7 @@ const WorkshopForm = () => {
   const [error, setError] = useState(null);
   // Create a state to hold form values when an error occurs
   const [savedFormValues, setSavedFormValues] = useState(null);
+  const [uploadingImage, setUploadingImage] = useState(false);
   
   const isEditMode = !!id;
   
@@ -278,6 +279,31 @@ const WorkshopForm = () => {
                     error={touched.image_url && Boolean(errors.image_url)}
                     helperText={(touched.image_url && errors.image_url) || "URL to workshop banner image"}
                   />
+                  {isEditMode && (
+                    <Button component="label" variant="outlined" size="small" sx={{ mt: 1 }} disabled={uploadingImage}>
+                      {uploadingImage ? 'Uploading...' : 'Upload image'}
+                      <input
+                        type="file"
+                        accept="image/jpeg,image/png,image/webp,image/gif"
+                        hidden
+                        onChange={async (event) => {
+                          const file = event.target.files[0];
+                          event.target.value = '';
+                          if (!file) return;
+                          setUploadingImage(true);
+                          try {
+                            const updated = await uploadWorkshopImage(workshop._id, file);
+                            setFieldValue('image_url', updated.image_url);
+                            showMessage('Image uploaded', 'success');
+                          } catch (err) {
+                            showMessage(err.response?.data?.detail || 'Failed to upload image', 'error');
+                          } finally {
+                            setUploadingImage(false);
+                          }
+                        }}
+                      />
+                    </Button>
+                  )}
                 </Grid>
                 
                 <Grid item xs={12}>
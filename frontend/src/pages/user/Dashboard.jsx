@@ -19,7 +19,7 @@ import {
   Cancel as CancelIcon
 } from '@mui/icons-material';
 import { useAuth } from '../../contexts/AuthContext';
-import { getMyRegistrations, getWorkshops } from '../../services/api';
+import { getMyDashboard } from '../../services/api';
 import LoadingSpinner from '../../components/common/LoadingSpinner';
 import ErrorMessage from '../../components/common/ErrorMessage';
 import EmptyState from '../../components/common/EmptyState';
@@ -36,17 +36,10 @@ const Dashboard = () => {
       try {
         setLoading(true);
         
-        // Load user's registrations
-        const registrationsData = await getMyRegistrations();
-        setRegistrations(registrationsData);
-        
-        // Load upcoming workshops
-        const workshopsData = await getWorkshops({ 
-          status: 'upcoming',
-          limit: 3,
-          grade: user?.grade // Filter by user's grade
-        });
-        setUpcomingWorkshops(workshopsData);
+        // Registrations and recommended workshops come back in one request
+        const dashboard = await getMyDashboard({ recommended_limit: 3 });
+        setRegistrations(dashboard.registrations);
+        setUpcomingWorkshops(dashboard.recommended_workshops);
         
         setLoading(false);
       } catch (err) {
@@ -177,7 +170,7 @@ const Dashboard = () => {
                       <Box
                         component="img"
                         height="140"
-                        image={workshop.image_url || `https://source.unsplash.com/random/?science,${workshop.title}`}
+                        image={workshop.images?.card.url || workshop.image_url || `https://source.unsplash.com/random/?science,${workshop.title}`}
                         alt={workshop.title}
                         sx={{ width: '100%', objectFit: 'cover' }}
                       />
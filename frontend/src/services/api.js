@@ -35,7 +35,29 @@ api.interceptors.response.use(
   }
 );
 
+// Sends a POST with a fresh Idempotency-Key, retrying once with the same key if the
+// response was lost to a network error, so the server can replay the first result
+export const withIdempotencyKey = async (send) => {
+  const headers = { 'Idempotency-Key': crypto.randomUUID() };
+  try {
+    return await send(headers);
+  } catch (error) {
+    if (error.response) throw error;
+    return send(headers);
+  }
+};
+
 // Workshop API calls
+export const getHomeFeed = async (params = {}) => {
+  const response = await api.get('/home', { params });
+  return response.data;
+};
+
+export const getTestimonials = async (params = {}) => {
+  const response = await api.get('/testimonials', { params });
+  return response.data;
+};
+
 export const getWorkshops = async (params = {}) => {
   const response = await api.get('/workshops', { params });
   return response.data;
@@ -56,6 +78,14 @@ export const updateWorkshop = async (id, workshopData) => {
   return response.data;
 };
 
+// Sends the file as the raw body; the server generates thumb, card and hero variants
+export const uploadWorkshopImage = async (id, file) => {
+  const response = await api.put(`/workshops/${id}/image`, file, {
+    headers: { 'Content-Type': file.type }
+  });
+  return response.data;
+};
+
 export const deleteWorkshop = async (id) => {
   const response = await api.delete(`/workshops/${id}`);
   return response.data;
@@ -63,7 +93,14 @@ export const deleteWorkshop = async (id) => {
 
 // Registration API calls
 export const registerForWorkshop = async (registrationData) => {
-  const response = await api.post('/registrations', registrationData);
+  const response = await withIdempotencyKey((headers) =>
+    api.post('/registrations', registrationData, { headers })
+  );
+  return response.data;
+};
+
+export const getMyDashboard = async (params = {}) => {
+  const response = await api.get('/me/dashboard', { params });
   return response.data;
 };
 
@@ -109,13 +146,13 @@ export const getDashboardStats = async () => {
   return response.data;
 };
 
-export const getAllRegistrations = async () => {
-  const response = await api.get('/admin/registrations');
+export const getAllRegistrations = async (params = {}) => {
+  const response = await api.get('/admin/registrations', { params });
   return response.data;
 };
 
-export const getAllUsers = async () => {
-  const response = await api.get('/admin/users');
+export const getAllUsers = async (params = {}) => {
+  const response = await api.get('/admin/users', { params });
   return response.data;
 };
 
@@ -129,6 +166,71 @@ export const exportRegistrations = async (workshopId) => {
   return response.data;
 };
 
+export const sendAnnouncement = async (workshopId, announcement) => {
+  const response = await api.post(`/admin/workshops/${workshopId}/announcements`, announcement);
+  return response.data;
+};
+
+export const getAnnouncementJob = async (jobId) => {
+  const response = await api.get(`/admin/announcements/${jobId}`);
+  return response.data;
+};
+
+export const createExportJob = async (exportData) => {
+  const response = await api.post('/admin/exports', exportData);
+  return response.data;
+};
+
+export const getExportJob = async (jobId) => {
+  const response = await api.get(`/admin/exports/${jobId}`);
+  return response.data;
+};
+
+export const downloadExport = async (jobId) => {
+  const response = await api.get(`/admin/exports/${jobId}/download`, { responseType: 'blob' });
+  return response.data;
+};
+
+// Audit journal: params may include entity_type, entity_id, actor_id, since, until, limit
+export const getAuditEvents = async (params = {}) => {
+  const response = await api.get('/admin/audit', { params });
+  return response.data;
+};
+
+// Request profiles captured with the X-Profile: 1 header or by sampling
+export const getProfiles = async () => {
+  const response = await api.get('/admin/profiles');
+  return response.data;
+};
+
+export const downloadProfile = async (profileId) => {
+  const response = await api.get(`/admin/profiles/${profileId}/download`, { responseType: 'blob' });
+  return response.data;
+};
+
+// Check-in tickets and offline check-in
+export const getRegistrationTicket = async (id) => {
+  const response = await api.get(`/registrations/${id}/ticket`);
+  return response.data;
+};
+
+export const getWorkshopRoster = async (workshopId) => {
+  const response = await api.get(`/admin/workshops/${workshopId}/roster`);
+  return response.data;
+};
+
+export const syncCheckIns = async (workshopId, checkIns) => {
+  const response = await api.post(`/admin/workshops/${workshopId}/check-ins`, { check_ins: checkIns });
+  return response.data;
+};
+
+// Several read-only GETs in one round trip, e.g.
+// batchGet([{ id: 'me', path: '/api/auth/me' }, { id: 'regs', path: '/api/registrations/me' }])
+export const batchGet = async (requests) => {
+  const response = await api.post('/batch', { requests });
+  return response.data.responses;
+};
+
 // User profile API calls
 export const updateProfile = async (userData) => {
   const response = await api.put('/users/me', userData);